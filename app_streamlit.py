@@ -1,15 +1,15 @@
 import streamlit as st
+import html
 import os
 import sys
 from pathlib import Path
-import tempfile
-import base64
+from urllib.parse import quote
 
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(APP_DIR)
 
-from pdf_processor import PDFProcessor
-from audio_manager import AudioManager
 from config import Config
+from conversion_jobs import ConversionJob, ConversionJobManager, split_file
 
 st.set_page_config(
     page_title="PDF to Audiobook Converter",
@@ -46,15 +46,77 @@ st.markdown("""
         border-left: 4px solid #1f77b4;
         background-color: #f8f9fa;
     }
+    .download-link {
+        display: inline-block;
+        padding: 0.25rem 0.75rem;
+        border-radius: 0.5rem;
+        border: 1px solid #1f77b4;
+        text-decoration: none;
+    }
 </style>
 """, unsafe_allow_html=True)
 
 
+STATUS_TEXT = {
+    'queued': "⏳ En cola...",
+    'extracting': "📖 Extrayendo texto del PDF...",
+    'converting': "🎙️ Convirtiendo a audio...",
+    'done': "✅ Conversión completada!",
+}
+
+# Streamlit sirve esta carpeta en app/static/ (server.enableStaticServing en
+# .streamlit/config.toml): las descargas se leen del disco al pedirlas, sin
+# pasar por la memoria del servidor
+STATIC_DIR = os.path.join(APP_DIR, "static")
+# Streamlit no sirve archivos estáticos más grandes
+MAX_STATIC_FILE_SIZE = 200 * 1024 * 1024
+
+
+@st.cache_resource
+def get_job_manager() -> ConversionJobManager:
+    """Un único gestor de trabajos para todas las sesiones y ejecuciones del script"""
+    return ConversionJobManager(output_dir=os.path.join(STATIC_DIR, "conversiones"))
+
+
+def download_link(label: str, file_path: str):
+    """Enlace de descarga a un archivo de la carpeta estática.
+
+    Streamlit no sirve archivos estáticos de más de MAX_STATIC_FILE_SIZE: esos
+    se trocean y se ofrece un enlace por parte, con cómo volver a unirlas.
+    """
+    if os.path.getsize(file_path) <= MAX_STATIC_FILE_SIZE:
+        _static_link(label, file_path)
+        return
+
+    name = os.path.basename(file_path)
+    with st.spinner(f"✂️ Troceando {name} para la descarga..."):
+        parts = split_file(file_path, MAX_STATIC_FILE_SIZE)
+
+    st.markdown(f"{label}: el archivo supera los {MAX_STATIC_FILE_SIZE // (1024 * 1024)} MB, "
+                f"se descarga en {len(parts)} partes")
+    for number, part in enumerate(parts, 1):
+        _static_link(f"📥 Parte {number}/{len(parts)} "
+                     f"({os.path.getsize(part) / (1024 * 1024):.0f} MB)", part)
+
+    part_names = [f'"{os.path.basename(part)}"' for part in parts]
+    st.caption("Para unirlas, en la carpeta de descargas:")
+    st.code(f'cat {" ".join(part_names)} > "{name}"\n'
+            f'copy /b {"+".join(part_names)} "{name}"   (Windows)', language=None)
+
+
+def _static_link(label: str, file_path: str):
+    relative = Path(file_path).resolve().relative_to(Path(STATIC_DIR).resolve()).as_posix()
+    st.markdown(
+        f'<a class="download-link" href="app/static/{quote(relative)}" '
+        f'download="{html.escape(os.path.basename(file_path))}">{label}</a>',
+        unsafe_allow_html=True
+    )
+
+
 class StreamlitApp:
     def __init__(self):
         self.config = Config()
-        self.pdf_processor = PDFProcessor(self.config)
-        self.audio_manager = AudioManager(self.config)
+        self.jobs = get_job_manager()
 
     def run(self):
         st.markdown('<h1 class="main-header">📚 PDF to Audiobook Converter</h1>', unsafe_allow_html=True)
@@ -92,6 +154,25 @@ class StreamlitApp:
                 help="Tamaño máximo de texto por archivo de audio"
             )
 
+            output_mode = st.radio(
+                "Formato de salida",
+                ["chapters", "single", "both"],
+                format_func={
+                    "chapters": "Un MP3 por capítulo",
+                    "single": "Un único MP3 con capítulos",
+                    "both": "Ambos",
+                }.get,
+                help="El MP3 único incluye marcas de capítulo ID3 que reconocen los reproductores de audiolibros"
+            )
+
+            postprocess = st.checkbox(
+                "Igualar volumen y recortar silencios",
+                value=False,
+                help="Requiere ffmpeg en el servidor; recodifica cada fragmento de audio"
+            )
+
+            self.config.audio.output_mode = output_mode
+            self.config.audio.postprocess = postprocess
             self.config.tts.language = language
             self.config.tts.slow = slow_speech
             self.config.tts.max_chunk_length = max_chunk_size
@@ -108,20 +189,16 @@ class StreamlitApp:
             )
 
             if uploaded_file is not None:
-
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-                    tmp_file.write(uploaded_file.getvalue())
-                    pdf_path = tmp_file.name
-
-
                 file_size = uploaded_file.size / (1024 * 1024)
                 st.info(f"📄 **Archivo:** {uploaded_file.name} | 📊 **Tamaño:** {file_size:.2f} MB")
 
                 if st.button("🎧 Convertir a Audiobook", type="primary", use_container_width=True):
-                    self.process_pdf(pdf_path, uploaded_file.name)
+                    self.process_pdf(uploaded_file.getvalue(), uploaded_file.name)
 
-                if os.path.exists(pdf_path):
-                    os.unlink(pdf_path)
+            # El trabajo sigue en segundo plano aunque el script se vuelva a ejecutar
+            job = self.jobs.get(st.session_state.get('job_key', ''))
+            if job is not None:
+                self.show_job(job.key)
 
         with col2:
             st.header("ℹ️ Información")
@@ -149,96 +226,131 @@ class StreamlitApp:
             </div>
             """, unsafe_allow_html=True)
 
-    def process_pdf(self, pdf_path: str, original_filename: str):
-        try:
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-
-
-            status_text.text("📖 Extrayendo texto del PDF...")
-            metadata = self.pdf_processor.extract_text_with_metadata(pdf_path)
-            progress_bar.progress(25)
-
-            with st.expander("📊 Información del Documento", expanded=True):
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Título",
-                              metadata['title'][:30] + "..." if len(metadata['title']) > 30 else metadata['title'])
-                with col2:
-                    st.metric("Páginas", metadata['pages'])
-                with col3:
-                    st.metric("Palabras", f"{metadata['words']:,}")
-
-            status_text.text("📑 Organizando en capítulos...")
-            chapters = self.pdf_processor.split_into_chapters(metadata['text'])
-            progress_bar.progress(50)
-
-            if len(chapters) > 1:
-                with st.expander(f"📖 Capítulos Detectados ({len(chapters)})", expanded=True):
-                    for i, chapter in enumerate(chapters):
-                        with st.container():
-                            col1, col2 = st.columns([3, 1])
-                            with col1:
-                                st.markdown(f"**{i + 1}. {chapter['title']}**")
-                                st.caption(
-                                    f"{chapter.get('words', 0)} palabras | ~{chapter.get('duration_estimate', 0):.1f} min")
-                            with col2:
-                                st.text(f"Capítulo {i + 1}")
-
-            status_text.text("🎙️ Convirtiendo a audio...")
-
-            output_dir = "streamlit_outputs"
-            os.makedirs(output_dir, exist_ok=True)
-
-            base_name = Path(original_filename).stem
-            output_path = os.path.join(output_dir, f"{base_name}_audiobook.mp3")
-
-            results = self.audio_manager.convert_chapters_to_audio(chapters, output_path)
-            progress_bar.progress(100)
-
-            self.show_results(results, output_dir)
+    def process_pdf(self, content: bytes, original_filename: str):
+        job = self.jobs.submit(content, original_filename, self.config)
+        st.session_state['job_key'] = job.key
+
+    def show_job(self, key: str):
+        job = self.jobs.get(key)
+        if job.running:
+            self.poll_job(key)
+        else:
+            self.render_job(job)
+
+    @st.fragment(run_every=1.0)
+    def poll_job(self, key: str):
+        """Se vuelve a ejecutar sola cada segundo, sin repetir el resto de la página"""
+        job = self.jobs.get(key)
+        if not job.running:
+            # Al terminar se redibuja la página completa, ya sin sondeo
+            st.rerun()
+        self.render_job(job)
+
+    def render_job(self, job: ConversionJob):
+        if job.status == 'error':
+            st.error(f"❌ Error durante la conversión: {job.error}")
+            return
+
+        st.progress(job.progress)
+        status = STATUS_TEXT[job.status]
+        if job.from_cache:
+            status += " (extracción reutilizada)"
+        st.text(status)
+
+        if job.metadata:
+            self.show_document_info(job)
+
+        if job.status == 'done':
+            self.show_results(job.results, job.key)
+        elif job.finished and self.config.audio.output_mode != 'single':
+            st.subheader(f"📁 Capítulos listos ({sum(1 for path in job.finished.values() if path)}/{len(job.chapters)})")
+            # Se redibuja cada segundo: solo datos ya guardados en el trabajo y enlaces
+            for index, path in sorted(job.finished.items()):
+                if path and os.path.exists(path):
+                    self.show_chapter_download(job.chapters[index]['title'], job.durations[index], path)
+
+    def show_document_info(self, job: ConversionJob):
+        metadata = job.metadata
+        with st.expander("📊 Información del Documento", expanded=job.status != 'done'):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Título",
+                          metadata['title'][:30] + "..." if len(metadata['title']) > 30 else metadata['title'])
+            with col2:
+                st.metric("Páginas", metadata['pages'])
+            with col3:
+                st.metric("Palabras", f"{metadata['words']:,}")
+
+        if len(job.chapters) > 1:
+            with st.expander(f"📖 Capítulos Detectados ({len(job.chapters)})", expanded=False):
+                for i, chapter in enumerate(job.chapters):
+                    with st.container():
+                        col1, col2 = st.columns([3, 1])
+                        with col1:
+                            st.markdown(f"**{i + 1}. {chapter['title']}**")
+                            st.caption(f"{chapter['words']} palabras | ~{chapter['duration_estimate']:.1f} min")
+                        with col2:
+                            st.text(f"Capítulo {i + 1}")
+
+    def show_chapter_download(self, title: str, duration: float, file_path: str):
+        with st.container():
+            col1, col2, col3 = st.columns([3, 1, 1])
+
+            with col1:
+                st.markdown(f"**{title}**")
+
+            with col2:
+                st.text(f"{duration / 60:.1f} min")
+
+            with col3:
+                download_link("📥 Descargar", file_path)
+
+    def show_zip_download(self, key: str):
+        """Descarga de todos los capítulos en un ZIP, que solo se crea al pedirlo"""
+        requested = f"zip_{key}"
+        if not st.session_state.get(requested):
+            st.button(
+                "📦 Preparar descarga de todos los capítulos (ZIP)",
+                key=f"prepare_zip_{key}",
+                on_click=st.session_state.__setitem__,
+                args=(requested, True)
+            )
+            return
 
-            status_text.text("✅ Conversión completada!")
+        with st.spinner("📦 Preparando ZIP..."):
+            zip_path = self.jobs.build_zip(key)
 
-        except Exception as e:
-            st.error(f"❌ Error durante la conversión: {str(e)}")
+        download_link(f"📥 Descargar todos los capítulos ({os.path.getsize(zip_path) / (1024 * 1024):.1f} MB)",
+                      zip_path)
 
-    def show_results(self, results: dict, output_dir: str):
+    def show_results(self, results: dict, key: str):
         st.header("🎉 Conversión Completada")
 
-        col1, col2, col3 = st.columns(3)
+        audiobook = results.get('audiobook')
+        total_duration = sum(chapter['duration'] for chapter in results['successful'])
+
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
             st.metric("Capítulos Totales", results['total_chapters'])
         with col2:
             st.metric("Conversiones Exitosas", len(results['successful']))
         with col3:
             st.metric("Errores", len(results['failed']))
+        with col4:
+            st.metric("Duración", f"{total_duration / 60:.1f} min")
 
-        if results['successful']:
+        if audiobook:
+            st.subheader("📀 Audiolibro con capítulos")
+            download_link(f"📥 Descargar audiolibro ({audiobook['duration'] / 60:.1f} min)", audiobook['file_path'])
+
+        if results['successful'] and self.config.audio.output_mode != 'single':
             st.subheader("📁 Archivos de Audio Generados")
 
             for chapter in results['successful']:
-                with st.container():
-                    col1, col2, col3 = st.columns([3, 1, 1])
-
-                    with col1:
-                        st.markdown(f"**{chapter['title']}**")
-
-                    with col2:
-                        st.text(f"{chapter['duration_estimate']:.1f} min")
-
-                    with col3:
-                        with open(chapter['file_path'], "rb") as file:
-                            btn = st.download_button(
-                                label="📥 Descargar",
-                                data=file,
-                                file_name=os.path.basename(chapter['file_path']),
-                                mime="audio/mpeg",
-                                key=f"dl_{chapter['file_path']}"
-                            )
+                self.show_chapter_download(chapter['title'], chapter['duration'], chapter['file_path'])
 
             if len(results['successful']) > 1:
-                st.info("💡 Para descargar todos los archivos, haz clic en cada botón de descarga individualmente.")
+                self.show_zip_download(key)
 
         if results['failed']:
             st.warning(f"⚠️ {len(results['failed'])} capítulos tuvieron errores en la conversión.")
@@ -1,20 +1,82 @@
-from gtts import gTTS
+import asyncio
 import os
 import tempfile
+import threading
 import logging
-from typing import List, Dict
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Optional, Set, Tuple, Union
+from audio_postprocess import AudioPostProcessor, missing_dependency
 from config import Config
+from conversion_journal import ConversionJournal
+from conversion_manifest import ConversionManifest
+from metrics import metrics
+from mp3_utils import ChapteredMP3Writer, concatenate_mp3, probe_mp3
+from rate_control import RateController
+from sentence_splitter import get_splitter
+from synthesis_cache import SynthesisCache
+from synthesis_scheduler import ChapterPlan, ChunkTask, SynthesisScheduler
+from tts_engine import AsyncTTSEngine, TTSEngine, TTSFactory
 
 logger = logging.getLogger(__name__)
 
 
 class AudioManager:
-    def __init__(self, config: Config = None):
+    def __init__(self, config: Config = None, engine: Union[TTSEngine, AsyncTTSEngine] = None):
         self.config = config or Config()
         self.temp_dir = tempfile.mkdtemp()
         self.logger = logger
-
-    def convert_chapters_to_audio(self, chapters: List[Dict], base_output_path: str) -> Dict:
+        self._engine = TTSFactory.meter(engine, type(engine).__name__) if engine is not None else None
+        self._engines = {}
+        self._engines_lock = threading.Lock()
+        self.cache = None
+        self.rate_controller = None
+        self._postprocessor = None
+        self._postprocess_pool = None
+        self._postprocess_unavailable = False
+
+        if self.config.cache.enabled:
+            self.cache = SynthesisCache(
+                self.config.cache.directory,
+                self.config.cache.max_size_mb * 1024 * 1024
+            )
+
+    def close(self):
+        """Cierra los motores creados, el pool de postproceso y borra el directorio temporal.
+
+        El motor recibido en el constructor es del llamador y no se cierra.
+        """
+        with self._engines_lock:
+            engines = list(self._engines.values())
+            self._engines.clear()
+            pool, self._postprocess_pool = self._postprocess_pool, None
+            self._postprocessor = None
+
+        for engine in engines:
+            try:
+                if isinstance(engine, AsyncTTSEngine):
+                    asyncio.run(engine.close())
+                else:
+                    engine.close()
+            except Exception as e:
+                self.logger.warning(f"Error cerrando el motor TTS: {e}")
+
+        if pool is not None:
+            pool.shutdown()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def convert_chapters_to_audio(self, chapters: List[Dict], base_output_path: str,
+                                  journal: ConversionJournal = None, book: Dict = None,
+                                  on_chapter: Callable[[int, Optional[str]], None] = None,
+                                  manifest: ConversionManifest = None) -> Dict:
+        """Convierte los capítulos y devuelve los resultados.
+
+        `on_chapter(índice, ruta)` se llama al terminar cada capítulo, con ruta
+        None si falló, para que la interfaz pueda ofrecerlo antes del final.
+        Con `manifest` se anota lo producido y, si es incremental, se reutiliza
+        el audio de los capítulos y chunks que no han cambiado.
+        """
+        writer = None
         try:
             results = {
                 'successful': [],
@@ -22,41 +84,262 @@ class AudioManager:
                 'total_chapters': len(chapters)
             }
 
+            language = self.config.tts.language
+            chapter_paths = []
+            plans = []
+            outcomes = {}
+            # Audio de la conversión anterior: se copia antes de sobrescribir ningún capítulo
+            staged = []
+            reused = set()
+            reused_chapters = {}
+            chunk_sentences = {}
+            matches = manifest.match_chapters(chapters) if manifest is not None else {}
+            keep_chapters = journal is not None
+
+            if self.config.audio.output_mode in ('single', 'both'):
+                writer = self._create_audiobook_writer(chapters, base_output_path, book)
+            progress = {'next': 0}
+
             for i, chapter in enumerate(chapters):
                 chapter_title = chapter["title"]
-                chapter_filename = f"capitulo_{i + 1:02d}_{self._sanitize_filename(chapter_title)}.mp3"
-                chapter_path = os.path.join(os.path.dirname(base_output_path), chapter_filename)
+                chapter_path = self._chapter_path(i, chapter_title, base_output_path)
+                chapter_paths.append(chapter_path)
+
+                if journal is not None and journal.is_chapter_done(chapter_path, chapter["content"]):
+                    self.logger.info(f"Capítulo {i + 1} ya convertido en una ejecución anterior: {chapter_title}")
+                    outcomes[i] = True
+                    if on_chapter:
+                        on_chapter(i, chapter_path)
+                    continue
 
-                self.logger.info(f"Convirtiendo capítulo {i + 1}: {chapter_title}")
+                previous = matches.get(i)
+                if manifest is not None and manifest.is_unchanged(previous, chapter["content"]):
+                    self.logger.info(f"Capítulo {i + 1} sin cambios, se reutiliza su audio: {chapter_title}")
+                    temp_path = os.path.join(self.temp_dir, f"reuse_{len(staged):04d}.mp3")
+                    manifest.extract_chapter(previous, temp_path)
+                    staged.append((temp_path, chapter_path))
+                    reused_chapters[i] = previous
+                    continue
 
-                success = self.text_to_speech(
-                    chapter["content"],
-                    chapter_path,
-                    self.config.tts.language
-                )
+                self.logger.info(f"Planificando capítulo {i + 1}: {chapter_title}")
 
-                if success:
-                    chapter_info = {
-                        'title': chapter_title,
-                        'file_path': chapter_path,
-                        'words': chapter.get('words', 0),
-                        'duration_estimate': self._estimate_duration(chapter['content'])
-                    }
-                    results['successful'].append(chapter_info)
-                    self.logger.info(f"✅ Capítulo {i + 1} convertido: {chapter_filename}")
+                if manifest is not None and manifest.incremental:
+                    plan = self._plan_incremental(i, chapter, chapter_path, journal, manifest, previous,
+                                                  staged, reused, chunk_sentences)
                 else:
-                    results['failed'].append({
-                        'title': chapter_title,
-                        'index': i + 1
-                    })
-                    self.logger.error(f"❌ Error en capítulo {i + 1}: {chapter_title}")
-
+                    plan = self._plan_chapter(i, chapter_title, chapter["content"], chapter_path, journal)
+                    if plan is not None and manifest is not None:
+                        # Troceo de siempre: el manifiesto solo anota las oraciones de cada chunk
+                        splitter = get_splitter(language)
+                        chunk_sentences[i] = [splitter.split(task.text) for task in plan.tasks]
+                if plan is None:
+                    outcomes[i] = False
+                    if on_chapter:
+                        on_chapter(i, None)
+                else:
+                    plans.append(plan)
+
+            for temp_path, final_path in staged:
+                shutil.move(temp_path, final_path)
+            for i, previous in reused_chapters.items():
+                manifest.record_reused(i, chapters[i]["title"], previous, chapter_paths[i])
+                if journal is not None:
+                    # Sin esto el diario nunca se da por terminado tras reutilizar un capítulo
+                    journal.record_chapter(chapter_paths[i], chapters[i]["content"])
+                manifest.stats['reused_chapters'] += 1
+                manifest.stats['reused_chunks'] += len(previous['chunks'])
+                outcomes[i] = True
+                if on_chapter:
+                    on_chapter(i, chapter_paths[i])
+
+            if journal is not None:
+                journal.record_plan(plans)
+
+            def on_chapter_done(plan: ChapterPlan, chunk_results: List[bool]):
+                outcomes[plan.index] = self._finish_chapter(plan, chunk_results, keep_chunks=journal is not None)
+                if outcomes[plan.index] and journal is not None:
+                    journal.record_chapter(plan.output_path, chapters[plan.index]["content"])
+                if outcomes[plan.index] and manifest is not None:
+                    manifest.record_chapter(
+                        plan.index, plan.title, chapters[plan.index]["content"], plan.output_path,
+                        [(sentences, plan.audio_ranges.get(j)) for j, sentences in enumerate(chunk_sentences[plan.index])]
+                    )
+                if on_chapter:
+                    on_chapter(plan.index, plan.output_path if outcomes[plan.index] else None)
+                if writer is not None:
+                    self._stream_chapters(writer, chapter_paths, outcomes, progress, keep_chapters)
+
+            if writer is not None:
+                # Capítulos ya hechos en una ejecución anterior, reutilizados o vacíos
+                self._stream_chapters(writer, chapter_paths, outcomes, progress, keep_chapters)
+
+            self.logger.info(f"Convirtiendo {len(plans)} capítulos a audio...")
+            self._start_book(sum(len(plan.tasks) for plan in plans) - len(reused))
+            with metrics.stage('synthesis'):
+                self._create_scheduler(language, journal, reused).run(plans, on_chapter_done)
+            self._log_rate_control()
+
+            if writer is not None:
+                results['audiobook'] = self._close_audiobook(writer, chapter_paths, outcomes)
+                writer = None
+                if manifest is not None and results['audiobook'] and self.config.audio.output_mode == 'single':
+                    manifest.relocate_to_audiobook(results['audiobook'])
+
+            if manifest is not None:
+                manifest.save()
+                if manifest.incremental:
+                    results['incremental'] = self._log_incremental(manifest)
+
+            self._log_cache_stats()
+            self._collect_results(chapters, chapter_paths, outcomes, results)
             return results
 
         except Exception as e:
             self.logger.error(f"Error convirtiendo capítulos: {e}")
+            if writer is not None:
+                writer.abort()
             return {'successful': [], 'failed': [], 'total_chapters': len(chapters)}
 
+    def _plan_incremental(self, index: int, chapter: Dict, chapter_path: str, journal: Optional[ConversionJournal],
+                          manifest: ConversionManifest, previous: Optional[Dict], staged: List[Tuple[str, str]],
+                          reused: Set[str], chunk_sentences: Dict[int, List[List[str]]]) -> Optional[ChapterPlan]:
+        """Planifica un capítulo cambiado: los chunks intactos se recortan del audio anterior"""
+        sentences = get_splitter(self.config.tts.language).split(chapter["content"])
+        groups = manifest.plan_chunks(sentences, previous, self.config.tts.max_chunk_length)
+
+        plan = self._plan_chapter(index, chapter["title"], chapter["content"], chapter_path, journal,
+                                  chunks=[" ".join(group) for group, _ in groups])
+        if plan is None:
+            return None
+
+        chunk_sentences[index] = [group for group, _ in groups]
+        for task, (_, old_chunk) in zip(plan.tasks, groups):
+            if old_chunk is None:
+                manifest.stats['synthesized_chunks'] += 1
+                continue
+            temp_path = os.path.join(self.temp_dir, f"reuse_{len(staged):04d}.mp3")
+            try:
+                manifest.extract_chunk(previous, old_chunk, temp_path)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"No se pudo reutilizar un chunk del capítulo {index + 1}: {e}")
+                manifest.stats['synthesized_chunks'] += 1
+                continue
+            staged.append((temp_path, task.output_path))
+            reused.add(task.output_path)
+            manifest.stats['reused_chunks'] += 1
+
+        return plan
+
+    def _log_incremental(self, manifest: ConversionManifest) -> Dict:
+        stats = dict(manifest.stats, tts_calls_avoided=manifest.tts_calls_avoided)
+        metrics.increment('tts_calls_avoided_total', manifest.tts_calls_avoided)
+        self.logger.info(
+            f"Reconversión incremental: {stats['reused_chapters']} capítulos sin cambios, "
+            f"{stats['reused_chunks']} chunks reutilizados y {stats['synthesized_chunks']} sintetizados "
+            f"({stats['tts_calls_avoided']} llamadas TTS evitadas)"
+        )
+        return stats
+
+    def _chapter_path(self, index: int, title: str, base_output_path: str) -> str:
+        chapter_filename = f"capitulo_{index + 1:02d}_{self._sanitize_filename(title)}.mp3"
+        return os.path.join(os.path.dirname(base_output_path), chapter_filename)
+
+    def _create_audiobook_writer(self, chapters: List[Dict], base_output_path: str,
+                                 book: Dict = None) -> ChapteredMP3Writer:
+        book = book or {}
+        return ChapteredMP3Writer(
+            base_output_path,
+            book.get('title') or os.path.splitext(os.path.basename(base_output_path))[0],
+            book.get('author', ''),
+            [chapter['title'] for chapter in chapters],
+        )
+
+    def _log_cache_stats(self):
+        if self.cache is not None:
+            stats = self.cache.stats()
+            self.logger.info(
+                f"Caché TTS: {stats['hits']} aciertos, {stats['misses']} fallos, "
+                f"{stats['evictions']} expulsiones ({stats['size_bytes'] / (1024 * 1024):.1f} MB)"
+            )
+
+    def _collect_results(self, chapters: List[Dict], chapter_paths: List[str],
+                         outcomes: Dict[int, bool], results: Dict):
+        for i, chapter in enumerate(chapters):
+            chapter_title = chapter["title"]
+            chapter_path = chapter_paths[i]
+            chapter_filename = os.path.basename(chapter_path)
+
+            if outcomes.get(i):
+                if self.config.audio.output_mode == 'single' and results.get('audiobook'):
+                    chapter_path = results['audiobook']['file_path']
+                chapter_info = {
+                    'title': chapter_title,
+                    'file_path': chapter_path,
+                    'words': chapter.get('words', 0),
+                    **self._audio_info(i, chapter_paths[i], results.get('audiobook')),
+                }
+                results['successful'].append(chapter_info)
+                self.logger.info(f"✅ Capítulo {i + 1} convertido: {chapter_filename}")
+            else:
+                results['failed'].append({
+                    'title': chapter_title,
+                    'index': i + 1
+                })
+                self.logger.error(f"❌ Error en capítulo {i + 1}: {chapter_title}")
+
+    def _audio_info(self, index: int, chapter_path: str, audiobook: Optional[Dict]) -> Dict:
+        """Duración real en segundos y bitrate del capítulo, leídos de las cabeceras MP3"""
+        if os.path.exists(chapter_path):
+            try:
+                info = probe_mp3(chapter_path)
+                return {'duration': info['duration'], 'bitrate': info['bitrate']}
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"No se pudo leer la duración de {chapter_path}: {e}")
+
+        # Modo "single": el capítulo solo existe dentro del audiolibro
+        if audiobook and index in audiobook['chapter_durations']:
+            bitrate = audiobook['bytes'] * 8 / audiobook['duration'] / 1000 if audiobook['duration'] else 0.0
+            return {'duration': audiobook['chapter_durations'][index], 'bitrate': bitrate}
+        return {'duration': 0.0, 'bitrate': 0.0}
+
+    def _stream_chapters(self, writer: ChapteredMP3Writer, chapter_paths: List[str],
+                         outcomes: Dict[int, bool], progress: Dict, keep_chapters: bool = False):
+        """Añade al audiolibro único los capítulos terminados que ya tocan, en orden.
+
+        Un capítulo fallido no detiene el resto: queda fuera de la tabla de capítulos.
+        """
+        while progress['next'] < len(chapter_paths) and progress['next'] in outcomes:
+            index = progress['next']
+            if outcomes[index]:
+                writer.add_chapter(index, chapter_paths[index])
+                # Con diario, los capítulos sueltos hacen falta hasta el final
+                if self.config.audio.output_mode == 'single' and not keep_chapters:
+                    os.remove(chapter_paths[index])
+            progress['next'] += 1
+
+    def _close_audiobook(self, writer: ChapteredMP3Writer, chapter_paths: List[str],
+                         outcomes: Dict[int, bool]) -> Optional[Dict]:
+        try:
+            stats = writer.close()
+        except Exception as e:
+            self.logger.error(f"Error creando el audiolibro único: {e}")
+            return None
+
+        self.logger.info(
+            f"Audiolibro único: {writer.output_path} "
+            f"({stats['chapters']} capítulos, {stats['duration'] / 60:.1f} min)"
+        )
+        metrics.increment('audio_bytes_written_total', stats['bytes'])
+
+        # Con diario se borran al final, y solo si no falló ninguno. El manifiesto
+        # pasa a leer su audio del audiolibro único (ConversionManifest.relocate_to_audiobook)
+        if self.config.audio.output_mode == 'single' and all(outcomes.get(i) for i in range(len(chapter_paths))):
+            for path in chapter_paths:
+                if os.path.exists(path):
+                    os.remove(path)
+
+        return {'file_path': writer.output_path, **stats}
+
     def text_to_speech(self, text: str, output_path: str, language: str = "es") -> bool:
         try:
             if not text.strip():
@@ -69,68 +352,348 @@ class AudioManager:
                 chunks = processor.split_text_into_chunks(text)
                 return self._convert_long_text(chunks, output_path, language)
             else:
-                return self._convert_chunk(text, output_path, language)
+                success = self._convert_chunk(text, output_path, language)
+                if success and self._get_postprocess_pool() is not None:
+                    success = self._postprocessor.process_file(output_path)
+                return success
 
         except Exception as e:
             self.logger.error(f"Error en text_to_speech: {e}")
             return False
 
+    def _plan_chapter(self, index: int, title: str, text: str, output_path: str,
+                      journal: ConversionJournal = None, chunk_dir: str = None,
+                      chunks: List[str] = None) -> Optional[ChapterPlan]:
+        if not text.strip():
+            self.logger.warning(f"Capítulo {index + 1} vacío, no se puede convertir")
+            return None
+
+        plan = ChapterPlan(index=index, title=title, output_path=output_path)
+
+        if chunks is None and len(text) > self.config.tts.max_chunk_length:
+            from pdf_processor import PDFProcessor
+            chunks = PDFProcessor(self.config).split_text_into_chunks(text)
+        elif chunks is None:
+            chunks = [text]
+
+        for j, chunk in enumerate(chunks):
+            if journal is not None:
+                chunk_path = journal.chunk_path(index, j)
+            elif len(chunks) == 1:
+                chunk_path = output_path
+            else:
+                chunk_path = os.path.join(chunk_dir or self.temp_dir, f"chunk_{index + 1:03d}_{j:03d}.mp3")
+            plan.tasks.append(ChunkTask(index, j, chunk, chunk_path))
+
+        return plan
+
+    def _finish_chapter(self, plan: ChapterPlan, chunk_results: List[bool], keep_chunks: bool = False) -> bool:
+        success = self._write_chapter(plan, chunk_results, keep_chunks)
+        if success:
+            metrics.increment('audio_bytes_written_total', os.path.getsize(plan.output_path))
+        return success
+
+    def _write_chapter(self, plan: ChapterPlan, chunk_results: List[bool], keep_chunks: bool) -> bool:
+        if len(plan.tasks) == 1:
+            if chunk_results[0] and plan.tasks[0].output_path != plan.output_path:
+                os.replace(plan.tasks[0].output_path, plan.output_path)
+            if chunk_results[0]:
+                plan.audio_ranges = {0: (0, os.path.getsize(plan.output_path))}
+            return chunk_results[0]
+
+        converted = [task for task, ok in zip(plan.tasks, chunk_results) if ok]
+        audio_files = [task.output_path for task in converted]
+
+        for task, ok in zip(plan.tasks, chunk_results):
+            if not ok:
+                self.logger.error(f"Error convirtiendo chunk {task.chunk_index + 1} del capítulo {plan.index + 1}")
+
+        if len(converted) < len(plan.tasks):
+            # Un capítulo con huecos no se une: quedaría más corto sin que nadie lo note
+            self.logger.error(
+                f"Capítulo {plan.index + 1} incompleto: {len(plan.tasks) - len(converted)} "
+                f"de {len(plan.tasks)} chunks fallaron"
+            )
+            if not keep_chunks:
+                for path in audio_files:
+                    if os.path.exists(path):
+                        os.remove(path)
+            return False
+
+        segments = []
+        success = self._assemble_chunks(audio_files, plan.output_path, keep_chunks, segments)
+        plan.audio_ranges = {task.chunk_index: segment for task, segment in zip(converted, segments)}
+        return success
+
+    def _create_scheduler(self, language: str, journal: ConversionJournal = None,
+                          reused: Set[str] = None) -> SynthesisScheduler:
+        engine = self._get_engine(language)
+        reused = reused or set()
+        postprocess = self._get_postprocess_pool()
+
+        def already_done(text: str, output_path: str) -> bool:
+            # Audio recortado de la conversión anterior (modo incremental)
+            if output_path in reused:
+                if journal is not None:
+                    journal.record_chunk(output_path, text)
+                return True
+            if journal is not None and journal.is_chunk_done(output_path, text):
+                self.logger.info(f"Chunk ya convertido, se reutiliza: {output_path}")
+                return True
+            return False
+
+        if isinstance(engine, AsyncTTSEngine):
+            async def synthesize_async(text: str, output_path: str) -> bool:
+                if already_done(text, output_path):
+                    return True
+
+                success = await self._convert_chunk_async(text, output_path, language)
+                if success and postprocess is not None:
+                    success = await asyncio.wrap_future(
+                        postprocess.submit(self._postprocessor.process_file, output_path)
+                    )
+                if success and journal is not None:
+                    journal.record_chunk(output_path, text)
+                return success
+
+            return SynthesisScheduler(synthesize_async, max_workers=self.config.tts.max_in_flight)
+
+        if self.config.tts.engine == 'pyttsx3_pool' and self._engine is None:
+            max_workers = self._offline_workers()
+        else:
+            max_workers = self.config.tts.max_workers if engine.thread_safe else 1
+
+        def synthesize(text: str, output_path: str) -> bool:
+            if already_done(text, output_path):
+                return True
+
+            success = self._convert_chunk(text, output_path, language)
+            if success and postprocess is not None:
+                success = postprocess.submit(self._postprocessor.process_file, output_path).result()
+            if success and journal is not None:
+                journal.record_chunk(output_path, text)
+            return success
+
+        def synthesize_batch(items: List[Tuple[str, str]]) -> List[bool]:
+            results = [True] * len(items)
+            pending = []
+            for i, (text, output_path) in enumerate(items):
+                if not already_done(text, output_path):
+                    pending.append(i)
+
+            converted = self._convert_batch([items[i] for i in pending], language)
+            if postprocess is not None:
+                # Los chunks del lote se postprocesan en paralelo
+                futures = [postprocess.submit(self._postprocessor.process_file, items[i][1]) if success else None
+                           for i, success in zip(pending, converted)]
+                converted = [future is not None and future.result() for future in futures]
+            for i, success in zip(pending, converted):
+                results[i] = success
+                if success and journal is not None:
+                    text, output_path = items[i]
+                    journal.record_chunk(output_path, text)
+            return results
+
+        # Los servicios remotos no ganan nada con lotes: sus chunks van en paralelo
+        return SynthesisScheduler(
+            synthesize,
+            max_workers=max_workers,
+            synthesize_batch=None if engine.remote else synthesize_batch,
+            batch_size=self.config.tts.batch_size,
+            batch_chars=self.config.tts.max_chunk_length,
+        )
+
+    def _get_postprocess_pool(self) -> Optional[ThreadPoolExecutor]:
+        """Pool del postproceso de audio, o None si está desactivado o faltan dependencias.
+
+        Los chunks se postprocesan según termina su síntesis, sean del capítulo
+        que sean: el pool limita a un chunk por núcleo el trabajo de ffmpeg y NumPy.
+        """
+        if not self.config.audio.postprocess or self._postprocess_unavailable:
+            return None
+
+        with self._engines_lock:
+            if self._postprocessor is None:
+                problem = missing_dependency()
+                if problem is not None:
+                    self.logger.warning(f"Postproceso de audio desactivado: {problem}")
+                    self._postprocess_unavailable = True
+                    return None
+
+                workers = self.config.audio.postprocess_workers or os.cpu_count() or 1
+                self._postprocessor = AudioPostProcessor(self.config.audio, self.temp_dir)
+                self._postprocess_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="postprocess")
+                self.logger.info(f"Postproceso de audio activado: {workers} chunks a la vez")
+            return self._postprocess_pool
+
+    def _get_engine(self, language: str) -> Union[TTSEngine, AsyncTTSEngine]:
+        if self._engine is not None:
+            return self._engine
+
+        key = (self.config.tts.engine, language, self.config.tts.slow)
+        with self._engines_lock:
+            if key not in self._engines:
+                if self.config.tts.engine == 'google':
+                    options = {
+                        'language': language,
+                        'slow': self.config.tts.slow,
+                        'parallel_parts': self.config.tts.google_parallel_parts,
+                        'endpoint': self.config.tts.google_endpoint,
+                    }
+                elif self.config.tts.engine == 'google_async':
+                    options = {
+                        'language': language,
+                        'slow': self.config.tts.slow,
+                        'max_connections': self.config.tts.max_in_flight,
+                        'endpoint': self.config.tts.google_endpoint,
+                    }
+                elif self.config.tts.engine == 'pyttsx3_pool':
+                    options = {
+                        'workers': self._offline_workers(),
+                        'timeout': self.config.tts.offline_timeout,
+                    }
+                else:
+                    options = {}
+                # Un único controlador por gestor: todos los idiomas comparten el mismo servicio
+                controller = self.rate_controller or self._create_rate_controller()
+                engine = TTSFactory.create_engine(
+                    self.config.tts.engine,
+                    cache=self.cache,
+                    rate_controller=controller,
+                    **options
+                )
+                if engine.remote:
+                    self.rate_controller = controller
+                self._engines[key] = engine
+            return self._engines[key]
+
+    def _offline_workers(self) -> int:
+        return self.config.tts.offline_workers or os.cpu_count() or 1
+
+    def _create_rate_controller(self) -> RateController:
+        if self.config.tts.engine == 'google_async':
+            max_concurrency = self.config.tts.max_in_flight
+        elif self.config.tts.engine == 'google' and self.config.tts.google_parallel_parts > 1:
+            # El control se aplica a cada fragmento, no a cada chunk
+            max_concurrency = self.config.tts.google_parallel_parts
+        else:
+            max_concurrency = self.config.tts.max_workers
+        return RateController(self.config.retry, max_concurrency)
+
+    def _start_book(self, chunks: int):
+        if self.rate_controller is not None:
+            self.rate_controller.start_book(chunks)
+
+    def _log_rate_control(self):
+        if self.rate_controller is None:
+            return
+        stats = self.rate_controller.stats
+        self.logger.info(
+            f"Control de tasa: {stats['retries']} reintentos, {stats['throttled']} errores transitorios, "
+            f"límite final {int(self.rate_controller.limit)} peticiones en vuelo"
+        )
+
     def _convert_chunk(self, text: str, output_path: str, language: str) -> bool:
+        if isinstance(self._get_engine(language), AsyncTTSEngine):
+            return asyncio.run(self._convert_chunk_async(text, output_path, language))
+
         try:
 
             safe_text = text[:self.config.tts.max_chunk_length]
 
-            tts = gTTS(text=safe_text, lang=language, slow=self.config.tts.slow)
-            tts.save(output_path)
-
-            if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-                file_size_kb = os.path.getsize(output_path) / 1024
-                self.logger.info(f"Audio creado: {output_path} ({file_size_kb:.1f} KB)")
-                return True
-            else:
-                self.logger.error("El archivo de audio no se creó correctamente")
+            if not self._get_engine(language).synthesize(safe_text, output_path):
                 return False
 
+            return self._check_audio_file(output_path)
+
         except Exception as e:
             self.logger.error(f"Error convirtiendo chunk: {e}")
             return False
 
-    def _convert_long_text(self, chunks: List[str], output_path: str, language: str) -> bool:
-        try:
-            audio_files = []
+    def _convert_batch(self, items: List[Tuple[str, str]], language: str) -> List[bool]:
+        if not items:
+            return []
 
-            for i, chunk in enumerate(chunks):
-                chunk_path = os.path.join(self.temp_dir, f"chunk_{i:03d}.mp3")
+        try:
+            limit = self.config.tts.max_chunk_length
+            results = self._get_engine(language).synthesize_batch(
+                [(text[:limit], output_path) for text, output_path in items]
+            )
+            return [success and self._check_audio_file(output_path)
+                    for (_, output_path), success in zip(items, results)]
 
-                self.logger.info(f"Procesando chunk {i + 1}/{len(chunks)}...")
+        except Exception as e:
+            self.logger.error(f"Error convirtiendo lote de chunks: {e}")
+            return [False] * len(items)
 
-                if self._convert_chunk(chunk, chunk_path, language):
-                    audio_files.append(chunk_path)
-                else:
-                    self.logger.error(f"Error convirtiendo chunk {i + 1}")
-                    continue
+    async def _convert_chunk_async(self, text: str, output_path: str, language: str) -> bool:
+        try:
+            safe_text = text[:self.config.tts.max_chunk_length]
 
-            if not audio_files:
-                self.logger.error("No se pudo convertir ningún chunk")
+            if not await self._get_engine(language).synthesize(safe_text, output_path):
                 return False
 
-            if audio_files:
-                os.rename(audio_files[0], output_path)
-                self.logger.info(f"Texto largo convertido (usando primer chunk): {output_path}")
+            return self._check_audio_file(output_path)
 
+        except Exception as e:
+            self.logger.error(f"Error convirtiendo chunk: {e}")
+            return False
 
-                for temp_file in audio_files[1:]:
-                    if os.path.exists(temp_file):
-                        os.remove(temp_file)
+    def _check_audio_file(self, output_path: str) -> bool:
+        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+            file_size_kb = os.path.getsize(output_path) / 1024
+            self.logger.info(f"Audio creado: {output_path} ({file_size_kb:.1f} KB)")
+            return True
+        else:
+            self.logger.error("El archivo de audio no se creó correctamente")
+            return False
 
-                return True
-            else:
-                return False
+    def _convert_long_text(self, chunks: List[str], output_path: str, language: str) -> bool:
+        try:
+            plan = ChapterPlan(index=0, title=os.path.basename(output_path), output_path=output_path)
+            for i, chunk in enumerate(chunks):
+                chunk_path = os.path.join(self.temp_dir, f"chunk_{i:03d}.mp3")
+                plan.tasks.append(ChunkTask(0, i, chunk, chunk_path))
+
+            self.logger.info(f"Procesando {len(chunks)} chunks...")
+            outcome = {}
+
+            def on_chapter_done(done_plan: ChapterPlan, chunk_results: List[bool]):
+                outcome['success'] = self._finish_chapter(done_plan, chunk_results)
+
+            self._start_book(len(chunks))
+            with metrics.stage('synthesis'):
+                self._create_scheduler(language).run([plan], on_chapter_done)
+            self._log_rate_control()
+            return outcome.get('success', False)
 
         except Exception as e:
             self.logger.error(f"Error en conversión de texto largo: {e}")
             return False
 
+    @metrics.timed('concatenation')
+    def _assemble_chunks(self, audio_files: List[str], output_path: str, keep_chunks: bool = False,
+                         segments: List[Tuple[int, int]] = None) -> bool:
+        try:
+            stats = concatenate_mp3(audio_files, output_path)
+            if segments is not None:
+                segments.extend(stats['segments'])
+            self.logger.info(
+                f"Texto largo convertido: {output_path} "
+                f"({stats['files']} chunks, {stats['frames']} tramas, {stats['duration'] / 60:.1f} min)"
+            )
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error uniendo chunks de audio: {e}")
+            return False
+
+        finally:
+            if not keep_chunks:
+                for temp_file in audio_files:
+                    if os.path.exists(temp_file):
+                        os.remove(temp_file)
+
     def _sanitize_filename(self, filename: str) -> str:
         import re
         cleaned = re.sub(r'[<>:"/\\|?*]', '', filename)
@@ -138,7 +701,7 @@ class AudioManager:
         return cleaned.strip()
 
     def _estimate_duration(self, text: str) -> float:
-        """Estima la duración del audio en minutos"""
+        """Estima en minutos la duración del audio de un texto aún no sintetizado"""
         words = len(text.split())
 
         return words / 150.0
@@ -0,0 +1,161 @@
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from typing import IO, List, Optional, Tuple
+
+from config import AudioConfig
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Unidad de análisis y de lectura: resolución de los bordes de silencio
+BLOCK_SECONDS = 0.05
+# Una voz casi inaudible no se amplifica más allá de esto
+MAX_GAIN_DB = 20.0
+# Margen bajo el fondo de escala para que la ganancia nunca recorte picos
+PEAK_CEILING_DB = -1.0
+FULL_SCALE = 32768.0
+
+
+def missing_dependency() -> Optional[str]:
+    """Qué falta para postprocesar audio, o None si está todo disponible"""
+    if shutil.which('ffmpeg') is None:
+        return "ffmpeg no está instalado"
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return "NumPy no está instalado"
+    return None
+
+
+class AudioPostProcessor:
+    """Iguala el volumen de un MP3 y recorta el silencio de sus extremos.
+
+    ffmpeg decodifica a PCM de 16 bits y NumPy analiza bloques de tamaño fijo,
+    así que la memoria no depende de la duración del audio. La primera pasada
+    mide la energía y el pico de cada bloque mientras guarda el PCM en un
+    archivo temporal; la segunda aplica la ganancia a la zona con voz y la
+    recodifica con `bitrate`, `sample_rate` y `channels` de `AudioConfig`.
+    """
+
+    def __init__(self, config: AudioConfig, temp_dir: str = None):
+        self.config = config
+        self.temp_dir = temp_dir
+        self.logger = logger
+        self.block_samples = max(1, int(config.sample_rate * BLOCK_SECONDS))
+        self.block_bytes = self.block_samples * config.channels * 2
+
+    @metrics.timed('postprocess')
+    def process_file(self, path: str) -> bool:
+        """Procesa `path` en su sitio. Devuelve False si ffmpeg falla"""
+        fd, pcm_path = tempfile.mkstemp(suffix='.pcm', dir=self.temp_dir)
+        os.close(fd)
+        partial_path = path + ".post"
+
+        try:
+            energies, peaks = self._decode(path, pcm_path)
+            first, last, gain_db = self.analyze(energies, peaks)
+            self._encode(pcm_path, partial_path, first, last, 10 ** (gain_db / 20))
+            os.replace(partial_path, path)
+
+        except (OSError, subprocess.SubprocessError) as e:
+            self.logger.error(f"Error en el postproceso de {path}: {e}")
+            return False
+
+        finally:
+            for temp_path in (pcm_path, partial_path):
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+        trimmed = (len(energies) - (last - first)) * BLOCK_SECONDS
+        metrics.increment('audio_silence_trimmed_seconds_total', trimmed)
+        self.logger.debug(f"Postproceso de {path}: ganancia {gain_db:+.1f} dB, {trimmed:.2f}s de silencio recortados")
+        return True
+
+    def analyze(self, energies: List[float], peaks: List[int]) -> Tuple[int, int, float]:
+        """Bloques [first, last) que se conservan y ganancia en dB a aplicar"""
+        import numpy as np
+
+        if not energies:
+            return 0, 0, 0.0
+
+        energy = np.asarray(energies, dtype=np.float64)
+        level_db = 10 * np.log10(energy / FULL_SCALE ** 2 + 1e-12)
+        voiced = np.flatnonzero(level_db > self.config.silence_threshold_db)
+        if voiced.size == 0:
+            # Todo es silencio: se recodifica tal cual
+            return 0, len(energies), 0.0
+
+        keep = round(self.config.keep_silence_ms / 1000 / BLOCK_SECONDS)
+        first = max(0, int(voiced[0]) - keep)
+        last = min(len(energies), int(voiced[-1]) + 1 + keep)
+
+        loudness_db = 10 * np.log10(energy[voiced].mean() / FULL_SCALE ** 2)
+        gain_db = float(np.clip(self.config.target_loudness_db - loudness_db, -MAX_GAIN_DB, MAX_GAIN_DB))
+
+        peak = int(np.max(np.asarray(peaks[first:last])))
+        if peak > 0:
+            headroom_db = PEAK_CEILING_DB - 20 * np.log10(peak / FULL_SCALE)
+            gain_db = min(gain_db, float(headroom_db))
+        return first, last, gain_db
+
+    def _pcm_format(self) -> List[str]:
+        return ['-f', 's16le', '-ac', str(self.config.channels), '-ar', str(self.config.sample_rate)]
+
+    def _decode(self, path: str, pcm_path: str) -> Tuple[List[float], List[int]]:
+        import numpy as np
+
+        energies = []
+        peaks = []
+        command = ['ffmpeg', '-v', 'error', '-nostdin', '-i', path] + self._pcm_format() + ['pipe:1']
+
+        # stderr va a un archivo: una tubería sin leer podría bloquear a ffmpeg
+        with tempfile.TemporaryFile() as errors, open(pcm_path, 'wb') as pcm, \
+                subprocess.Popen(command, stdout=subprocess.PIPE, stderr=errors) as process:
+            while True:
+                block = process.stdout.read(self.block_bytes)
+                if not block:
+                    break
+                # Un bloque final incompleto puede cortar una muestra a la mitad
+                samples = np.frombuffer(block, dtype=np.int16, count=len(block) // 2).astype(np.float32)
+                energies.append(float(np.dot(samples, samples)) / max(1, samples.size))
+                peaks.append(int(np.max(np.abs(samples))) if samples.size else 0)
+                pcm.write(block)
+
+            if process.wait() != 0:
+                raise subprocess.SubprocessError(f"ffmpeg no pudo decodificar: {_read_errors(errors)}")
+
+        return energies, peaks
+
+    def _encode(self, pcm_path: str, output_path: str, first: int, last: int, gain: float):
+        import numpy as np
+
+        command = (['ffmpeg', '-v', 'error', '-y'] + self._pcm_format() + ['-i', 'pipe:0',
+                   '-map_metadata', '-1', '-b:a', self.config.bitrate, '-f', 'mp3', output_path])
+
+        with tempfile.TemporaryFile() as errors, open(pcm_path, 'rb') as pcm, \
+                subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=errors) as process:
+            try:
+                pcm.seek(first * self.block_bytes)
+                for _ in range(last - first):
+                    block = pcm.read(self.block_bytes)
+                    if not block:
+                        break
+                    samples = np.frombuffer(block, dtype=np.int16, count=len(block) // 2)
+                    if gain != 1.0:
+                        samples = np.clip(samples * gain, -FULL_SCALE, FULL_SCALE - 1).astype(np.int16)
+                    process.stdin.write(samples.tobytes())
+                process.stdin.close()
+            except BrokenPipeError:
+                # ffmpeg terminó antes de tiempo: el error queda en su salida
+                pass
+
+            if process.wait() != 0:
+                raise subprocess.SubprocessError(f"ffmpeg no pudo codificar: {_read_errors(errors)}")
+
+
+def _read_errors(errors: IO[bytes]) -> str:
+    errors.seek(0)
+    return errors.read().decode(errors='replace').strip()
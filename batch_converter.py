@@ -0,0 +1,303 @@
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, List, Optional
+
+from audio_manager import AudioManager
+from config import Config
+from metrics import metrics
+from pdf_processor import PDFProcessor
+from synthesis_scheduler import ChapterPlan, ChunkTask, FairTaskQueue
+
+logger = logging.getLogger(__name__)
+
+_EXTRACTION_STAGES = ('extraction', 'cleaning', 'chapter_split')
+_EXTRACTION_COUNTERS = ('pages_extracted_total', 'characters_extracted_total', 'boilerplate_characters_removed_total')
+
+
+def _extract_book(pdf_path: str, config: Config) -> Dict:
+    """Extrae un PDF y lo divide en capítulos en un proceso aparte.
+
+    Devuelve también los tiempos y contadores del proceso, que el principal suma a sus métricas.
+    """
+    metrics.reset()
+    processor = PDFProcessor(config)
+    metadata = processor.extract_text_with_metadata(pdf_path)
+    chapters = processor.split_into_chapters(metadata.pop('text'), metadata.get('outline'))
+
+    return {
+        'metadata': metadata,
+        'chapters': chapters,
+        'stages': {stage: metrics.stage_seconds(stage) for stage in _EXTRACTION_STAGES},
+        'counters': {name: metrics.counter(name) for name in _EXTRACTION_COUNTERS},
+    }
+
+
+@dataclass
+class BookJob:
+    index: int
+    pdf_path: str
+    output_path: str
+    status: str = 'pending'
+    error: Optional[str] = None
+    metadata: Dict = field(default_factory=dict)
+    chapters: List[Dict] = field(default_factory=list)
+    chapter_paths: List[str] = field(default_factory=list)
+    plans: Dict[int, ChapterPlan] = field(default_factory=dict)
+    outcomes: Dict[int, bool] = field(default_factory=dict)
+    chunk_results: Dict[int, List[bool]] = field(default_factory=dict)
+    pending_chunks: Dict[int, int] = field(default_factory=dict)
+    results: Dict = field(default_factory=dict)
+    extraction_seconds: float = 0.0
+    finished_at: float = 0.0
+
+
+class BatchConverter:
+    """Convierte todos los PDFs de un directorio con una sola cola de síntesis.
+
+    Los libros se extraen en un pool de procesos y, según terminan, sus chunks
+    entran en una `FairTaskQueue` común: los workers del motor TTS van tomando
+    trabajo de cada libro por turnos, así que los libros cortos terminan pronto
+    aunque haya uno enorme en el lote, y la síntesis empieza en cuanto está
+    listo el primer libro.
+    """
+
+    REPORT_NAME = 'batch_report.json'
+
+    def __init__(self, config: Config = None):
+        self.config = config or Config()
+        self.config.setup_directories()
+        self.audio_manager = AudioManager(self.config)
+        self.logger = logger
+        self._lock = threading.Lock()
+
+    def discover(self, directory: str, recursive: bool = True) -> List[str]:
+        pdfs = []
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            pdfs.extend(os.path.join(root, name) for name in sorted(files) if name.lower().endswith('.pdf'))
+            if not recursive:
+                break
+        return pdfs
+
+    def convert_directory(self, directory: str, output_dir: str = None, recursive: bool = True,
+                          on_book_done: Callable[[Dict], None] = None) -> Dict:
+        start = time.perf_counter()
+        output_dir = output_dir or self.config.output_dir
+        pdfs = self.discover(directory, recursive)
+        self.logger.info(f"Modo lote: {len(pdfs)} PDFs encontrados en {directory}")
+
+        books = []
+        for i, pdf_path in enumerate(pdfs):
+            base_name = os.path.splitext(os.path.basename(pdf_path))[0]
+            # Un directorio por libro: los nombres de capítulo se repiten entre libros
+            book_dir = os.path.join(output_dir, f"{i + 1:03d}_{self.audio_manager._sanitize_filename(base_name)}")
+            books.append(BookJob(i, pdf_path, os.path.join(book_dir, f"{base_name}_audiobook.mp3")))
+
+        owners = {}
+        queue = FairTaskQueue()
+        scheduler = self.audio_manager._create_scheduler(self.config.tts.language)
+        self.audio_manager._start_book(0)
+
+        def record(task: ChunkTask, success: bool):
+            book = owners[task.output_path]
+            with self._lock:
+                book.chunk_results[task.chapter_index][task.chunk_index] = success
+                book.pending_chunks[task.chapter_index] -= 1
+                if book.pending_chunks[task.chapter_index]:
+                    return
+            self._finish_chapter(book, book.plans[task.chapter_index], start, on_book_done)
+
+        synthesis = threading.Thread(target=self._synthesize, args=(scheduler, queue, record), daemon=True)
+        completed = False
+
+        try:
+            with ProcessPoolExecutor(max_workers=self._extraction_workers(len(books))) as executor:
+                extraction_config = self._extraction_config()
+                futures = {executor.submit(_extract_book, book.pdf_path, extraction_config): book for book in books}
+                submitted = time.perf_counter()
+                # El hilo de síntesis arranca después de crear los procesos de extracción
+                synthesis.start()
+
+                for future in as_completed(futures):
+                    book = futures[future]
+                    book.extraction_seconds = time.perf_counter() - submitted
+                    try:
+                        extracted = future.result()
+                    except Exception as e:
+                        self.logger.error(f"Error extrayendo {book.pdf_path}: {e}")
+                        book.status = 'error'
+                        book.error = str(e)
+                        book.finished_at = time.perf_counter() - start
+                        if on_book_done:
+                            on_book_done(self._book_report(book))
+                        continue
+
+                    for stage, seconds in extracted['stages'].items():
+                        metrics.add_time(stage, seconds)
+                    for name, value in extracted['counters'].items():
+                        metrics.increment(name, value)
+                    self._enqueue_book(book, extracted, queue, owners, start, on_book_done)
+            completed = True
+        finally:
+            # Tras un error o Ctrl-C no se empiezan los chunks que quedan en cola
+            queue.close(discard=not completed)
+            if synthesis.is_alive():
+                synthesis.join()
+
+        self.audio_manager._log_rate_control()
+        self.audio_manager._log_cache_stats()
+
+        report = self._build_report(books, time.perf_counter() - start)
+        os.makedirs(output_dir, exist_ok=True)
+        report_path = os.path.join(output_dir, self.REPORT_NAME)
+        with open(report_path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        report['report_path'] = report_path
+        return report
+
+    def _synthesize(self, scheduler, queue: FairTaskQueue, record: Callable[[ChunkTask, bool], None]):
+        try:
+            with metrics.stage('synthesis'):
+                scheduler.run_queue(queue, record)
+        except Exception as e:
+            self.logger.error(f"Error en la cola de síntesis del lote: {e}")
+
+    def _extraction_workers(self, books: int) -> int:
+        workers = self.config.processing.batch_extraction_workers or os.cpu_count() or 1
+        return max(1, min(workers, books))
+
+    def _extraction_config(self) -> Config:
+        # Los libros ya se reparten entre procesos: cada uno extrae sus páginas en serie
+        config = copy.copy(self.config)
+        config.processing = replace(self.config.processing, extraction_workers=1)
+        return config
+
+    def _enqueue_book(self, book: BookJob, extracted: Dict, queue: FairTaskQueue, owners: Dict[str, BookJob],
+                      start: float, on_book_done: Callable[[Dict], None] = None):
+        book.metadata = extracted['metadata']
+        book.chapters = extracted['chapters']
+        os.makedirs(os.path.dirname(book.output_path), exist_ok=True)
+        chunk_dir = os.path.join(self.audio_manager.temp_dir, f"libro_{book.index + 1:03d}")
+        os.makedirs(chunk_dir, exist_ok=True)
+
+        for i, chapter in enumerate(book.chapters):
+            chapter_path = self.audio_manager._chapter_path(i, chapter['title'], book.output_path)
+            book.chapter_paths.append(chapter_path)
+            plan = self.audio_manager._plan_chapter(i, chapter['title'], chapter['content'], chapter_path,
+                                                    chunk_dir=chunk_dir)
+            if plan is None:
+                book.outcomes[i] = False
+                continue
+
+            book.plans[i] = plan
+            book.chunk_results[i] = [False] * len(plan.tasks)
+            book.pending_chunks[i] = len(plan.tasks)
+            for task in plan.tasks:
+                owners[task.output_path] = book
+
+        book.status = 'converting'
+        self.logger.info(
+            f"Libro en cola: {book.metadata.get('title')} ({len(book.chapters)} capítulos, "
+            f"{sum(len(plan.tasks) for plan in book.plans.values())} chunks)"
+        )
+
+        if not book.plans:
+            self._finish_book(book, start, on_book_done)
+            return
+
+        if self.audio_manager.rate_controller is not None:
+            self.audio_manager.rate_controller.add_book(sum(len(plan.tasks) for plan in book.plans.values()))
+        # Dentro de cada libro, los capítulos más largos primero, como en la conversión individual
+        queue.put(book.index, [task for plan in sorted(book.plans.values(), key=lambda plan: plan.characters,
+                                                          reverse=True)
+                               for task in plan.tasks])
+
+    def _finish_chapter(self, book: BookJob, plan: ChapterPlan, start: float,
+                        on_book_done: Callable[[Dict], None] = None):
+        success = self.audio_manager._finish_chapter(plan, book.chunk_results[plan.index])
+        with self._lock:
+            book.outcomes[plan.index] = success
+            if len(book.outcomes) < len(book.chapters):
+                return
+        self._finish_book(book, start, on_book_done)
+
+    def _finish_book(self, book: BookJob, start: float, on_book_done: Callable[[Dict], None] = None):
+        results = {'successful': [], 'failed': [], 'total_chapters': len(book.chapters)}
+
+        if self.config.audio.output_mode in ('single', 'both') and any(book.outcomes.values()):
+            writer = self.audio_manager._create_audiobook_writer(book.chapters, book.output_path, book.metadata)
+            try:
+                self.audio_manager._stream_chapters(writer, book.chapter_paths, book.outcomes, {'next': 0})
+            except Exception as e:
+                self.logger.error(f"Error creando el audiolibro único de {book.pdf_path}: {e}")
+                writer.abort()
+            else:
+                results['audiobook'] = self.audio_manager._close_audiobook(writer, book.chapter_paths, book.outcomes)
+
+        self.audio_manager._collect_results(book.chapters, book.chapter_paths, book.outcomes, results)
+        book.results = results
+        book.chapters = [{'title': chapter['title'], 'words': chapter.get('words', 0)} for chapter in book.chapters]
+        book.plans = {}
+        book.finished_at = time.perf_counter() - start
+
+        if not results['failed']:
+            book.status = 'ok'
+        elif results['successful']:
+            book.status = 'partial'
+        else:
+            book.status = 'failed'
+
+        self.logger.info(
+            f"Libro terminado ({book.status}): {book.pdf_path} - "
+            f"{len(results['successful'])}/{len(book.chapters)} capítulos"
+        )
+        if on_book_done:
+            on_book_done(self._book_report(book))
+
+    def _book_report(self, book: BookJob) -> Dict:
+        results = book.results or {}
+        audiobook = results.get('audiobook')
+        return {
+            'pdf_path': book.pdf_path,
+            'output_path': audiobook['file_path'] if audiobook else os.path.dirname(book.output_path),
+            'status': book.status,
+            'error': book.error,
+            'title': book.metadata.get('title'),
+            'author': book.metadata.get('author'),
+            'pages': book.metadata.get('pages', 0),
+            'characters': book.metadata.get('characters', 0),
+            'chapters': len(book.chapters),
+            'successful': len(results.get('successful', [])),
+            'failed': [chapter['title'] for chapter in results.get('failed', [])],
+            'duration': sum(chapter['duration'] for chapter in results.get('successful', [])),
+            'extraction_seconds': round(book.extraction_seconds, 3),
+            'finished_seconds': round(book.finished_at, 3),
+        }
+
+    def _build_report(self, books: List[BookJob], elapsed: float) -> Dict:
+        entries = [self._book_report(book) for book in books]
+        characters = sum(entry['characters'] for entry in entries)
+
+        summary = {
+            'books': len(entries),
+            'ok': sum(1 for entry in entries if entry['status'] == 'ok'),
+            'partial': sum(1 for entry in entries if entry['status'] == 'partial'),
+            'failed': sum(1 for entry in entries if entry['status'] in ('failed', 'error', 'pending')),
+            'chapters': sum(entry['chapters'] for entry in entries),
+            'successful_chapters': sum(entry['successful'] for entry in entries),
+            'characters': characters,
+            'duration': sum(entry['duration'] for entry in entries),
+            'seconds': round(elapsed, 3),
+            'characters_per_second': characters / elapsed if elapsed > 0 else 0.0,
+        }
+        self.logger.info(
+            f"Lote completado: {summary['ok']} libros correctos, {summary['partial']} parciales, "
+            f"{summary['failed']} fallidos en {elapsed:.1f}s"
+        )
+        return {'summary': summary, 'books': entries}
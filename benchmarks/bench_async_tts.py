@@ -0,0 +1,76 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gtts.tts
+
+from audio_manager import AudioManager
+from config import Config
+from fake_translate_server import FakeTranslateServer
+from tts_engine import GoogleTTSEngine
+
+
+def build_chapters(count: int, sentences: int):
+    sentence = "Esta es una oración de prueba para el servidor local. "
+    return [
+        {"title": f"Capítulo {i + 1}", "content": sentence * sentences, "words": sentences * 9}
+        for i in range(count)
+    ]
+
+
+def run(server: FakeTranslateServer, chapters, engine_type: str, workers: int) -> dict:
+    config = Config()
+    config.cache.enabled = False
+    config.tts.engine = engine_type
+    config.tts.max_workers = workers
+    config.tts.max_in_flight = workers
+    config.tts.google_endpoint = server.endpoint
+
+    engine = GoogleTTSEngine() if engine_type == 'google' else None
+    manager = AudioManager(config, engine=engine)
+    before = dict(server.stats)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        results = manager.convert_chapters_to_audio(chapters, os.path.join(output_dir, "libro.mp3"))
+        elapsed = time.perf_counter() - start
+
+    return {
+        'engine': engine_type,
+        'seconds': elapsed,
+        'successful': len(results['successful']),
+        'requests': server.stats['requests'] - before['requests'],
+        'connections': server.stats['connections'] - before['connections'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="gTTS síncrono frente al motor asíncrono con pool keep-alive")
+    parser.add_argument("--chapters", type=int, default=8)
+    parser.add_argument("--sentences", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--connect-latency", type=float, default=0.1,
+                        help="Coste simulado de abrir una conexión (TCP + TLS)")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    server = FakeTranslateServer(latency=args.latency, connect_latency=args.connect_latency).start()
+    # gTTS no permite cambiar la URL: se redirige al servidor local solo en este benchmark
+    gtts.tts._translate_url = lambda tld="com", path="": server.endpoint
+
+    chapters = build_chapters(args.chapters, args.sentences)
+    for engine_type in ('google', 'google_async'):
+        result = run(server, chapters, engine_type, args.workers)
+        print(f"{result['engine']:<13} {result['seconds']:6.2f}s  "
+              f"{result['requests']} peticiones en {result['connections']} conexiones  "
+              f"({result['successful']}/{len(chapters)} capítulos)")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
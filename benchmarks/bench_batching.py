@@ -0,0 +1,77 @@
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_manager import AudioManager
+from config import Config
+from tts_engine import FakeTTSEngine
+
+
+def build_chapters(count: int, sentences: int):
+    """Libro de muchos capítulos cortos: poemas, relatos breves, entradas de diccionario..."""
+    sentence = "Una entrada breve del libro. "
+    return [
+        {"title": f"Capítulo {i + 1}", "content": sentence * (sentences + i % 4), "words": sentences * 5}
+        for i in range(count)
+    ]
+
+
+class CountingFakeEngine(FakeTTSEngine):
+    """FakeTTSEngine que cuenta las llamadas reales al motor (synthesize pasa por synthesize_batch)"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = 0
+
+    def synthesize_batch(self, items):
+        self.calls += 1
+        return super().synthesize_batch(items)
+
+
+def run(chapters, batch_size: int, workers: int, latency: float, overhead: float) -> dict:
+    config = Config()
+    config.cache.enabled = False
+    config.tts.max_workers = workers
+    config.tts.batch_size = batch_size
+    engine = CountingFakeEngine(latency=latency, call_overhead=overhead)
+    manager = AudioManager(config, engine=engine)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        results = manager.convert_chapters_to_audio(chapters, os.path.join(output_dir, "libro.mp3"))
+        elapsed = time.perf_counter() - start
+
+    return {
+        'batch_size': batch_size,
+        'seconds': elapsed,
+        'successful': len(results['successful']),
+        'calls': engine.calls,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Síntesis por lotes en libros con muchos capítulos cortos")
+    parser.add_argument("--chapters", type=int, default=120)
+    parser.add_argument("--sentences", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.01, help="Tiempo de síntesis por chunk")
+    parser.add_argument("--overhead", type=float, default=0.1, help="Coste fijo de cada llamada al motor")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    chapters = build_chapters(args.chapters, args.sentences)
+    for batch_size in args.batch_sizes:
+        result = run(chapters, batch_size, args.workers, args.latency, args.overhead)
+        print(f"batch_size={result['batch_size']:>2}  {result['seconds']:6.2f}s  "
+              f"{result['calls']} llamadas al motor  "
+              f"({result['successful']}/{len(chapters)} capítulos)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_rules import page_engine, text_engine
+
+
+def legacy_clean_text(text: str) -> str:
+    """Cadena original de TextCleaner.clean_text, usada como referencia"""
+    for pattern in [r'\n\d+\s*\n', r'Página\s*\d+', r'©.*\n', r'www\..*\.com']:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE)
+    text = re.sub(r'([.!?])([A-Z])', r'\1 \2', text)
+    text = re.sub(r'\s+([,.!?;:])', r'\1', text)
+    text = re.sub(r'(\w)\n(\w)', r'\1 \2', text)
+    text = re.sub(r'([.!?])\s*', r'\1\n\n', text)
+    text = re.sub(r' +', ' ', text)
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    return text.strip()
+
+
+def legacy_clean_page(text: str) -> str:
+    """Limpieza original de PDFProcessor._clean_page_text, usada como referencia"""
+    if not text:
+        return ""
+    text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
+    text = re.sub(r'(\w+)-\n(\w+)', r'\1\2', text)
+    text = re.sub(r'\n+', '\n', text)
+    return text.strip()
+
+
+WORDS = ("el la los una canción año libro capítulo texto lectura voz página "
+         "historia tiempo ciudad noche Madrid Ana Pedro dijo entonces").split()
+
+
+def build_page(rnd: random.Random, number: int) -> str:
+    lines = [f"Mi Libro de Prueba    Página {number}", ""]
+    for _ in range(rnd.randint(25, 40)):
+        words = [rnd.choice(WORDS) for _ in range(rnd.randint(6, 14))]
+        line = " ".join(words)
+        ending = rnd.random()
+        if ending < 0.15:
+            line += " pala-"
+        elif ending < 0.35:
+            line += "."
+        elif ending < 0.45:
+            line += " ,"
+        elif ending < 0.5:
+            line += ".Otra"
+        lines.append(line)
+        if rnd.random() < 0.05:
+            lines.append("")
+    lines.append("© 2024 Editorial Ejemplo\x0c")
+    lines.append("www.editorial-ejemplo.com")
+    lines.append(str(number))
+    return "\n".join(lines) + "\n"
+
+
+def build_corpus(pages: int, seed: int = 1) -> str:
+    rnd = random.Random(seed)
+    return "".join(build_page(rnd, n + 1) for n in range(pages))
+
+
+def fuzz_inputs(count: int, seed: int = 2):
+    rnd = random.Random(seed)
+    alphabet = ['a', 'Z', 'é', '1', '7', ' ', ' ', '\n', '\n', '\t', '.', ',', '!', '?', ';', ':',
+                '-', '©', 'www.', '.com', 'Página', 'página 3', '\x0c', '\x00', '\r', '\xa0']
+    for _ in range(count):
+        yield ''.join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 40)))
+
+
+def check_equivalence(corpus: str, fuzz_count: int) -> int:
+    """Compara el motor con la cadena original. Devuelve el número de diferencias."""
+    cases = [corpus, corpus[:5000], ""] + list(fuzz_inputs(fuzz_count))
+    differences = 0
+
+    for text in cases:
+        if text_engine.apply(text) != legacy_clean_text(text):
+            differences += 1
+            if differences <= 5:
+                print(f"  diferencia en clean_text: {text[:80]!r}")
+        if page_engine.apply(text) != legacy_clean_page(text):
+            differences += 1
+            if differences <= 5:
+                print(f"  diferencia en página: {text[:80]!r}")
+
+    return differences
+
+
+def throughput(function, text: str, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(text)
+        best = min(best, time.perf_counter() - start)
+    return len(text.encode('utf-8')) / best / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark y equivalencia del motor de limpieza")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--fuzz", type=int, default=50000)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.pages)
+    print(f"Corpus: {args.pages} páginas, {len(corpus.encode('utf-8')) / (1024 * 1024):.1f} MB")
+
+    differences = check_equivalence(corpus, args.fuzz)
+    print(f"Equivalencia: {args.fuzz + 3} casos, {differences} diferencias")
+
+    print(f"clean_text  original: {throughput(legacy_clean_text, corpus, args.repeat):7.1f} MB/s  "
+          f"motor: {throughput(text_engine.apply, corpus, args.repeat):7.1f} MB/s")
+    print(f"página      original: {throughput(legacy_clean_page, corpus, args.repeat):7.1f} MB/s  "
+          f"motor: {throughput(page_engine.apply, corpus, args.repeat):7.1f} MB/s")
+
+    sys.exit(1 if differences else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from pdf_processor import PDFProcessor
+
+
+def run(pdf_path: str, workers: int) -> dict:
+    config = Config()
+    config.processing.extraction_workers = workers
+    if workers == 1:
+        config.processing.parallel_min_pages = sys.maxsize
+    processor = PDFProcessor(config)
+
+    start = time.perf_counter()
+    metadata = processor.extract_text_with_metadata(pdf_path)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'workers': workers,
+        'seconds': elapsed,
+        'pages_per_second': metadata['pages'] / elapsed,
+        'characters': metadata['characters'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de extracción de texto serie vs. paralela")
+    parser.add_argument("pdf_path")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    reference = None
+    for workers in args.workers:
+        result = run(args.pdf_path, workers)
+        if reference is None:
+            reference = result['characters']
+        status = "ok" if result['characters'] == reference else "DIFERENTE"
+        print(f"workers={result['workers']:>2}  {result['seconds']:.2f}s  "
+              f"{result['pages_per_second']:.1f} páginas/s  ({status})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gtts.tts
+
+from fake_translate_server import FakeTranslateServer
+from tts_engine import GoogleTTSEngine
+
+SENTENCE = "La conversión pide cada fragmento del texto al servicio de voz por separado. "
+
+
+def measure(engine: GoogleTTSEngine, text: str, repeat: int, output_dir: str) -> tuple:
+    path = os.path.join(output_dir, f"chunk_{engine.parallel_parts}.mp3")
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if not engine.synthesize(text, path):
+            raise RuntimeError("La síntesis falló")
+        timings.append(time.perf_counter() - start)
+
+    with open(path, 'rb') as f:
+        return min(timings), f.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia por chunk del motor google con fragmentos en paralelo")
+    parser.add_argument("--chars", type=int, default=4000, help="Tamaño del chunk")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--parallel", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    server = FakeTranslateServer(latency=args.latency, connect_latency=0.0).start()
+    # gTTS no permite cambiar la URL: se redirige al servidor local solo en este benchmark
+    gtts.tts._translate_url = lambda tld="com", path="": server.endpoint
+
+    text = (SENTENCE * (args.chars // len(SENTENCE) + 1))[:args.chars]
+    reference = None
+    with tempfile.TemporaryDirectory() as output_dir:
+        for parallel in args.parallel:
+            engine = GoogleTTSEngine(parallel_parts=parallel, endpoint=server.endpoint)
+            before = server.stats['requests']
+            seconds, audio = measure(engine, text, args.repeat, output_dir)
+            parts = (server.stats['requests'] - before) // args.repeat
+            engine.close()
+
+            reference = reference or audio
+            print(f"parallel_parts={parallel:>2}  {seconds:6.3f}s por chunk  "
+                  f"{parts} fragmentos  audio {'idéntico' if audio == reference else 'DISTINTO'}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
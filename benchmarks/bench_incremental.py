@@ -0,0 +1,80 @@
+import argparse
+import contextlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_book import generate_book
+
+from main import Config, PDFToAudiobookConverter
+from metrics import metrics
+
+
+def convert(pdf_path: str, output_path: str, mode: str, incremental: bool) -> dict:
+    config = Config()
+    config.tts.engine = 'fake'
+    config.cache.enabled = False
+    config.metrics.enabled = False
+    config.audio.output_mode = mode
+
+    start = time.perf_counter()
+    # La salida de rich (paneles, tablas y barras de progreso) no interesa aquí
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        success = PDFToAudiobookConverter(config).convert(pdf_path, output_path, incremental=incremental)
+    return {
+        'success': success,
+        'seconds': time.perf_counter() - start,
+        'synthesized': int(metrics.counter('tts_chunks_total')),
+        'reused': int(metrics.counter('tts_calls_avoided_total')),
+    }
+
+
+def journal_status(output_path: str) -> str:
+    journal_dir = os.path.splitext(output_path)[0] + "_journal"
+    with open(os.path.join(journal_dir, "journal.json"), encoding='utf-8') as f:
+        status = json.load(f)['status']
+    if os.path.exists(os.path.join(journal_dir, "chunks")):
+        status += ", con chunks sin borrar"
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la reconversión incremental con el motor fake")
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--chapter-every", type=int, default=10)
+    parser.add_argument("--modes", nargs="+", default=["chapters", "single", "both"])
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    failed = False
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        original = os.path.join(temp_dir, "libro.pdf")
+        # Las mismas páginas con la última más corta: solo cambia el final del último capítulo
+        edited = os.path.join(temp_dir, "libro_editado.pdf")
+        generate_book(original, args.pages, chapter_every=args.chapter_every)
+        generate_book(edited, args.pages - 1, chapter_every=args.chapter_every)
+
+        for mode in args.modes:
+            output_path = os.path.join(temp_dir, mode, "libro.mp3")
+            full = convert(original, output_path, mode, incremental=False)
+            rerun = convert(edited, output_path, mode, incremental=True)
+            status = journal_status(output_path)
+
+            print(f"{mode:9s} completa: {full['synthesized']:4d} chunks en {full['seconds']:.2f} s | "
+                  f"incremental: {rerun['reused']:4d} reutilizados, {rerun['synthesized']:4d} sintetizados "
+                  f"en {rerun['seconds']:.2f} s | diario: {status}")
+
+            if not (full['success'] and rerun['success']) or rerun['reused'] == 0 or status != 'completed':
+                failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
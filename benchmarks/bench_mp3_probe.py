@@ -0,0 +1,70 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mp3_utils import concatenate_mp3, probe_mp3, silent_mp3
+
+SAMPLE_RATE = 24000
+FRAME_SAMPLES = 576
+
+
+def build_catalog(directory: str, files: int, seed: int = 1):
+    """Mitad de archivos con cabecera Info (concatenados) y mitad sin ella, como los de gTTS"""
+    rnd = random.Random(seed)
+    catalog = []
+    pieces = [os.path.join(directory, f"pieza_{i}.mp3") for i in range(4)]
+    for path in pieces:
+        with open(path, "wb") as f:
+            f.write(silent_mp3(rnd.uniform(5, 30), SAMPLE_RATE))
+
+    for i in range(files):
+        path = os.path.join(directory, f"capitulo_{i:05d}.mp3")
+        if i % 2:
+            stats = concatenate_mp3(rnd.sample(pieces, rnd.randint(1, 4)), path)
+            expected = stats['duration']
+        else:
+            data = silent_mp3(rnd.uniform(10, 120), SAMPLE_RATE)
+            with open(path, "wb") as f:
+                f.write(data)
+            expected = len(data) // 96 * FRAME_SAMPLES / SAMPLE_RATE
+        catalog.append((path, expected))
+    return catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la lectura de duraciones MP3 por cabeceras")
+    parser.add_argument("--files", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        catalog = build_catalog(directory, args.files)
+        total_mb = sum(os.path.getsize(path) for path, _ in catalog) / (1024 * 1024)
+        print(f"Catálogo: {len(catalog)} archivos, {total_mb:.0f} MB")
+
+        errors = 0
+        by_method = {}
+        for path, expected in catalog:
+            start = time.perf_counter()
+            info = probe_mp3(path)
+            elapsed = time.perf_counter() - start
+
+            seconds, count = by_method.get(info['method'], (0.0, 0))
+            by_method[info['method']] = (seconds + elapsed, count + 1)
+            if abs(info['duration'] - expected) > 1e-6:
+                errors += 1
+
+        for method, (seconds, count) in sorted(by_method.items()):
+            print(f"{method:8s} {count:6d} archivos  {count / seconds:9.0f} archivos/s")
+        total_seconds = sum(seconds for seconds, _ in by_method.values())
+        print(f"Total: {len(catalog) / total_seconds:.0f} archivos/s, {errors} duraciones distintas de las esperadas")
+
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_manager import AudioManager
+from bench_async_tts import build_chapters
+from config import Config
+from fake_translate_server import FakeTranslateServer
+from metrics import metrics
+
+# Modos comparados: sin reintentos (comportamiento anterior), reintentos con
+# concurrencia fija y reintentos con control adaptativo de la concurrencia
+MODES = {
+    'sin_control': {'max_attempts': 1, 'adaptive_concurrency': False},
+    'reintentos': {'max_attempts': 5, 'adaptive_concurrency': False},
+    'adaptativo': {'max_attempts': 5, 'adaptive_concurrency': True},
+}
+
+
+def run(server: FakeTranslateServer, chapters, mode: str, in_flight: int) -> dict:
+    config = Config()
+    config.cache.enabled = False
+    config.tts.engine = 'google_async'
+    config.tts.max_in_flight = in_flight
+    config.tts.google_endpoint = server.endpoint
+    config.retry.base_delay = 0.1
+    for name, value in MODES[mode].items():
+        setattr(config.retry, name, value)
+
+    manager = AudioManager(config)
+    before = dict(server.stats)
+    metrics.reset()
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        results = manager.convert_chapters_to_audio(chapters, os.path.join(output_dir, "libro.mp3"))
+        elapsed = time.perf_counter() - start
+
+    return {
+        'mode': mode,
+        'seconds': elapsed,
+        'successful': len(results['successful']),
+        'requests': server.stats['requests'] - before['requests'],
+        'throttled': server.stats['throttled'] - before['throttled'],
+        'errors': server.stats['errors'] - before['errors'],
+        'retries': metrics.counter('tts_retries_total'),
+        'limit': int(manager.rate_controller.limit),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversión contra un servicio que limita la tasa (429/503)")
+    parser.add_argument("--chapters", type=int, default=6)
+    parser.add_argument("--sentences", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--capacity", type=int, default=4, help="Peticiones simultáneas que admite el servicio")
+    parser.add_argument("--error-rate", type=float, default=0.005)
+    parser.add_argument("--in-flight", type=int, default=16)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    server = FakeTranslateServer(latency=args.latency, connect_latency=0.0, capacity=args.capacity,
+                                 error_rate=args.error_rate).start()
+
+    chapters = build_chapters(args.chapters, args.sentences)
+    for mode in MODES:
+        result = run(server, chapters, mode, args.in_flight)
+        print(f"{result['mode']:<12} {result['seconds']:6.2f}s  "
+              f"{result['successful']}/{len(chapters)} capítulos  "
+              f"{result['requests']} peticiones, {result['throttled']} respuestas 429, "
+              f"{result['errors']} 503, {result['retries']:.0f} reintentos, límite final {result['limit']}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_manager import AudioManager
+from config import Config
+from tts_engine import FakeTTSEngine
+
+
+def build_chapters(count: int, words: int):
+    chapters = []
+    for i in range(count):
+        length = words * (1 + (i * 7) % 5)
+        content = " ".join(["Esta es una oración de prueba."] * (length // 6))
+        chapters.append({"title": f"Capítulo {i + 1}", "content": content, "words": length})
+    return chapters
+
+
+def run(workers: int, chapters, latency: float) -> dict:
+    config = Config()
+    config.tts.max_workers = workers
+    config.cache.enabled = False
+    manager = AudioManager(config, engine=FakeTTSEngine(latency=latency))
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        results = manager.convert_chapters_to_audio(chapters, os.path.join(output_dir, "libro.mp3"))
+        elapsed = time.perf_counter() - start
+
+    return {
+        'workers': workers,
+        'seconds': elapsed,
+        'successful': len(results['successful']),
+        'characters_per_second': sum(len(c['content']) for c in chapters) / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del planificador de síntesis")
+    parser.add_argument("--chapters", type=int, default=12)
+    parser.add_argument("--words", type=int, default=1500)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    chapters = build_chapters(args.chapters, args.words)
+    for workers in args.workers:
+        result = run(workers, chapters, args.latency)
+        print(f"workers={result['workers']:>2}  {result['seconds']:.2f}s  "
+              f"{result['characters_per_second']:.0f} caracteres/s  "
+              f"({result['successful']}/{len(chapters)} capítulos)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentence_splitter import SentenceSplitter
+
+WORDS = ("el la los una de con por para tiempo ciudad noche camino historia palabra silencio "
+         "ventana montaña recuerdo biblioteca capitán estación invierno canción lectura").split()
+NAMES = "García Pérez Ruiz Torres Molina Ortega".split()
+# Abreviaturas que cortaban la oración con los separadores anteriores
+INSERTS = ("el Sr. {name}", "la Dra. {name}", "la pág. {n}", "el vol. {n}", "la Sra. {name}",
+           "el año {n} a. C.", "J. R. {name}", "el Prof. {name}", "EE. UU.")
+
+
+def legacy_split(text: str):
+    """PDFProcessor._split_into_sentences original, usado como referencia"""
+    sentences = re.split(r'([.!?]+\s+)', text)
+    result = []
+    i = 0
+    while i < len(sentences):
+        if i + 1 < len(sentences) and re.match(r'^[.!?]+\s+$', sentences[i + 1]):
+            result.append(sentences[i] + sentences[i + 1])
+            i += 2
+        else:
+            if sentences[i].strip():
+                result.append(sentences[i])
+            i += 1
+    return [s.strip() for s in result if s.strip()]
+
+
+def load_nltk():
+    """sent_tokenize de NLTK si sus datos ya están instalados; nunca descarga nada"""
+    try:
+        from nltk.tokenize import sent_tokenize
+        sent_tokenize("Prueba.", language='spanish')
+    except (ImportError, LookupError):
+        return None
+    return lambda text: sent_tokenize(text, language='spanish')
+
+
+def build_sentences(count: int, seed: int = 1):
+    rnd = random.Random(seed)
+    sentences = []
+    for _ in range(count):
+        words = [rnd.choice(WORDS) for _ in range(rnd.randint(6, 18))]
+        words[0] = words[0].capitalize()
+        if rnd.random() < 0.3:
+            insert = rnd.choice(INSERTS).format(name=rnd.choice(NAMES), n=rnd.randint(2, 400))
+            words.insert(rnd.randint(1, len(words) - 1), insert)
+        sentence = " ".join(words)
+        if rnd.random() < 0.1:
+            sentence = "¿" + sentence + "?"
+        else:
+            sentence += rnd.choice("....!")
+        sentences.append(sentence)
+    return sentences
+
+
+def accuracy(function, sentences, text: str) -> float:
+    expected = set(sentences)
+    return sum(1 for sentence in function(text) if sentence in expected) / len(sentences)
+
+
+def throughput(function, text: str, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in function(text):
+            pass
+        best = min(best, time.perf_counter() - start)
+    return len(text.encode('utf-8')) / best / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del separador de oraciones")
+    parser.add_argument("--sentences", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sentences = build_sentences(args.sentences)
+    text = " ".join(sentences)
+    print(f"Corpus: {len(sentences)} oraciones, {len(text.encode('utf-8')) / (1024 * 1024):.1f} MB")
+
+    splitter = SentenceSplitter('es')
+    candidates = [("regex original", legacy_split), ("separador nuevo", splitter.iter_sentences)]
+    nltk_split = load_nltk()
+    if nltk_split is None:
+        print("NLTK sent_tokenize: no disponible (faltan nltk o los datos 'punkt')")
+    else:
+        candidates.insert(1, ("NLTK sent_tokenize", nltk_split))
+
+    for name, function in candidates:
+        print(f"{name:20s} {throughput(function, text, args.repeat):7.1f} MB/s  "
+              f"oraciones correctas: {accuracy(function, sentences, text):6.1%}")
+
+
+if __name__ == "__main__":
+    main()
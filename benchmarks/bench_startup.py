@@ -0,0 +1,79 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from synthetic_book import generate_book
+
+# Módulos que no deben cargarse solo por importar main
+HEAVY_MODULES = ('PyPDF2', 'gtts', 'pyttsx3', 'requests', 'nltk', 'asyncio', 'multiprocessing')
+
+SHORT_JOB = """
+import logging, sys
+sys.path.insert(0, {root!r})
+logging.disable(logging.CRITICAL)
+import main
+config = main.Config()
+config.tts.engine = 'fake'
+config.cache.enabled = False
+config.metrics.enabled = False
+converter = main.PDFToAudiobookConverter(config)
+sys.exit(0 if converter.convert({pdf!r}, {output!r}) else 1)
+"""
+
+def cold_run(args: list, runs: int) -> float:
+    """Mediana del tiempo de reloj de `python <args>` en procesos nuevos"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=ROOT, capture_output=True, check=False)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def loaded_heavy_modules() -> list:
+    code = (f"import sys; sys.path.insert(0, {ROOT!r}); import main; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True).stdout
+    return [name for name in output.strip().split(',') if name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del arranque en frío de main.py")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--help-target", type=float, default=0.3,
+                        help="Tiempo máximo en segundos para `main.py --help`")
+    parser.add_argument("--job-target", type=float, default=2.0,
+                        help="Tiempo máximo en segundos para convertir un PDF de dos páginas con el motor fake")
+    args = parser.parse_args()
+
+    baseline = cold_run(["-c", "pass"], args.runs)
+    help_seconds = cold_run(["main.py", "--help"], args.runs)
+    batch_help_seconds = cold_run(["main.py", "batch", "--help"], args.runs)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = os.path.join(temp_dir, "corto.pdf")
+        generate_book(pdf_path, 2, chapter_every=1)
+        code = SHORT_JOB.format(root=ROOT, pdf=pdf_path, output=os.path.join(temp_dir, "corto.mp3"))
+        job_seconds = cold_run(["-c", code], args.runs)
+
+    heavy = loaded_heavy_modules()
+
+    print(f"Intérprete vacío:      {baseline:.3f} s")
+    print(f"main.py --help:        {help_seconds:.3f} s (objetivo {args.help_target:.2f} s)")
+    print(f"main.py batch --help:  {batch_help_seconds:.3f} s")
+    print(f"Trabajo corto (fake):  {job_seconds:.3f} s (objetivo {args.job_target:.2f} s)")
+    print(f"Backends cargados por `import main`: {', '.join(heavy) or 'ninguno'}")
+
+    failed = help_seconds > args.help_target or job_seconds > args.job_target or heavy
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tts_engine import FakeTTSEngine, PyTTSX3Engine, TTSWorkerPool
+
+SENTENCE = "El sistema de síntesis convierte cada fragmento de texto en un archivo de audio. "
+
+
+def run(engine, chunks, workers: int) -> float:
+    with tempfile.TemporaryDirectory() as output_dir:
+        def synthesize(i: int) -> bool:
+            return engine.synthesize(chunks[i], os.path.join(output_dir, f"chunk_{i:03d}.mp3"))
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(synthesize, range(len(chunks))))
+        elapsed = time.perf_counter() - start
+
+    if not all(results):
+        print(f"  {results.count(False)} chunks fallidos")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pyttsx3 en un solo proceso frente al pool de procesos precalentados")
+    parser.add_argument("--chunks", type=int, default=16)
+    parser.add_argument("--sentences", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--engine", choices=['pyttsx3', 'fake'], default='pyttsx3',
+                        help="'fake' simula 0.2 s por chunk para probar el pool sin voces instaladas")
+    args = parser.parse_args()
+
+    if args.engine == 'pyttsx3':
+        engine_class, options = PyTTSX3Engine, {}
+    else:
+        engine_class, options = FakeTTSEngine, {'latency': 0.2}
+
+    chunks = [f"Fragmento {i + 1}. " + SENTENCE * args.sentences for i in range(args.chunks)]
+
+    start = time.perf_counter()
+    try:
+        single = engine_class(**options)
+    except Exception as e:
+        print(f"No se pudo inicializar {args.engine}: {e}")
+        return
+    print(f"1 proceso:   inicialización {time.perf_counter() - start:6.2f}s  "
+          f"síntesis {run(single, chunks, 1):6.2f}s")
+
+    start = time.perf_counter()
+    pool = TTSWorkerPool(engine_class, options, workers=args.workers)
+    startup = time.perf_counter() - start
+    try:
+        print(f"{args.workers} procesos: inicialización {startup:6.2f}s  "
+              f"síntesis {run(pool, chunks, args.workers):6.2f}s")
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
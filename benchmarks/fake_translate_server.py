@@ -0,0 +1,157 @@
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mp3_utils import silent_mp3
+
+TRANSLATE_PATH = "/_/TranslateWebserverUi/data/batchexecute"
+
+
+class FakeTranslateHandler(BaseHTTPRequestHandler):
+    """Imita el endpoint batchexecute que usa gTTS: devuelve MP3 en base64"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.count('connections')
+        # Coste de establecer una conexión nueva (TCP + TLS con el servidor real)
+        if self.server.connect_latency:
+            time.sleep(self.server.connect_latency)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length).decode('utf-8')
+
+        if urllib.parse.urlparse(self.path).path != TRANSLATE_PATH:
+            self._reply(404, b"not found")
+            return
+
+        try:
+            rpc = json.loads(urllib.parse.parse_qs(body)['f.req'][0])
+            text = json.loads(rpc[0][0][1])[0]
+        except (KeyError, IndexError, ValueError):
+            self._reply(400, b"bad request")
+            return
+
+        self.server.count('requests')
+        if not self.server.admit():
+            # Como el servicio real: rechaza con 429 cuando hay demasiadas peticiones a la vez
+            self.server.count('throttled')
+            self._reply(429, b"too many requests", headers={'Retry-After': str(self.server.retry_after)})
+            return
+        try:
+            if self.server.latency:
+                time.sleep(self.server.latency * (1 + self.server.overload()))
+        finally:
+            self.server.release()
+
+        if self.server.error_rate and self.server.random() < self.server.error_rate:
+            self.server.count('errors')
+            self._reply(503, b"service unavailable")
+            return
+
+        audio = base64.b64encode(silent_mp3(max(len(text), 1) / 15.0)).decode('ascii')
+        payload = f')]}}\'\n\n[["wrb.fr","jQ1olc","[\\"{audio}\\"]",null,null,null,"generic"]]\n'
+        self._reply(200, payload.encode('utf-8'), "application/json; charset=utf-8")
+
+    def _reply(self, status: int, body: bytes, content_type: str = "text/plain", headers: dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeTranslateServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    """`capacity` limita las peticiones simultáneas (el resto recibe 429) y, por
+    encima de la mitad de la capacidad, la latencia crece con la carga.
+    `error_rate` es la fracción de respuestas 503 aleatorias."""
+
+    def __init__(self, port: int = 0, latency: float = 0.05, connect_latency: float = 0.1,
+                 capacity: int = None, error_rate: float = 0.0, retry_after: int = 1, seed: int = 1):
+        super().__init__(("127.0.0.1", port), FakeTranslateHandler)
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.active = 0
+        self.stats = {'connections': 0, 'requests': 0, 'throttled': 0, 'errors': 0}
+        self._stats_lock = threading.Lock()
+        self._random = random.Random(seed)
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}{TRANSLATE_PATH}"
+
+    def count(self, name: str):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def admit(self) -> bool:
+        with self._stats_lock:
+            if self.capacity is not None and self.active >= self.capacity:
+                return False
+            self.active += 1
+            return True
+
+    def release(self):
+        with self._stats_lock:
+            self.active -= 1
+
+    def overload(self) -> float:
+        """Fracción de carga por encima de la mitad de la capacidad (0 si no hay límite)"""
+        if self.capacity is None:
+            return 0.0
+        with self._stats_lock:
+            return max(0.0, (self.active - self.capacity / 2) / (self.capacity / 2))
+
+    def random(self) -> float:
+        with self._stats_lock:
+            return self._random.random()
+
+    def start(self) -> "FakeTranslateServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local que imita el endpoint de Google TTS")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--connect-latency", type=float, default=0.1)
+    parser.add_argument("--capacity", type=int, default=None,
+                        help="Peticiones simultáneas antes de responder 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de respuestas 503")
+    args = parser.parse_args()
+
+    server = FakeTranslateServer(args.port, args.latency, args.connect_latency,
+                                 capacity=args.capacity, error_rate=args.error_rate)
+    print(f"Escuchando en {server.endpoint}")
+    print("Configura tts.engine = 'google_async' y tts.google_endpoint con esta URL")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
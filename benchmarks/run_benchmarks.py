@@ -0,0 +1,203 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PyPDF2
+
+from audio_manager import AudioManager
+from config import Config
+from mp3_utils import concatenate_mp3
+from pdf_processor import PDFProcessor
+from synthetic_book import generate_book
+from tts_engine import FakeTTSEngine
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def megabytes(text: str) -> float:
+    return len(text.encode('utf-8')) / (1024 * 1024)
+
+
+def bench_extraction(processor: PDFProcessor, pdf_path: str) -> tuple:
+    metadata, seconds = timed(lambda: processor.extract_text_with_metadata(pdf_path))
+    return metadata, {
+        'seconds': seconds,
+        'pages_per_second': metadata['pages'] / seconds,
+        'characters': metadata['characters'],
+    }
+
+
+def bench_cleaning(processor: PDFProcessor, pdf_path: str) -> dict:
+    with open(pdf_path, 'rb') as file:
+        raw_pages = [page.extract_text() or '' for page in PyPDF2.PdfReader(file).pages]
+
+    def clean():
+        pages = (processor._clean_page_text(page) for page in raw_pages if page)
+        return '\n\n'.join(processor.iter_text_lines(pages))
+
+    text, seconds = timed(clean)
+    raw_size = sum(megabytes(page) for page in raw_pages)
+    return {
+        'seconds': seconds,
+        'megabytes_per_second': raw_size / seconds,
+        'characters': len(text),
+    }
+
+
+def bench_chapter_split(processor: PDFProcessor, metadata: dict) -> tuple:
+    chapters, outline_seconds = timed(lambda: processor.split_into_chapters(metadata['text'], metadata['outline']))
+    fallback, pattern_seconds = timed(lambda: processor.split_into_chapters(metadata['text']))
+    return chapters, {
+        'seconds': outline_seconds,
+        'chapters': len(chapters),
+        'pattern_seconds': pattern_seconds,
+        'pattern_chapters': len(fallback),
+    }
+
+
+def bench_chunking(processor: PDFProcessor, chapters: list) -> tuple:
+    chunks, seconds = timed(lambda: [processor.split_text_into_chunks(c['content']) for c in chapters])
+    return chunks, {
+        'seconds': seconds,
+        'chunks': sum(len(c) for c in chunks),
+    }
+
+
+def bench_synthesis(config: Config, chapters: list, engine: FakeTTSEngine, output_dir: str) -> dict:
+    manager = AudioManager(config, engine=engine)
+    results, seconds = timed(
+        lambda: manager.convert_chapters_to_audio(chapters, os.path.join(output_dir, "libro.mp3"))
+    )
+    characters = sum(len(c['content']) for c in chapters)
+    return {
+        'seconds': seconds,
+        'workers': config.tts.max_workers,
+        'successful': len(results['successful']),
+        'failed': len(results['failed']),
+        'characters_per_second': characters / seconds,
+    }
+
+
+def bench_concatenation(chunks: list, work_dir: str) -> dict:
+    engine = FakeTTSEngine()
+    groups = []
+    for index, chapter_chunks in enumerate(chunks):
+        if len(chapter_chunks) < 2:
+            continue
+        paths = []
+        for j, text in enumerate(chapter_chunks):
+            path = os.path.join(work_dir, f"chunk_{index:04d}_{j:03d}.mp3")
+            engine.synthesize(text, path)
+            paths.append(path)
+        groups.append((paths, os.path.join(work_dir, f"capitulo_{index:04d}.mp3")))
+
+    start = time.perf_counter()
+    written = 0
+    for paths, output_path in groups:
+        written += concatenate_mp3(paths, output_path)['bytes']
+    seconds = time.perf_counter() - start
+
+    return {
+        'seconds': seconds,
+        'chapters': len(groups),
+        'megabytes_per_second': written / (1024 * 1024) / seconds if seconds else 0.0,
+    }
+
+
+def run_size(pages: int, args, work_dir: str) -> dict:
+    pdf_path = os.path.join(work_dir, f"libro_{pages}.pdf")
+    generate_book(pdf_path, pages, seed=args.seed)
+
+    config = Config()
+    config.cache.enabled = False
+    config.tts.engine = 'fake'
+    config.tts.max_workers = args.workers
+    processor = PDFProcessor(config)
+    engine = FakeTTSEngine(latency=args.latency, jitter=args.jitter, seed=args.seed)
+
+    stages = {}
+    metadata, stages['extraction'] = bench_extraction(processor, pdf_path)
+    stages['cleaning'] = bench_cleaning(processor, pdf_path)
+    chapters, stages['chapter_split'] = bench_chapter_split(processor, metadata)
+    chunks, stages['chunking'] = bench_chunking(processor, chapters)
+
+    synthesis_dir = os.path.join(work_dir, f"audio_{pages}")
+    os.makedirs(synthesis_dir)
+    stages['synthesis'] = bench_synthesis(config, chapters, engine, synthesis_dir)
+
+    concat_dir = os.path.join(work_dir, f"concat_{pages}")
+    os.makedirs(concat_dir)
+    stages['concatenation'] = bench_concatenation(chunks, concat_dir)
+
+    return stages
+
+
+def compare(results: dict, baseline: dict):
+    print("\nComparación con la referencia (tiempo actual / referencia):")
+    for pages, stages in results['sizes'].items():
+        previous = baseline.get('sizes', {}).get(pages)
+        if not previous:
+            continue
+        for stage, values in stages.items():
+            if stage in previous and previous[stage]['seconds']:
+                ratio = values['seconds'] / previous[stage]['seconds']
+                print(f"  {pages:>5} páginas  {stage:<14} {ratio:5.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks por etapa con libros sintéticos y TTS simulado")
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--latency", type=float, default=0.02, help="Latencia simulada por chunk (s)")
+    parser.add_argument("--jitter", type=float, default=0.01, help="Variación máxima de la latencia (s)")
+    parser.add_argument("--workers", type=int, default=Config().tts.max_workers)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="JSON de una ejecución anterior para comparar")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    results = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'parameters': {
+            'latency': args.latency,
+            'jitter': args.jitter,
+            'workers': args.workers,
+            'seed': args.seed,
+        },
+        'sizes': {},
+    }
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for pages in args.pages:
+            stages = run_size(pages, args, work_dir)
+            results['sizes'][str(pages)] = stages
+            print(f"{pages} páginas")
+            for stage, values in stages.items():
+                print(f"  {stage:<14} {values['seconds']:8.3f}s")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import argparse
+import random
+from typing import Iterator, List
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+WORDS = (
+    "el la los las un una de del en con por para sobre entre tiempo ciudad noche "
+    "mañana camino historia palabra silencio ventana montaña recuerdo biblioteca "
+    "capitán estación invierno canción lectura memoria extraordinario desconocido "
+    "rápidamente escribió caminaba pensamiento conversación habitación compañero"
+).split()
+
+LINE_WIDTH = 90
+LINES_PER_PAGE = 46
+
+
+def _words(rnd: random.Random) -> Iterator[str]:
+    while True:
+        sentence = [rnd.choice(WORDS) for _ in range(rnd.randint(6, 18))]
+        sentence[0] = sentence[0].capitalize()
+        sentence[-1] += rnd.choice(".....,;?!")
+        yield from sentence
+
+
+def _lines(rnd: random.Random) -> Iterator[str]:
+    """Líneas justificadas a la izquierda con guiones de partición al final de algunas"""
+    words = _words(rnd)
+    carry = None
+
+    while True:
+        line = carry or next(words)
+        carry = None
+
+        while True:
+            word = next(words)
+            if len(line) + 1 + len(word) <= LINE_WIDTH:
+                line += " " + word
+                continue
+
+            if len(word) >= 8 and rnd.random() < 0.4:
+                cut = rnd.randint(3, len(word) - 3)
+                line += " " + word[:cut] + "-"
+                carry = word[cut:]
+            else:
+                carry = word
+            break
+
+        yield line
+
+
+def generate_book(path: str, pages: int, chapter_every: int = 10, seed: int = 1,
+                  title: str = "Libro Sintético", author: str = "Autor de Prueba",
+                  outline: bool = True) -> List[int]:
+    """Genera un PDF de `pages` páginas y devuelve las páginas donde empieza cada capítulo"""
+    rnd = random.Random(seed)
+    lines = _lines(rnd)
+    width, height = A4
+
+    pdf = canvas.Canvas(path, pagesize=A4)
+    pdf.setTitle(title)
+    pdf.setAuthor(author)
+    chapter_pages = []
+
+    for page in range(pages):
+        pdf.setFont("Helvetica", 8)
+        pdf.drawString(50, height - 30, f"{title} - {author}")
+
+        y = height - 60
+        remaining = LINES_PER_PAGE
+        if page % chapter_every == 0:
+            number = len(chapter_pages) + 1
+            heading = f"Capítulo {number}"
+            chapter_pages.append(page)
+            if outline:
+                pdf.bookmarkPage(f"capitulo-{number}")
+                pdf.addOutlineEntry(heading, f"capitulo-{number}", level=0)
+            pdf.setFont("Helvetica-Bold", 16)
+            pdf.drawString(50, y, heading)
+            y -= 36
+            remaining -= 3
+
+        pdf.setFont("Helvetica", 10)
+        for _ in range(remaining):
+            pdf.drawString(50, y, next(lines))
+            y -= 15
+
+        pdf.setFont("Helvetica", 8)
+        pdf.drawCentredString(width / 2, 25, str(page + 1))
+        pdf.showPage()
+
+    pdf.save()
+    return chapter_pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera un libro PDF sintético para benchmarks")
+    parser.add_argument("output_path")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--chapter-every", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-outline", action="store_true", help="Sin marcadores (fuerza la detección por patrones)")
+    args = parser.parse_args()
+
+    chapters = generate_book(args.output_path, args.pages, args.chapter_every, args.seed,
+                             outline=not args.no_outline)
+    print(f"{args.output_path}: {args.pages} páginas, {len(chapters)} capítulos")
+
+
+if __name__ == "__main__":
+    main()
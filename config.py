@@ -1,6 +1,6 @@
 import os
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 
 
 @dataclass
@@ -9,6 +9,18 @@ class AudioConfig:
     bitrate: str = "192k"
     sample_rate: int = 44100
     channels: int = 2
+    # "chapters": un MP3 por capítulo; "single": un único MP3 con marcas de
+    # capítulo (ID3 CHAP/CTOC) en la ruta de salida; "both": ambos
+    output_mode: str = "chapters"
+    # Postproceso de cada chunk con ffmpeg y NumPy: iguala el volumen, recorta el
+    # silencio de los extremos y recodifica con bitrate, sample_rate y channels
+    postprocess: bool = False
+    target_loudness_db: float = -20.0
+    silence_threshold_db: float = -45.0
+    # Silencio que se conserva en cada extremo al recortar
+    keep_silence_ms: int = 150
+    # Chunks que se postprocesan a la vez (0 = uno por núcleo)
+    postprocess_workers: int = 0
 
 
 @dataclass
@@ -16,6 +28,51 @@ class TTSConfig:
     language: str = "es"
     slow: bool = False
     max_chunk_length: int = 4000
+    engine: str = "google"
+    max_workers: int = 4
+    # Peticiones simultáneas para motores asíncronos (google_async)
+    max_in_flight: int = 16
+    # Endpoint alternativo de Google TTS, p. ej. un servidor local de pruebas
+    google_endpoint: Optional[str] = None
+    # Fragmentos de ~100 caracteres que el motor google pide a la vez (1 = gTTS.save secuencial).
+    # Usa el formato interno de gTTS; si cambia, el motor vuelve solo a gTTS.save
+    google_parallel_parts: int = 1
+    # Chunks cortos por llamada al motor (1 = sin lotes); un lote no pasa de max_chunk_length
+    batch_size: int = 8
+    # Procesos del pool pyttsx3_pool (0 = uno por núcleo) y espera máxima por chunk
+    offline_workers: int = 0
+    offline_timeout: float = 120.0
+
+
+@dataclass
+class CacheConfig:
+    enabled: bool = True
+    directory: str = ".tts_cache"
+    max_size_mb: int = 2048
+    # Metadatos y capítulos extraídos de cada PDF, por hash del contenido (interfaz web)
+    extraction_directory: str = ".extraction_cache"
+
+
+@dataclass
+class RetryConfig:
+    max_attempts: int = 5
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+    # Espera máxima que se acepta de una cabecera Retry-After
+    max_retry_after: float = 300.0
+    # Presupuesto de reintentos por libro: budget_ratio por chunk, como mínimo min_budget
+    budget_ratio: float = 0.5
+    min_budget: int = 20
+    adaptive_concurrency: bool = True
+    min_concurrency: int = 1
+    latency_tolerance: float = 3.0
+
+
+@dataclass
+class MetricsConfig:
+    enabled: bool = True
+    # Ruta fija para el recolector de archivos de texto de Prometheus; por defecto junto a la salida
+    prometheus_path: Optional[str] = None
 
 
 @dataclass
@@ -23,6 +80,14 @@ class ProcessingConfig:
     chapter_patterns: List[str] = None
     remove_footnotes: bool = True
     normalize_spaces: bool = True
+    extraction_workers: int = 0
+    parallel_min_pages: int = 64
+    # Procesos que extraen libros a la vez en el modo lote (0 = uno por núcleo)
+    batch_extraction_workers: int = 0
+    # Cabeceras y pies repetidos: líneas del borde de cada página que se examinan
+    # y fracción mínima de páginas en que deben aparecer (0 desactiva la detección)
+    header_footer_lines: int = 2
+    header_footer_fraction: float = 0.5
 
     def __post_init__(self):
         if self.chapter_patterns is None:
@@ -30,8 +95,10 @@ class ProcessingConfig:
                 r'^CAP[ÍI]TULO\s+\d+',
                 r'^Capítulo\s+\d+',
                 r'^CHAPTER\s+\d+',
-                r'^\d+\.',
-                r'^[IVXLCDM]+\.',
+                # "1. Introducción", "IV. El regreso": solo líneas cortas que siguen en
+                # mayúscula y no son una frase, para no confundirlas con listas numeradas
+                r'^\d{1,3}\.(?:\s+(?-i:[A-ZÁÉÍÓÚÑ])[^.!?]{0,60})?$',
+                r'^(?-i:[IVXLCDM]+)\.(?:\s+(?-i:[A-ZÁÉÍÓÚÑ])[^.!?]{0,60})?$',
                 r'^SECCI[ÓO]N\s+\d+',
                 r'^Parte\s+\d+',
             ]
@@ -42,6 +109,9 @@ class Config:
         self.audio = AudioConfig()
         self.tts = TTSConfig()
         self.processing = ProcessingConfig()
+        self.cache = CacheConfig()
+        self.retry = RetryConfig()
+        self.metrics = MetricsConfig()
         self.output_dir = "outputs"
 
     def setup_directories(self):
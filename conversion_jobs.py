@@ -0,0 +1,282 @@
+import copy
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from audio_manager import AudioManager
+from config import Config
+from conversion_journal import write_json_atomic
+from conversion_manifest import postprocess_settings
+from mp3_utils import probe_mp3
+from pdf_processor import PDFProcessor
+
+logger = logging.getLogger(__name__)
+
+
+def split_file(path: str, part_bytes: int) -> List[str]:
+    """Trocea un archivo en partes de como mucho `part_bytes` (nombre.001, nombre.002...).
+
+    Las partes se escriben en una carpeta junto al archivo y solo se crean una
+    vez; unidas en orden devuelven el archivo original byte a byte.
+    """
+    parts_dir = f"{path}_partes"
+    if not os.path.isdir(parts_dir):
+        name = os.path.basename(path)
+        parts = max(1, -(-os.path.getsize(path) // part_bytes))
+        temp_dir = f"{parts_dir}.{uuid.uuid4().hex}.tmp"
+        os.makedirs(temp_dir)
+        try:
+            with open(path, 'rb') as src:
+                for number in range(1, parts + 1):
+                    with open(os.path.join(temp_dir, f"{name}.{number:03d}"), 'wb') as dst:
+                        remaining = part_bytes
+                        while remaining:
+                            block = src.read(min(remaining, 1024 * 1024))
+                            if not block:
+                                break
+                            dst.write(block)
+                            remaining -= len(block)
+            try:
+                os.rename(temp_dir, parts_dir)
+            except OSError:
+                # Otra sesión terminó de trocearlo a la vez
+                if not os.path.isdir(parts_dir):
+                    raise
+        finally:
+            if os.path.isdir(temp_dir):
+                shutil.rmtree(temp_dir)
+        logger.info(f"{name} troceado en {parts} partes de hasta {part_bytes / (1024 * 1024):.0f} MB")
+
+    return [os.path.join(parts_dir, name) for name in sorted(os.listdir(parts_dir))]
+
+
+class ExtractionCache:
+    """Metadatos y capítulos extraídos de un PDF, guardados en disco por hash del contenido"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.logger = logger
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(content_hash: str, config: Config) -> str:
+        processing = config.processing
+        payload = json.dumps({
+            'pdf': content_hash,
+            'chapter_patterns': processing.chapter_patterns,
+            'remove_footnotes': processing.remove_footnotes,
+            'normalize_spaces': processing.normalize_spaces,
+            'header_footer_lines': processing.header_footer_lines,
+            'header_footer_fraction': processing.header_footer_fraction,
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Extracción en caché ilegible {key[:12]}: {e}")
+            return None
+
+    def put(self, key: str, metadata: Dict, chapters: List[Dict]):
+        try:
+            write_json_atomic(self._path(key), {'metadata': metadata, 'chapters': chapters})
+        except OSError as e:
+            self.logger.warning(f"No se pudo guardar la extracción {key[:12]}: {e}")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+
+@dataclass
+class ConversionJob:
+    key: str
+    filename: str
+    output_path: str
+    # queued | extracting | converting | done | error
+    status: str = 'queued'
+    from_cache: bool = False
+    metadata: Dict = field(default_factory=dict)
+    chapters: List[Dict] = field(default_factory=list)
+    # Índice de capítulo -> archivo de audio, o None si falló
+    finished: Dict[int, Optional[str]] = field(default_factory=dict)
+    # Índice de capítulo -> duración en segundos, leída una vez al terminar
+    durations: Dict[int, float] = field(default_factory=dict)
+    results: Optional[Dict] = None
+    error: Optional[str] = None
+    zip_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def running(self) -> bool:
+        return self.status in ('queued', 'extracting', 'converting')
+
+    @property
+    def progress(self) -> float:
+        if self.status == 'done':
+            return 1.0
+        if not self.chapters:
+            return 0.0
+        return len(self.finished) / len(self.chapters)
+
+
+class ConversionJobManager:
+    """Conversiones en segundo plano para la interfaz web.
+
+    Cada trabajo se identifica por el hash del PDF subido y la configuración de
+    la conversión: volver a enviar el mismo archivo (otra ejecución del script,
+    otra sesión) devuelve el trabajo en curso o terminado en lugar de empezar
+    de nuevo. La extracción se guarda en disco por hash, así que también se
+    reutiliza entre reinicios del servidor.
+    """
+
+    def __init__(self, output_dir: str = "streamlit_outputs", max_workers: int = 2, config: Config = None):
+        config = config or Config()
+        self.output_dir = output_dir
+        self.extraction_cache = ExtractionCache(config.cache.extraction_directory)
+        self.logger = logger
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="conversion")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def job_key(content_hash: str, config: Config) -> str:
+        settings = json.dumps({
+            'pdf': content_hash,
+            'extraction': ExtractionCache.make_key(content_hash, config),
+            'engine': config.tts.engine,
+            'language': config.tts.language,
+            'slow': config.tts.slow,
+            'max_chunk_length': config.tts.max_chunk_length,
+            'output_mode': config.audio.output_mode,
+            'postprocess': postprocess_settings(config) if config.audio.postprocess else None,
+        }, sort_keys=True)
+        return hashlib.sha256(settings.encode('utf-8')).hexdigest()
+
+    def submit(self, content: bytes, filename: str, config: Config) -> ConversionJob:
+        content_hash = hashlib.sha256(content).hexdigest()
+        key = self.job_key(content_hash, config)
+
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.status != 'error':
+                return job
+
+            output_path = os.path.join(self.output_dir, key[:16], f"{Path(filename).stem}_audiobook.mp3")
+            job = ConversionJob(key=key, filename=filename, output_path=output_path)
+            self._jobs[key] = job
+
+        # La configuración de la interfaz cambia en cada ejecución del script: el trabajo usa una copia
+        self._executor.submit(self._run, job, content, content_hash, copy.deepcopy(config))
+        return job
+
+    def get(self, key: str) -> Optional[ConversionJob]:
+        with self._lock:
+            return self._jobs.get(key)
+
+    def build_zip(self, key: str) -> str:
+        """ZIP sin compresión con todos los capítulos de un trabajo terminado.
+
+        Se escribe en disco bloque a bloque y se guarda junto al trabajo, así que
+        solo se crea una vez aunque se pida desde varias sesiones.
+        """
+        job = self.get(key)
+        if job is None or job.status != 'done':
+            raise ValueError("El trabajo no ha terminado")
+
+        zip_path = os.path.join(os.path.dirname(job.output_path), f"{Path(job.filename).stem}_capitulos.zip")
+        with job.zip_lock:
+            if os.path.exists(zip_path):
+                return zip_path
+
+            temp_path = f"{zip_path}.{uuid.uuid4().hex}.tmp"
+            try:
+                # Los MP3 ya están comprimidos: ZIP_STORED evita gastar CPU para nada
+                with zipfile.ZipFile(temp_path, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+                    for chapter in job.results['successful']:
+                        archive.write(chapter['file_path'], os.path.basename(chapter['file_path']))
+                os.replace(temp_path, zip_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+        self.logger.info(f"ZIP de capítulos creado: {zip_path} ({os.path.getsize(zip_path) / (1024 * 1024):.1f} MB)")
+        return zip_path
+
+    def _run(self, job: ConversionJob, content: bytes, content_hash: str, config: Config):
+        audio_manager = None
+        try:
+            os.makedirs(os.path.dirname(job.output_path), exist_ok=True)
+
+            job.status = 'extracting'
+            metadata, chapters = self._extract(job, content, content_hash, config)
+            audio_manager = AudioManager(config)
+
+            job.metadata = metadata
+            job.chapters = [
+                {
+                    'title': chapter['title'],
+                    'words': chapter.get('words', 0),
+                    'duration_estimate': audio_manager._estimate_duration(chapter['content']),
+                }
+                for chapter in chapters
+            ]
+            job.status = 'converting'
+
+            def on_chapter(index: int, path: Optional[str]):
+                if path:
+                    try:
+                        job.durations[index] = probe_mp3(path)['duration']
+                    except (OSError, ValueError) as e:
+                        self.logger.warning(f"No se pudo leer la duración de {path}: {e}")
+                        job.durations[index] = 0.0
+                job.finished[index] = path
+
+            job.results = audio_manager.convert_chapters_to_audio(
+                chapters, job.output_path, book=metadata, on_chapter=on_chapter
+            )
+            job.status = 'done'
+            self.logger.info(f"Trabajo {job.key[:12]} terminado: {job.filename}")
+
+        except Exception as e:
+            self.logger.error(f"Error en el trabajo {job.key[:12]} ({job.filename}): {e}")
+            job.error = str(e)
+            job.status = 'error'
+
+        finally:
+            # Sesiones HTTP, procesos de síntesis y pools del trabajo: el servidor sigue vivo
+            if audio_manager is not None:
+                audio_manager.close()
+
+    def _extract(self, job: ConversionJob, content: bytes, content_hash: str, config: Config):
+        cache_key = ExtractionCache.make_key(content_hash, config)
+        cached = self.extraction_cache.get(cache_key)
+        if cached is not None:
+            self.logger.info(f"Extracción reutilizada de la caché: {job.filename}")
+            job.from_cache = True
+            return cached['metadata'], cached['chapters']
+
+        pdf_path = os.path.join(os.path.dirname(job.output_path), "original.pdf")
+        with open(pdf_path, 'wb') as f:
+            f.write(content)
+
+        try:
+            processor = PDFProcessor(config)
+            metadata = processor.extract_text_with_metadata(pdf_path)
+            chapters = processor.split_into_chapters(metadata.pop('text'), metadata.get('outline'))
+        finally:
+            os.remove(pdf_path)
+
+        self.extraction_cache.put(cache_key, metadata, chapters)
+        return metadata, chapters
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from typing import Dict, List
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_VERSION = 1
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_json_atomic(path: str, data):
+    """Escribe JSON en un archivo temporal, lo sincroniza a disco y lo renombra"""
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class ConversionJournal:
+    """Diario por libro que permite reanudar una conversión interrumpida"""
+
+    def __init__(self, output_path: str, config: Config = None):
+        self.config = config or Config()
+        self.output_path = output_path
+        self.directory = os.path.splitext(output_path)[0] + "_journal"
+        self.chunks_dir = os.path.join(self.directory, "chunks")
+        self.state_path = os.path.join(self.directory, "journal.json")
+        self.chapters_path = os.path.join(self.directory, "chapters.json")
+        self.plan_path = os.path.join(self.directory, "plan.json")
+        self.log_path = os.path.join(self.directory, "completed.jsonl")
+        self.logger = logger
+
+        self.metadata = {}
+        self.chapters = []
+        self._completed_chunks = {}
+        self._completed_chapters = {}
+        self._lock = threading.Lock()
+
+    def fingerprint(self, pdf_path: str) -> str:
+        """Huella de la extracción: contenido del PDF y configuración de procesamiento"""
+        processing = self.config.processing
+        settings = json.dumps({
+            'pdf': file_sha256(pdf_path),
+            'chapter_patterns': processing.chapter_patterns,
+            'remove_footnotes': processing.remove_footnotes,
+            'normalize_spaces': processing.normalize_spaces,
+            'header_footer_lines': processing.header_footer_lines,
+            'header_footer_fraction': processing.header_footer_fraction,
+        }, sort_keys=True)
+        return hashlib.sha256(settings.encode('utf-8')).hexdigest()
+
+    def chunk_key(self, text: str) -> str:
+        tts = self.config.tts
+        payload = json.dumps([text, tts.engine, tts.language, tts.slow], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def load(self, fingerprint: str) -> bool:
+        """Carga un diario existente si corresponde a la misma extracción"""
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('version') != JOURNAL_VERSION or state.get('fingerprint') != fingerprint:
+                return False
+
+            with open(self.chapters_path, encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        os.makedirs(self.chunks_dir, exist_ok=True)
+        self.metadata = stored['metadata']
+        self.chapters = stored['chapters']
+        self._completed_chunks = {}
+        self._completed_chapters = {}
+
+        for record in self._read_log():
+            if record.get('type') == 'chunk':
+                self._completed_chunks[record['path']] = record
+            elif record.get('type') == 'chapter':
+                self._completed_chapters[record['path']] = record
+
+        self.logger.info(
+            f"Diario cargado: {len(self._completed_chapters)} capítulos y "
+            f"{len(self._completed_chunks)} chunks completados"
+        )
+        return True
+
+    def start(self, fingerprint: str, metadata: Dict, chapters: List[Dict]):
+        """Inicia un diario nuevo descartando el progreso anterior"""
+        if os.path.exists(self.directory):
+            shutil.rmtree(self.directory)
+        os.makedirs(self.chunks_dir, exist_ok=True)
+
+        self.metadata = {key: value for key, value in metadata.items() if key != 'text'}
+        self.chapters = chapters
+        self._completed_chunks = {}
+        self._completed_chapters = {}
+
+        write_json_atomic(self.chapters_path, {'metadata': self.metadata, 'chapters': chapters})
+        write_json_atomic(self.state_path, {
+            'version': JOURNAL_VERSION,
+            'fingerprint': fingerprint,
+            'status': 'in_progress',
+        })
+        open(self.log_path, 'w').close()
+
+    def record_plan(self, plans):
+        write_json_atomic(self.plan_path, [
+            {
+                'chapter': plan.index,
+                'title': plan.title,
+                'output_path': plan.output_path,
+                'chunks': [
+                    {'path': task.output_path, 'key': self.chunk_key(task.text)}
+                    for task in plan.tasks
+                ],
+            }
+            for plan in plans
+        ])
+
+    def chunk_path(self, chapter_index: int, chunk_index: int) -> str:
+        return os.path.join(self.chunks_dir, f"chunk_{chapter_index + 1:03d}_{chunk_index:03d}.mp3")
+
+    def is_chunk_done(self, path: str, text: str) -> bool:
+        record = self._completed_chunks.get(path)
+        return (record is not None
+                and record['key'] == self.chunk_key(text)
+                and self._matches(path, record['sha256']))
+
+    def record_chunk(self, path: str, text: str):
+        self._append({
+            'type': 'chunk',
+            'path': path,
+            'key': self.chunk_key(text),
+            'sha256': file_sha256(path),
+        }, self._completed_chunks)
+
+    def is_chapter_done(self, path: str, content: str) -> bool:
+        record = self._completed_chapters.get(path)
+        return (record is not None
+                and record['key'] == self.chunk_key(content)
+                and self._matches(path, record['sha256']))
+
+    def record_chapter(self, path: str, content: str):
+        self._append({
+            'type': 'chapter',
+            'path': path,
+            'key': self.chunk_key(content),
+            'sha256': file_sha256(path),
+        }, self._completed_chapters)
+
+    def is_complete(self) -> bool:
+        return len(self._completed_chapters) == len(self.chapters)
+
+    def finish(self):
+        """Marca el diario como completado y libera el audio intermedio"""
+        with open(self.state_path, encoding='utf-8') as f:
+            state = json.load(f)
+        state['status'] = 'completed'
+        write_json_atomic(self.state_path, state)
+
+        if os.path.exists(self.chunks_dir):
+            shutil.rmtree(self.chunks_dir)
+
+    def _append(self, record: Dict, index: Dict):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            index[record['path']] = record
+
+    def _read_log(self):
+        try:
+            with open(self.log_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # Última línea truncada por una interrupción
+                        continue
+        except FileNotFoundError:
+            return
+
+    @staticmethod
+    def _matches(path: str, checksum: str) -> bool:
+        return os.path.exists(path) and file_sha256(path) == checksum
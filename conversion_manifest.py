@@ -0,0 +1,271 @@
+import difflib
+import hashlib
+import json
+import logging
+import os
+import shutil
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+from conversion_journal import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def postprocess_settings(config: Config) -> Dict:
+    """Parámetros del postproceso que cambian el audio producido"""
+    audio = config.audio
+    return {
+        'target_loudness_db': audio.target_loudness_db,
+        'silence_threshold_db': audio.silence_threshold_db,
+        'keep_silence_ms': audio.keep_silence_ms,
+        'bitrate': audio.bitrate,
+        'sample_rate': audio.sample_rate,
+        'channels': audio.channels,
+    }
+
+
+def text_hash(text: str, length: int = 64) -> str:
+    """Hash estable de un texto: no cambia con saltos de línea ni espacios repetidos"""
+    return hashlib.sha256(" ".join(text.split()).encode('utf-8')).hexdigest()[:length]
+
+
+class ConversionManifest:
+    """Qué produjo la última conversión de un libro, para reconvertir solo lo que cambia.
+
+    Guarda por capítulo el hash del contenido y, por chunk, el hash de cada
+    oración y la zona de bytes que ocupa su audio dentro del MP3 del capítulo.
+    En la siguiente conversión, con `incremental`, los capítulos se emparejan
+    con los anteriores y sus oraciones se alinean con difflib: los chunks cuyas
+    oraciones no han cambiado se recortan del MP3 anterior en lugar de volver a
+    sintetizarse.
+    """
+
+    def __init__(self, output_path: str, config: Config = None, incremental: bool = False):
+        self.config = config or Config()
+        self.path = os.path.splitext(output_path)[0] + "_manifest.json"
+        self.incremental = incremental
+        self.logger = logger
+        self.settings = {
+            'engine': self.config.tts.engine,
+            'language': self.config.tts.language,
+            'slow': self.config.tts.slow,
+            'max_chunk_length': self.config.tts.max_chunk_length,
+        }
+        if self.config.audio.postprocess:
+            self.settings['postprocess'] = postprocess_settings(self.config)
+        self.previous = self._load() if incremental else []
+        self.chapters = {}
+        self.stats = {'reused_chapters': 0, 'reused_chunks': 0, 'synthesized_chunks': 0}
+
+    def _load(self) -> List[Dict]:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            self.logger.info("Sin manifiesto anterior: se convierte el libro completo")
+            return []
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Manifiesto ilegible, se ignora: {e}")
+            return []
+
+        if state.get('version') != MANIFEST_VERSION or state.get('settings') != self.settings:
+            self.logger.info("El manifiesto anterior es de otra configuración de voz: se convierte el libro completo")
+            return []
+
+        missing = [entry for entry in state['chapters'] if not self._audio_available(entry)]
+        if missing:
+            self.logger.warning(
+                f"{len(missing)} de {len(state['chapters'])} capítulos del manifiesto anterior ya no tienen "
+                f"su audio ({missing[0]['path']} falta o ha cambiado): se vuelven a sintetizar"
+            )
+        return state['chapters']
+
+    # --- Emparejado de capítulos y chunks ---
+
+    def match_chapters(self, chapters: List[Dict]) -> Dict[int, Dict]:
+        """Empareja cada capítulo nuevo con el anterior que le corresponde por título y posición"""
+        old_titles = [entry['title'] for entry in self.previous]
+        new_titles = [chapter['title'] for chapter in chapters]
+        matcher = difflib.SequenceMatcher(None, old_titles, new_titles, autojunk=False)
+
+        matches = {}
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            # Un título corregido se empareja por posición si el número de capítulos no cambia
+            if tag == 'equal' or (tag == 'replace' and i2 - i1 == j2 - j1):
+                for offset in range(j2 - j1):
+                    matches[j1 + offset] = self.previous[i1 + offset]
+        return matches
+
+    def is_unchanged(self, entry: Optional[Dict], content: str) -> bool:
+        return (entry is not None and entry['hash'] == text_hash(content)
+                and self._audio_available(entry) and all(chunk['end'] is not None for chunk in entry['chunks']))
+
+    def plan_chunks(self, sentences: List[str], entry: Optional[Dict],
+                    max_length: int) -> List[Tuple[List[str], Optional[Dict]]]:
+        """Divide las oraciones en chunks reutilizando los del capítulo anterior que siguen intactos.
+
+        Devuelve (oraciones, chunk anterior o None) por chunk. Las zonas nuevas o
+        modificadas se agrupan igual que `PDFProcessor.split_text_into_chunks`,
+        así que un cambio no desplaza los límites de los chunks siguientes.
+        """
+        hashes = [text_hash(sentence, 16) for sentence in sentences]
+        anchors = []
+        if entry is not None and self._audio_available(entry):
+            anchors = self._anchors(entry, hashes)
+
+        chunks = []
+        position = 0
+        for start, end, old_chunk in anchors + [(len(sentences), len(sentences), None)]:
+            chunks.extend((group, None) for group in self._pack(sentences[position:start], max_length))
+            if old_chunk is not None:
+                chunks.append((sentences[start:end], old_chunk))
+            position = end
+        return chunks
+
+    def _anchors(self, entry: Dict, hashes: List[str]) -> List[Tuple[int, int, Dict]]:
+        old_hashes = []
+        bounds = []
+        for chunk in entry['chunks']:
+            bounds.append((len(old_hashes), len(old_hashes) + len(chunk['sentences']), chunk))
+            old_hashes.extend(chunk['sentences'])
+
+        matcher = difflib.SequenceMatcher(None, old_hashes, hashes, autojunk=False)
+        anchors = []
+        for i1, j1, size in matcher.get_matching_blocks():
+            for start, end, chunk in bounds:
+                # Solo sirven los chunks enteros dentro de un tramo idéntico y con audio
+                if i1 <= start and end <= i1 + size and end > start and chunk['end'] is not None:
+                    anchors.append((j1 + start - i1, j1 + end - i1, chunk))
+        return anchors
+
+    @staticmethod
+    def _pack(sentences: List[str], max_length: int) -> List[List[str]]:
+        groups = []
+        current = []
+        length = 0
+        for sentence in sentences:
+            if current and length + len(sentence) > max_length:
+                groups.append(current)
+                current = []
+                length = 0
+            length += len(sentence) + (1 if current else 0)
+            current.append(sentence)
+        if current:
+            groups.append(current)
+        return groups
+
+    def _audio_available(self, entry: Dict) -> bool:
+        try:
+            return os.path.getsize(entry['path']) == entry['size']
+        except OSError:
+            return False
+
+    # --- Reutilización del audio ---
+
+    def extract_chunk(self, entry: Dict, chunk: Dict, destination: str):
+        """Copia a `destination` el audio de un chunk anterior, recortado del MP3 de su capítulo"""
+        self._copy_range(entry['path'], chunk['start'], chunk['end'], destination)
+
+    def extract_chapter(self, entry: Dict, destination: str):
+        if 'start' in entry:
+            # Modo "single": el capítulo es una zona del audiolibro único
+            self._copy_range(entry['path'], entry['start'], entry['end'], destination)
+        else:
+            shutil.copyfile(entry['path'], destination)
+
+    @staticmethod
+    def _copy_range(path: str, start: int, end: int, destination: str):
+        with open(path, 'rb') as src, open(destination, 'wb') as dst:
+            src.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                block = src.read(min(1024 * 1024, remaining))
+                if not block:
+                    raise ValueError(f"Audio anterior truncado: {path}")
+                dst.write(block)
+                remaining -= len(block)
+
+    # --- Registro de la conversión actual ---
+
+    def record_chapter(self, index: int, title: str, content: str, path: str,
+                       chunks: List[Tuple[List[str], Optional[Tuple[int, int]]]]):
+        """Anota un capítulo terminado: oraciones de cada chunk y su zona de bytes (None si falló)"""
+        self.chapters[index] = {
+            'title': title,
+            'hash': text_hash(content),
+            'path': path,
+            'size': os.path.getsize(path),
+            'chunks': [
+                {
+                    'sentences': [text_hash(sentence, 16) for sentence in sentences],
+                    'start': audio_range[0] if audio_range else None,
+                    'end': audio_range[1] if audio_range else None,
+                }
+                for sentences, audio_range in chunks
+            ],
+        }
+
+    def record_reused(self, index: int, title: str, entry: Dict, path: str):
+        entry = {**entry, 'title': title, 'path': path, 'size': os.path.getsize(path)}
+        if 'start' in entry:
+            # Recortado del audiolibro único: las zonas pasan a contar desde el inicio del capítulo
+            entry['chunks'] = _shift_chunks(entry['chunks'], -entry.pop('start'))
+            del entry['end']
+        self.chapters[index] = entry
+
+    def relocate_to_audiobook(self, audiobook: Dict):
+        """Modo "single": los MP3 de capítulo se borran, así que el audio se leerá del audiolibro.
+
+        Un capítulo cuyas tramas no se copiaron tal cual no tiene zona fiable y
+        sale del manifiesto.
+        """
+        for index in sorted(self.chapters):
+            placement = audiobook['chapter_ranges'].get(index)
+            if placement is None:
+                self.logger.warning(f"Capítulo {index + 1} fuera del manifiesto: su audio no se copió tal cual")
+                del self.chapters[index]
+                continue
+
+            start, end, shift = placement
+            entry = self.chapters[index]
+            self.chapters[index] = {
+                **entry,
+                'path': audiobook['file_path'],
+                'size': audiobook['bytes'],
+                'start': start,
+                'end': end,
+                'chunks': _shift_chunks(entry['chunks'], shift),
+            }
+
+    def save(self):
+        chapters = []
+        for index in sorted(self.chapters):
+            entry = self.chapters[index]
+            if self._audio_available(entry):
+                chapters.append(entry)
+            else:
+                self.logger.warning(f"Capítulo {index + 1} fuera del manifiesto: su audio ya no está en {entry['path']}")
+
+        write_json_atomic(self.path, {
+            'version': MANIFEST_VERSION,
+            'settings': self.settings,
+            'chapters': chapters,
+        })
+
+    @property
+    def tts_calls_avoided(self) -> int:
+        return self.stats['reused_chunks']
+
+
+def _shift_chunks(chunks: List[Dict], shift: int) -> List[Dict]:
+    return [
+        {
+            **chunk,
+            'start': chunk['start'] + shift if chunk['start'] is not None else None,
+            'end': chunk['end'] + shift if chunk['end'] is not None else None,
+        }
+        for chunk in chunks
+    ]
@@ -1,15 +1,17 @@
 import os
 import sys
+import argparse
 import logging
 from datetime import datetime
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
 
-from pdf_processor import PDFProcessor
-from audio_manager import AudioManager
 from config import Config
+from metrics import metrics
+
+# El resto del pipeline (PDF, motores TTS, asyncio, multiprocessing) se importa
+# al usarlo, para que `--help` y los errores de uso respondan al instante.
 
 logging.basicConfig(
     level=logging.INFO,
@@ -26,14 +28,23 @@ console = Console()
 
 class PDFToAudiobookConverter:
     def __init__(self, config: Config = None):
+        from audio_manager import AudioManager
+        from pdf_processor import PDFProcessor
+
         self.config = config or Config()
         self.config.setup_directories()
         self.pdf_processor = PDFProcessor(self.config)
         self.audio_manager = AudioManager(self.config)
 
-    def convert(self, pdf_path: str, output_path: str = None) -> bool:
+    def convert(self, pdf_path: str, output_path: str = None, resume: bool = False,
+                incremental: bool = False) -> bool:
+        from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
+        from conversion_journal import ConversionJournal
+        from conversion_manifest import ConversionManifest
+
         try:
             start_time = datetime.now()
+            metrics.reset()
 
             if not os.path.exists(pdf_path):
                 console.print(f"❌ [red]Error: El archivo {pdf_path} no existe[/red]")
@@ -59,27 +70,47 @@ class PDFToAudiobookConverter:
                     TimeElapsedColumn(),
             ) as progress:
 
+                journal = ConversionJournal(output_path, self.config)
+                fingerprint = journal.fingerprint(pdf_path)
+                resumed = resume and journal.load(fingerprint)
+
                 task1 = progress.add_task("[cyan]Extrayendo texto del PDF...", total=1)
-                metadata = self.pdf_processor.extract_text_with_metadata(pdf_path)
+                if resumed:
+                    console.print("♻️  [cyan]Reanudando conversión desde el diario anterior[/cyan]")
+                    metadata = journal.metadata
+                else:
+                    metadata = self.pdf_processor.extract_text_with_metadata(pdf_path)
                 progress.update(task1, advance=1)
 
                 self._show_document_info(metadata)
 
                 task2 = progress.add_task("[green]Organizando en capítulos...", total=1)
-                chapters = self.pdf_processor.split_into_chapters(metadata['text'])
+                if resumed:
+                    chapters = journal.chapters
+                else:
+                    chapters = self.pdf_processor.split_into_chapters(metadata['text'], metadata.get('outline'))
+                    journal.start(fingerprint, metadata, chapters)
                 progress.update(task2, advance=1)
 
                 task3 = progress.add_task("[yellow]Convirtiendo a audio...", total=len(chapters))
 
                 conversion_results = self.audio_manager.convert_chapters_to_audio(
                     chapters,
-                    output_path
+                    output_path,
+                    journal=journal,
+                    book=metadata,
+                    manifest=ConversionManifest(output_path, self.config, incremental=incremental)
                 )
 
+                if journal.is_complete():
+                    journal.finish()
+
                 for _ in chapters:
                     progress.update(task3, advance=1)
 
             self._show_conversion_results(conversion_results, start_time)
+            if self.config.metrics.enabled:
+                self._show_metrics(self._write_metrics(pdf_path, output_path))
             return len(conversion_results['successful']) > 0
 
         except Exception as e:
@@ -87,6 +118,39 @@ class PDFToAudiobookConverter:
             console.print(f"❌ [red]Error durante la conversión: {e}[/red]")
             return False
 
+    def _write_metrics(self, pdf_path: str, output_path: str) -> dict:
+        base_path = os.path.splitext(output_path)[0]
+        prometheus_path = self.config.metrics.prometheus_path or f"{base_path}_metrics.prom"
+        return metrics.write_report(
+            f"{base_path}_metrics.json",
+            prometheus_path,
+            extra={'pdf_path': pdf_path, 'output_path': output_path}
+        )
+
+    def _show_metrics(self, report: dict):
+        table = Table(show_header=True, header_style="bold cyan")
+        table.add_column("Etapa", style="cyan")
+        table.add_column("Tiempo", style="green", justify="right")
+        table.add_column("Llamadas", style="white", justify="right")
+
+        for stage, values in report['stages'].items():
+            table.add_row(stage, f"{values['seconds']:.2f} s", str(values['calls']))
+
+        latency = report['histograms'].get('tts_latency_seconds', [])
+        calls = sum(series['count'] for series in latency)
+        if calls:
+            p50 = max(series['p50'] for series in latency)
+            p95 = max(series['p95'] for series in latency)
+            table.add_row("latencia TTS p50 / p95", f"{p50:.2f} / {p95:.2f} s", str(calls))
+
+        table.add_row("caracteres/s", f"{report['derived']['characters_per_second']:,.0f}", "")
+        table.add_row("bytes escritos", f"{metrics.counter('audio_bytes_written_total') / (1024 * 1024):.1f} MB", "")
+        table.add_row("reintentos", f"{metrics.counter('tts_retries_total'):.0f}", "")
+        table.add_row("aciertos de caché", f"{report['derived']['cache_hit_rate']:.0%}",
+                      f"{metrics.counter('cache_hits_total'):.0f}")
+
+        console.print(Panel.fit(table, title="⏱️  [bold]MÉTRICAS DE LA CONVERSIÓN[/bold]"))
+
     def _show_document_info(self, metadata: dict):
 
         table = Table(show_header=True, header_style="bold magenta")
@@ -99,6 +163,13 @@ class PDFToAudiobookConverter:
         table.add_row("Caracteres", f"{metadata['characters']:,}")
         table.add_row("Palabras", f"{metadata['words']:,}")
 
+        boilerplate = metadata.get('boilerplate') or {}
+        if boilerplate.get('characters_removed'):
+            table.add_row(
+                "Cabeceras/pies eliminados",
+                f"{boilerplate['characters_removed']:,} caracteres ({len(boilerplate['lines'])} líneas distintas)"
+            )
+
         console.print(Panel.fit(table, title="📊 [bold]INFORMACIÓN DEL DOCUMENTO[/bold]"))
 
     def _show_conversion_results(self, results: dict, start_time: datetime):
@@ -117,7 +188,8 @@ class PDFToAudiobookConverter:
             table = Table(show_header=True, header_style="bold blue")
             table.add_column("Capítulo", style="cyan")
             table.add_column("Archivo", style="white")
-            table.add_column("Duración est.", style="green")
+            table.add_column("Duración", style="green")
+            table.add_column("Bitrate", style="green", justify="right")
             table.add_column("Palabras", style="yellow")
 
             for chapter in results['successful']:
@@ -125,12 +197,29 @@ class PDFToAudiobookConverter:
                 table.add_row(
                     chapter['title'][:30] + "..." if len(chapter['title']) > 30 else chapter['title'],
                     filename,
-                    f"{chapter['duration_estimate']:.1f} min",
+                    f"{chapter['duration'] / 60:.1f} min",
+                    f"{chapter['bitrate']:.0f} kbps",
                     f"{chapter['words']:,}"
                 )
 
             console.print(Panel.fit(table, title="🎵 [bold]ARCHIVOS DE AUDIO GENERADOS[/bold]"))
 
+        audiobook = results.get('audiobook')
+        if audiobook:
+            console.print(
+                f"📀 Audiolibro único: [cyan]{audiobook['file_path']}[/cyan] "
+                f"({audiobook['chapters']} capítulos, {audiobook['duration'] / 60:.1f} min)"
+            )
+
+        incremental = results.get('incremental')
+        if incremental:
+            console.print(
+                f"♻️  Reconversión incremental: [cyan]{incremental['reused_chapters']}[/cyan] capítulos sin cambios, "
+                f"[cyan]{incremental['reused_chunks']}[/cyan] chunks reutilizados, "
+                f"[cyan]{incremental['synthesized_chunks']}[/cyan] sintetizados "
+                f"([green]{incremental['tts_calls_avoided']} llamadas TTS evitadas[/green])"
+            )
+
         if results['failed']:
             console.print(Panel.fit(
                 f"[bold red]CAPÍTULOS CON ERRORES[/bold red]\n" +
@@ -139,6 +228,88 @@ class PDFToAudiobookConverter:
             ))
 
 
+def show_batch_report(report: dict):
+    summary = report['summary']
+    status_styles = {'ok': 'green', 'partial': 'yellow', 'failed': 'red', 'error': 'red', 'pending': 'red'}
+
+    table = Table(show_header=True, header_style="bold blue")
+    table.add_column("Libro", style="cyan")
+    table.add_column("Estado", style="white")
+    table.add_column("Capítulos", style="white", justify="right")
+    table.add_column("Duración", style="green", justify="right")
+    table.add_column("Terminado", style="white", justify="right")
+
+    for book in report['books']:
+        name = os.path.basename(book['pdf_path'])
+        style = status_styles.get(book['status'], 'white')
+        table.add_row(
+            name[:40] + "..." if len(name) > 40 else name,
+            f"[{style}]{book['status']}[/{style}]",
+            f"{book['successful']}/{book['chapters']}",
+            f"{book['duration'] / 60:.1f} min",
+            f"{book['finished_seconds']:.1f} s"
+        )
+
+    console.print(Panel.fit(table, title="📚 [bold]LIBROS DEL LOTE[/bold]"))
+    console.print(Panel.fit(
+        f"[bold green]LOTE COMPLETADO[/bold green]\n"
+        f"⏱️  Duración: [cyan]{summary['seconds']:.1f} s[/cyan]\n"
+        f"📚 Libros: [cyan]{summary['books']}[/cyan] "
+        f"([green]{summary['ok']} correctos[/green], [yellow]{summary['partial']} parciales[/yellow], "
+        f"[red]{summary['failed']} fallidos[/red])\n"
+        f"📑 Capítulos: [cyan]{summary['successful_chapters']}/{summary['chapters']}[/cyan]\n"
+        f"🔤 Caracteres/s: [cyan]{summary['characters_per_second']:,.0f}[/cyan]\n"
+        f"📝 Informe: [cyan]{report['report_path']}[/cyan]",
+        border_style="green" if summary['ok'] == summary['books'] else "yellow"
+    ))
+
+    for book in report['books']:
+        if book['error'] or book['failed']:
+            detail = book['error'] or ", ".join(book['failed'])
+            console.print(f"❌ [red]{os.path.basename(book['pdf_path'])}:[/red] {detail}")
+
+
+def batch_main(argv: list) -> bool:
+    parser = argparse.ArgumentParser(prog="main.py batch",
+                                     description="Convierte todos los PDFs de un directorio")
+    parser.add_argument("directory", help="Directorio con los PDFs")
+    parser.add_argument("--output-dir", help="Directorio de salida (por defecto el de la configuración)")
+    parser.add_argument("--no-recursive", action="store_true", help="No buscar PDFs en subdirectorios")
+    parser.add_argument("--output-mode", choices=["chapters", "single", "both"],
+                        help="Un MP3 por capítulo, un único MP3 con marcas de capítulo, o ambos")
+    parser.add_argument("--postprocess", action="store_true",
+                        help="Iguala el volumen y recorta los silencios de cada fragmento (requiere ffmpeg y NumPy)")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        console.print(f"❌ [red]Error: El directorio {args.directory} no existe[/red]")
+        return False
+
+    config = Config()
+    if args.output_mode:
+        config.audio.output_mode = args.output_mode
+    config.audio.postprocess = args.postprocess
+    metrics.reset()
+
+    def on_book_done(book: dict):
+        style = 'green' if book['status'] == 'ok' else 'yellow' if book['status'] == 'partial' else 'red'
+        console.print(f"📗 [{style}]{book['status']}[/{style}] {os.path.basename(book['pdf_path'])} "
+                      f"({book['successful']}/{book['chapters']} capítulos, {book['finished_seconds']:.1f} s)")
+
+    from batch_converter import BatchConverter
+    converter = BatchConverter(config)
+    report = converter.convert_directory(args.directory, args.output_dir,
+                                         recursive=not args.no_recursive, on_book_done=on_book_done)
+    show_batch_report(report)
+
+    if config.metrics.enabled:
+        base_path = os.path.splitext(report['report_path'])[0]
+        metrics.write_report(f"{base_path}_metrics.json", config.metrics.prometheus_path or f"{base_path}_metrics.prom",
+                             extra={'directory': args.directory})
+
+    return report['summary']['books'] > 0 and report['summary']['ok'] + report['summary']['partial'] > 0
+
+
 def main():
     console.print("\n")
     console.print(Panel.fit(
@@ -147,8 +318,31 @@ def main():
         border_style="yellow"
     ))
 
-    if len(sys.argv) < 2:
-        console.print("[cyan]Uso:[/cyan] python main.py <archivo_pdf> [archivo_salida]")
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        success = batch_main(sys.argv[2:])
+        console.print(Panel.fit(
+            "[bold green]🎊 LOTE TERMINADO[/bold green]" if success else "[bold red]💥 NINGÚN LIBRO CONVERTIDO[/bold red]",
+            border_style="green" if success else "red"
+        ))
+        return
+
+    parser = argparse.ArgumentParser(description="Convierte documentos PDF en audiolibros",
+                                     epilog="Modo lote: python main.py batch <directorio> [--output-dir DIR]")
+    parser.add_argument("pdf_path", nargs="?", help="Archivo PDF a convertir")
+    parser.add_argument("output_path", nargs="?", help="Archivo de salida (opcional)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reanuda una conversión interrumpida usando su diario")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reconvierte solo los capítulos y fragmentos que cambiaron desde la última conversión")
+    parser.add_argument("--output-mode", choices=["chapters", "single", "both"],
+                        help="Un MP3 por capítulo, un único MP3 con marcas de capítulo, o ambos")
+    parser.add_argument("--postprocess", action="store_true",
+                        help="Iguala el volumen y recorta los silencios de cada fragmento (requiere ffmpeg y NumPy)")
+    args = parser.parse_args()
+
+    if not args.pdf_path:
+        console.print("[cyan]Uso:[/cyan] python main.py <archivo_pdf> [archivo_salida] [--resume]")
+        console.print("[cyan]Lote:[/cyan] python main.py batch <directorio> [--output-dir DIR]")
         console.print("[cyan]Ejemplo:[/cyan] python main.py mi_libro.pdf")
         console.print("\n[bold]O ingresa la ruta manualmente:[/bold]")
 
@@ -157,12 +351,15 @@ def main():
             console.print("❌ [red]Se requiere un archivo PDF[/red]")
             return
     else:
-        pdf_path = sys.argv[1]
+        pdf_path = args.pdf_path
 
-    output_path = sys.argv[2] if len(sys.argv) > 2 else None
+    output_path = args.output_path
 
     converter = PDFToAudiobookConverter()
-    success = converter.convert(pdf_path, output_path)
+    if args.output_mode:
+        converter.config.audio.output_mode = args.output_mode
+    converter.config.audio.postprocess = args.postprocess
+    success = converter.convert(pdf_path, output_path, resume=args.resume, incremental=args.incremental)
 
     if success:
         console.print(Panel.fit(
@@ -0,0 +1,252 @@
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "audiobook"
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_HELP = {
+    'stage_seconds': "Tiempo de reloj acumulado por etapa",
+    'stage_calls': "Veces que se ha ejecutado cada etapa",
+    'tts_latency_seconds': "Latencia de cada llamada al motor TTS",
+    'tts_characters_total': "Caracteres enviados al motor TTS",
+    'tts_chunks_total': "Chunks sintetizados por resultado",
+    'tts_retries_total': "Reintentos de síntesis",
+    'tts_batches_total': "Llamadas por lotes al motor TTS",
+    'tts_worker_restarts_total': "Procesos de síntesis reiniciados por bloqueo o caída",
+    'tts_calls_avoided_total': "Chunks reutilizados de la conversión anterior en modo incremental",
+    'cache_hits_total': "Aciertos de la caché de síntesis",
+    'cache_misses_total': "Fallos de la caché de síntesis",
+    'audio_bytes_written_total': "Bytes de audio escritos en los archivos de capítulo",
+    'pages_extracted_total': "Páginas procesadas del PDF",
+    'characters_extracted_total': "Caracteres de texto limpio extraídos",
+    'boilerplate_characters_removed_total': "Caracteres de cabeceras y pies repetidos eliminados",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Optional[Dict[str, str]]) -> Labels:
+    return tuple(sorted((labels or {}).items()))
+
+
+class Histogram:
+    """Histograma de buckets fijos, acumulativo como los de Prometheus"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimación por interpolación lineal dentro del bucket"""
+        if not self.count:
+            return 0.0
+
+        target = q * self.count
+        seen = 0
+        lower = 0.0
+        for upper, count in zip(self.buckets + (float('inf'),), self.counts):
+            if seen + count >= target and count:
+                if upper == float('inf'):
+                    return lower
+                return lower + (upper - lower) * (target - seen) / count
+            seen += count
+            lower = upper
+        return lower
+
+    def to_dict(self) -> Dict:
+        cumulative = 0
+        buckets = {}
+        for upper, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets[str(upper)] = cumulative
+        buckets['+Inf'] = self.count
+
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': buckets,
+        }
+
+
+class MetricsRegistry:
+    """Contadores, histogramas y tiempos por etapa de una conversión"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counters: Dict[Tuple[str, Labels], float] = {}
+            self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+            self._stages: Dict[str, Dict] = {}
+            self._started = time.time()
+
+    def increment(self, name: str, value: float = 1, labels: Dict[str, str] = None):
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: Dict[str, str] = None):
+        key = (name, _labels(labels))
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = Histogram()
+            self._histograms[key].observe(value)
+
+    def add_time(self, stage: str, seconds: float):
+        with self._lock:
+            entry = self._stages.setdefault(stage, {'seconds': 0.0, 'calls': 0})
+            entry['seconds'] += seconds
+            entry['calls'] += 1
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Mide el tiempo de reloj de un bloque y lo acumula en la etapa `name`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def timed(self, name: str) -> Callable:
+        """Decorador equivalente a envolver la función en `stage(name)`"""
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def counter(self, name: str, labels: Dict[str, str] = None) -> float:
+        """Suma del contador; sin `labels` suma todas sus series"""
+        with self._lock:
+            if labels is not None:
+                return self._counters.get((name, _labels(labels)), 0)
+            return sum(value for (key, _), value in self._counters.items() if key == name)
+
+    def stage_seconds(self, name: str) -> float:
+        with self._lock:
+            return self._stages.get(name, {}).get('seconds', 0.0)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counters = {}
+            for (name, labels), value in sorted(self._counters.items()):
+                counters.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+
+            histograms = {}
+            for (name, labels), histogram in sorted(self._histograms.items(), key=lambda item: item[0]):
+                histograms.setdefault(name, []).append({'labels': dict(labels), **histogram.to_dict()})
+
+            stages = {name: dict(values) for name, values in self._stages.items()}
+            started = self._started
+
+        synthesis = stages.get('synthesis', {}).get('seconds', 0.0)
+        characters = self.counter('tts_characters_total')
+        return {
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(started)),
+            'stages': stages,
+            'counters': counters,
+            'histograms': histograms,
+            'derived': {
+                'characters_per_second': characters / synthesis if synthesis else 0.0,
+                'cache_hit_rate': self._hit_rate(),
+            },
+        }
+
+    def to_prometheus(self) -> str:
+        """Exporta las métricas en el formato de texto de Prometheus"""
+        snapshot = self.snapshot()
+        lines = []
+
+        def header(name: str, kind: str):
+            lines.append(f"# HELP {PREFIX}_{name} {_HELP.get(name, name)}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+
+        header('stage_seconds', 'gauge')
+        for stage, values in snapshot['stages'].items():
+            lines.append(f'{PREFIX}_stage_seconds{{stage="{stage}"}} {values["seconds"]:.6f}')
+        header('stage_calls', 'gauge')
+        for stage, values in snapshot['stages'].items():
+            lines.append(f'{PREFIX}_stage_calls{{stage="{stage}"}} {values["calls"]}')
+
+        for name, series in snapshot['counters'].items():
+            header(name, 'counter')
+            for entry in series:
+                lines.append(f"{PREFIX}_{name}{_format_labels(entry['labels'])} {_format_value(entry['value'])}")
+
+        for name, series in snapshot['histograms'].items():
+            header(name, 'histogram')
+            for entry in series:
+                for upper, count in entry['buckets'].items():
+                    labels = _format_labels({**entry['labels'], 'le': upper})
+                    lines.append(f"{PREFIX}_{name}_bucket{labels} {count}")
+                labels = _format_labels(entry['labels'])
+                lines.append(f"{PREFIX}_{name}_sum{labels} {entry['sum']:.6f}")
+                lines.append(f"{PREFIX}_{name}_count{labels} {entry['count']}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, json_path: str, prometheus_path: str = None, extra: Dict = None) -> Dict:
+        """Guarda el informe JSON de la ejecución y, opcionalmente, el archivo de Prometheus"""
+        report = self.snapshot()
+        if extra:
+            report.update(extra)
+
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+        if prometheus_path:
+            # Escritura atómica: el recolector de archivos de texto puede leer en cualquier momento
+            temp_path = prometheus_path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus())
+            os.replace(temp_path, prometheus_path)
+
+        logger.info(f"Informe de métricas guardado en {json_path}")
+        return report
+
+    def _hit_rate(self) -> float:
+        hits = self.counter('cache_hits_total')
+        lookups = hits + self.counter('cache_misses_total')
+        return hits / lookups if lookups else 0.0
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+metrics = MetricsRegistry()
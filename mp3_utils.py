@@ -0,0 +1,677 @@
+import os
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 64 * 1024
+
+_VERSIONS = {0: 2.5, 2: 2, 3: 1}
+_VERSION_BITS = {2.5: 0, 2: 2, 1: 3}
+_LAYERS = {1: 3, 2: 2, 3: 1}
+_LAYER_BITS = {3: 1, 2: 2, 1: 3}
+
+_BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+_SAMPLE_RATES = {
+    1: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    2.5: (11025, 12000, 8000),
+}
+
+XING_FLAG_FRAMES = 0x1
+XING_FLAG_BYTES = 0x2
+XING_FLAG_TOC = 0x4
+
+
+@dataclass(frozen=True)
+class FrameHeader:
+    version: float
+    layer: int
+    bitrate: int
+    sample_rate: int
+    padding: int
+    channel_mode: int
+    protected: bool
+    raw: bytes
+
+    @property
+    def bitrate_index(self) -> int:
+        return (self.raw[2] >> 4) & 0x0F
+
+    @property
+    def mono(self) -> bool:
+        return self.channel_mode == 3
+
+    @property
+    def samples(self) -> int:
+        if self.layer == 1:
+            return 384
+        if self.layer == 3 and self.version != 1:
+            return 576
+        return 1152
+
+    @property
+    def frame_length(self) -> int:
+        return _frame_length(self.version, self.layer, self.bitrate, self.sample_rate, self.padding)
+
+    @property
+    def side_info_size(self) -> int:
+        if self.version == 1:
+            return 17 if self.mono else 32
+        return 9 if self.mono else 17
+
+    @property
+    def vbr_tag_offset(self) -> int:
+        """Posición de la cabecera Xing/Info dentro de la trama"""
+        return 4 + (2 if self.protected else 0) + self.side_info_size
+
+
+def _frame_length(version: float, layer: int, bitrate: int, sample_rate: int, padding: int) -> int:
+    if layer == 1:
+        return (12 * bitrate * 1000 // sample_rate + padding) * 4
+    if layer == 3 and version != 1:
+        return 72 * bitrate * 1000 // sample_rate + padding
+    return 144 * bitrate * 1000 // sample_rate + padding
+
+
+def parse_frame_header(data, offset: int = 0) -> Optional[FrameHeader]:
+    if offset + 4 > len(data):
+        return None
+
+    b0, b1, b2, b3 = data[offset], data[offset + 1], data[offset + 2], data[offset + 3]
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version = _VERSIONS.get((b1 >> 3) & 0x03)
+    layer = _LAYERS.get((b1 >> 1) & 0x03)
+    bitrate_index = (b2 >> 4) & 0x0F
+    sample_rate_index = (b2 >> 2) & 0x03
+
+    if version is None or layer is None or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    table_version = 1 if version == 1 else 2
+    return FrameHeader(
+        version=version,
+        layer=layer,
+        bitrate=_BITRATES[(table_version, layer)][bitrate_index],
+        sample_rate=_SAMPLE_RATES[version][sample_rate_index],
+        padding=(b2 >> 1) & 0x01,
+        channel_mode=(b3 >> 6) & 0x03,
+        protected=not (b1 & 0x01),
+        raw=bytes(data[offset:offset + 4]),
+    )
+
+
+def id3v2_size(header: bytes) -> int:
+    """Tamaño total de una etiqueta ID3v2 que empieza en `header`, o 0"""
+    if len(header) < 10 or header[:3] != b"ID3":
+        return 0
+    size = 0
+    for byte in header[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if header[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _audio_region(f, file_size: int, read_tag: bool = True):
+    """Devuelve (inicio, fin, etiqueta ID3v2) de la zona de tramas de un archivo"""
+    f.seek(0)
+    head = f.read(10)
+    start = id3v2_size(head)
+    tag = b""
+    if start and read_tag:
+        f.seek(0)
+        tag = f.read(start)
+
+    end = file_size
+    if file_size - start >= 128:
+        f.seek(file_size - 128)
+        if f.read(3) == b"TAG":
+            end = file_size - 128
+
+    return start, end, tag
+
+
+def _is_vbr_info_frame(frame, header: FrameHeader) -> bool:
+    offset = header.vbr_tag_offset
+    if bytes(frame[offset:offset + 4]) in (b"Xing", b"Info"):
+        return True
+    return bytes(frame[36:40]) == b"VBRI"
+
+
+class _FrameCounter:
+    """Acumula estadísticas de las tramas copiadas con memoria acotada"""
+
+    MAX_MARKS = 1024
+
+    def __init__(self):
+        self.frames = 0
+        self.audio_bytes = 0
+        self.samples = 0
+        self.first_header = None
+        self.bitrates = set()
+        self.marks = []
+        self.stride = 1
+
+    def add(self, header: FrameHeader, length: int, count: int = 1):
+        if self.first_header is None:
+            self.first_header = header
+
+        index = self.frames + (-self.frames % self.stride)
+        while index < self.frames + count:
+            self.marks.append(self.audio_bytes + (index - self.frames) * length)
+            if len(self.marks) > self.MAX_MARKS:
+                self.marks = self.marks[::2]
+                self.stride *= 2
+            index = (index // self.stride + 1) * self.stride
+
+        self.frames += count
+        self.audio_bytes += length * count
+        self.samples += header.samples * count
+        self.bitrates.add(header.bitrate)
+
+    @property
+    def duration(self) -> float:
+        if self.first_header is None:
+            return 0.0
+        return self.samples / self.first_header.sample_rate
+
+    def toc(self, header_bytes: int, total_bytes: int) -> bytes:
+        entries = []
+        for i in range(100):
+            frame_index = self.frames * i // 100
+            mark = self.marks[min(len(self.marks) - 1, frame_index // self.stride)]
+            entries.append(min(255, (header_bytes + mark) * 256 // total_bytes))
+        return bytes(entries)
+
+
+def _repeated_frames(buf, pos: int, raw: bytes, length: int) -> int:
+    """Cuenta cuántas tramas consecutivas desde `pos` repiten exactamente la misma cabecera"""
+    available = (len(buf) - pos) // length
+
+    def matches(count: int) -> bool:
+        limit = pos + count * length
+        return all(buf[pos + j:limit:length] == raw[j:j + 1] * count for j in range(4))
+
+    if available <= 1 or matches(available):
+        return available
+
+    low, high = 1, available
+    while high - low > 1:
+        middle = (low + high) // 2
+        if matches(middle):
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+def _copy_frames(src, dst, start: int, end: int, counter: _FrameCounter) -> int:
+    """Copia las tramas MPEG de [start, end) a `dst` en bloques. Devuelve bytes descartados."""
+    src.seek(start)
+    remaining = end - start
+    buf = bytearray()
+    skipped = 0
+    discard = 0
+    first = True
+    synced = True
+
+    while True:
+        if remaining > 0:
+            block = src.read(min(BLOCK_SIZE, remaining))
+            remaining -= len(block)
+            buf += block
+        at_eof = remaining <= 0
+
+        if discard:
+            dropped = min(discard, len(buf))
+            del buf[:dropped]
+            discard -= dropped
+
+        pos = 0
+        run_start = 0
+        while pos + 4 <= len(buf):
+            header = parse_frame_header(buf, pos)
+            length = header.frame_length if header else 0
+
+            if header is not None and not synced:
+                if pos + length + 4 > len(buf) and not at_eof:
+                    break
+                if pos + length + 4 <= len(buf) and parse_frame_header(buf, pos + length) is None:
+                    header = None
+
+            if header is None:
+                if pos + 10 > len(buf) and not at_eof:
+                    break
+                dst.write(buf[run_start:pos])
+                step = id3v2_size(bytes(buf[pos:pos + 10])) or 1
+                skipped += step
+                synced = False
+                if pos + step > len(buf):
+                    discard = pos + step - len(buf)
+                    pos = run_start = len(buf)
+                    break
+                pos += step
+                run_start = pos
+                continue
+
+            if pos + length > len(buf):
+                if not at_eof:
+                    break
+                dst.write(buf[run_start:pos])
+                skipped += len(buf) - pos
+                pos = run_start = len(buf)
+                break
+
+            synced = True
+            if first:
+                first = False
+                if header.layer == 3 and _is_vbr_info_frame(buf[pos:pos + length], header):
+                    dst.write(buf[run_start:pos])
+                    pos += length
+                    run_start = pos
+                    continue
+
+            count = _repeated_frames(buf, pos, header.raw, length)
+            counter.add(header, length, count)
+            pos += length * count
+
+        dst.write(buf[run_start:pos])
+        del buf[:pos]
+
+        if at_eof:
+            skipped += len(buf)
+            return skipped
+
+
+def build_vbr_header(template: FrameHeader, frames: int, total_bytes: int, toc: Optional[bytes],
+                     constant_bitrate: bool) -> bytes:
+    """Construye una trama Xing/Info con los parámetros de `template`"""
+    payload = 4 + 4 + 4 + 4 + (100 if toc else 0)
+    version_key = 1 if template.version == 1 else 2
+    bitrates = _BITRATES[(version_key, template.layer)]
+
+    for index in range(1, 15):
+        length = _frame_length(template.version, template.layer, bitrates[index], template.sample_rate, 0)
+        if length >= template.side_info_size + 4 + payload:
+            break
+    else:
+        return b""
+
+    header = bytes([
+        0xFF,
+        0xE0 | (_VERSION_BITS[template.version] << 3) | (_LAYER_BITS[template.layer] << 1) | 0x01,
+        (index << 4) | (template.raw[2] & 0x0C),
+        template.raw[3],
+    ])
+    frame = bytearray(length)
+    frame[:4] = header
+    parsed = parse_frame_header(frame)
+    offset = parsed.vbr_tag_offset
+
+    flags = XING_FLAG_FRAMES | XING_FLAG_BYTES | (XING_FLAG_TOC if toc else 0)
+    tag = b"Info" if constant_bitrate else b"Xing"
+    body = tag + flags.to_bytes(4, "big") + frames.to_bytes(4, "big") + total_bytes.to_bytes(4, "big")
+    if toc:
+        body += toc
+    frame[offset:offset + len(body)] = body
+    return bytes(frame)
+
+
+def vbr_header_length(template: FrameHeader) -> int:
+    return len(build_vbr_header(template, 0, 1, bytes(100), True))
+
+
+class _Discard:
+    """Destino de _copy_frames cuando solo interesa contar las tramas"""
+
+    def write(self, data) -> int:
+        return len(data)
+
+
+def _find_first_frame(data) -> Tuple[int, Optional[FrameHeader]]:
+    """Primera cabecera de trama seguida de otra válida (o del final de los datos)"""
+    pos = data.find(b"\xff")
+    while pos != -1:
+        header = parse_frame_header(data, pos)
+        if header is not None:
+            following = pos + header.frame_length
+            if following + 4 > len(data) or parse_frame_header(data, following) is not None:
+                return pos, header
+        pos = data.find(b"\xff", pos + 1)
+    return -1, None
+
+
+def _read_vbr_header(frame, header: FrameHeader) -> Optional[Tuple[str, int, Optional[int]]]:
+    """(etiqueta, tramas, bytes o None) de una cabecera Xing/Info o VBRI con número de tramas"""
+    offset = header.vbr_tag_offset
+    tag = bytes(frame[offset:offset + 4])
+    if tag in (b"Xing", b"Info") and len(frame) >= offset + 8:
+        flags = int.from_bytes(frame[offset + 4:offset + 8], "big")
+        if not flags & XING_FLAG_FRAMES:
+            return None
+        frames = int.from_bytes(frame[offset + 8:offset + 12], "big")
+        total_bytes = None
+        if flags & XING_FLAG_BYTES:
+            total_bytes = int.from_bytes(frame[offset + 12:offset + 16], "big")
+        return tag.decode(), frames, total_bytes
+
+    if bytes(frame[36:40]) == b"VBRI" and len(frame) >= 54:
+        total_bytes = int.from_bytes(frame[46:50], "big")
+        frames = int.from_bytes(frame[50:54], "big")
+        return "VBRI", frames, total_bytes
+    return None
+
+
+def probe_mp3(path: str) -> Dict:
+    """Duración exacta, bitrate y tramas de un MP3 sin decodificar el audio.
+
+    Con una cabecera Xing/Info o VBRI basta con leer el principio del archivo.
+    Sin ella se recorren las cabeceras de todas las tramas, saltando de una a
+    otra por bloques como en `concatenate_mp3`.
+    """
+    with open(path, "rb") as f:
+        start, end, _ = _audio_region(f, os.fstat(f.fileno()).st_size, read_tag=False)
+        f.seek(start)
+        data = f.read(min(BLOCK_SIZE, end - start))
+        pos, header = _find_first_frame(data)
+        if header is None:
+            raise ValueError(f"No se encontraron tramas MPEG en {path}")
+
+        vbr_header = None
+        if header.layer == 3:
+            vbr_header = _read_vbr_header(data[pos:pos + header.frame_length], header)
+
+        if vbr_header is not None:
+            tag, frames, total_bytes = vbr_header
+            # Los bytes de la cabecera incluyen la propia trama Xing/VBRI
+            audio_bytes = (total_bytes or end - start - pos) - header.frame_length
+            samples = frames * header.samples
+            constant = tag == "Info"
+            method = tag.lower()
+        else:
+            counter = _FrameCounter()
+            _copy_frames(f, _Discard(), start, end, counter)
+            frames = counter.frames
+            audio_bytes = counter.audio_bytes
+            samples = counter.samples
+            constant = len(counter.bitrates) <= 1
+            method = "frames"
+
+    duration = samples / header.sample_rate
+    return {
+        'duration': duration,
+        'frames': frames,
+        'bytes': audio_bytes,
+        'bitrate': audio_bytes * 8 / duration / 1000 if duration > 0 else 0.0,
+        'sample_rate': header.sample_rate,
+        'channels': 1 if header.mono else 2,
+        'vbr': not constant,
+        'method': method,
+    }
+
+
+def concatenate_mp3(input_paths: List[str], output_path: str) -> Dict:
+    """Une archivos MP3 a nivel de trama, sin decodificar ni recodificar.
+
+    `segments` indica, para cada entrada, la zona [inicio, fin) de bytes que
+    ocupan sus tramas en el archivo de salida.
+    """
+    counter = _FrameCounter()
+    skipped = 0
+    segments = []
+    partial_path = output_path + ".part"
+
+    try:
+        with open(partial_path, "wb") as dst:
+            leading_tag = b""
+            vbr_position = None
+            vbr_length = 0
+
+            for i, path in enumerate(input_paths):
+                with open(path, "rb") as src:
+                    start, end, tag = _audio_region(src, os.path.getsize(path))
+
+                    if i == 0:
+                        leading_tag = tag
+                        dst.write(leading_tag)
+                        src.seek(start)
+                        header = parse_frame_header(_read_first_frame_header(src, start, end))
+                        if header is not None and header.layer == 3:
+                            vbr_length = vbr_header_length(header)
+                            vbr_position = dst.tell()
+                            dst.write(bytes(vbr_length))
+
+                    segment_start = dst.tell()
+                    skipped += _copy_frames(src, dst, start, end, counter)
+                    segments.append((segment_start, dst.tell()))
+
+            if counter.frames == 0:
+                raise ValueError("No se encontraron tramas MPEG en los archivos de entrada")
+
+            if vbr_position is not None and vbr_length:
+                total_bytes = vbr_length + counter.audio_bytes
+                toc = counter.toc(vbr_length, total_bytes)
+                frame = build_vbr_header(counter.first_header, counter.frames, total_bytes, toc,
+                                         len(counter.bitrates) == 1)
+                if len(frame) != vbr_length:
+                    frame = build_vbr_header(counter.first_header, counter.frames, total_bytes, None,
+                                             len(counter.bitrates) == 1).ljust(vbr_length, b"\x00")
+                dst.seek(vbr_position)
+                dst.write(frame)
+
+        os.replace(partial_path, output_path)
+
+    except Exception:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+
+    if skipped:
+        logger.debug(f"Concatenación: {skipped} bytes no MPEG descartados")
+
+    return {
+        'files': len(input_paths),
+        'frames': counter.frames,
+        'bytes': os.path.getsize(output_path),
+        'duration': counter.duration,
+        'segments': segments,
+    }
+
+
+# Una entrada CTOC solo admite 255 hijos; los libros más largos usan tablas anidadas
+_CTOC_MAX_ENTRIES = 255
+_NO_OFFSET = 0xFFFFFFFF
+
+
+def _syncsafe(value: int) -> bytes:
+    return bytes(((value >> shift) & 0x7F) for shift in (21, 14, 7, 0))
+
+
+def _id3_frame(frame_id: str, body: bytes) -> bytes:
+    """Trama ID3v2.3: identificador, tamaño de 32 bits y dos bytes de flags"""
+    return frame_id.encode("ascii") + len(body).to_bytes(4, "big") + b"\x00\x00" + body
+
+
+def _text_frame(frame_id: str, text: str) -> bytes:
+    # Codificación 1: UTF-16 con BOM, la única Unicode que admite ID3v2.3
+    return _id3_frame(frame_id, b"\x01" + text.encode("utf-16") + b"\x00\x00")
+
+
+def _toc_frame(element_id: str, children: Sequence[str], top_level: bool, title: str = None) -> bytes:
+    flags = 0x01 | (0x02 if top_level else 0x00)  # ordenada; 0x02 = raíz
+    body = element_id.encode("ascii") + b"\x00" + bytes([flags, len(children)])
+    body += b"".join(child.encode("ascii") + b"\x00" for child in children)
+    if title:
+        body += _text_frame("TIT2", title)
+    return _id3_frame("CTOC", body)
+
+
+def build_chapter_tag(title: str, author: str, chapters: Sequence[Tuple[str, str, int, int]],
+                      size: int = 0) -> bytes:
+    """Etiqueta ID3v2.3 con título, autor y capítulos CHAP/CTOC.
+
+    `chapters` son tuplas (id, título, inicio_ms, fin_ms). Si `size` es mayor
+    que la etiqueta resultante, se rellena con ceros hasta ese tamaño.
+    """
+    frames = [_text_frame("TIT2", title), _text_frame("TALB", title)]
+    if author:
+        frames.append(_text_frame("TPE1", author))
+
+    ids = [chapter_id for chapter_id, _, _, _ in chapters]
+    if len(ids) <= _CTOC_MAX_ENTRIES:
+        frames.append(_toc_frame("toc", ids, top_level=True, title=title))
+    else:
+        groups = [ids[i:i + _CTOC_MAX_ENTRIES] for i in range(0, len(ids), _CTOC_MAX_ENTRIES)]
+        group_ids = [f"toc{i + 1}" for i in range(len(groups))]
+        frames.append(_toc_frame("toc", group_ids, top_level=True, title=title))
+        frames.extend(_toc_frame(group_id, group, top_level=False) for group_id, group in zip(group_ids, groups))
+
+    for chapter_id, chapter_title, start_ms, end_ms in chapters:
+        body = (chapter_id.encode("ascii") + b"\x00"
+                + start_ms.to_bytes(4, "big") + end_ms.to_bytes(4, "big")
+                + _NO_OFFSET.to_bytes(4, "big") + _NO_OFFSET.to_bytes(4, "big")
+                + _text_frame("TIT2", chapter_title))
+        frames.append(_id3_frame("CHAP", body))
+
+    payload = b"".join(frames)
+    payload += bytes(max(0, size - 10 - len(payload)))
+    return b"ID3\x03\x00\x00" + _syncsafe(len(payload)) + payload
+
+
+class ChapteredMP3Writer:
+    """Escribe un único MP3 con marcas de capítulo ID3v2.3 (CHAP/CTOC).
+
+    Los capítulos se añaden en orden según se terminan y sus tramas se copian
+    por bloques, sin recodificar, así que la memoria no depende de la longitud
+    del libro. Al abrir se reserva el espacio de la etiqueta con todos los
+    capítulos; al cerrar se reescribe en su sitio con los tiempos reales y se
+    rellena lo que sobre si algún capítulo no llegó a añadirse.
+    """
+
+    def __init__(self, output_path: str, title: str, author: str, chapter_titles: Sequence[str]):
+        self.output_path = output_path
+        self.partial_path = output_path + ".part"
+        self.title = title
+        self.author = author
+        self.chapter_titles = list(chapter_titles)
+        self.chapters = []
+        self.durations = {}
+        # Índice -> (inicio, fin) de sus bytes en el audiolibro y desplazamiento
+        # respecto al archivo del capítulo, si se copió sin descartar nada
+        self.ranges = {}
+        self.counter = _FrameCounter()
+        self.skipped = 0
+
+        placeholder = [(self._chapter_id(i), t, 0, 0) for i, t in enumerate(self.chapter_titles)]
+        self.tag_size = len(build_chapter_tag(title, author, placeholder))
+        self._vbr_position = None
+        self._vbr_length = 0
+
+        self._file = open(self.partial_path, "wb")
+        self._file.write(bytes(self.tag_size))
+
+    @staticmethod
+    def _chapter_id(index: int) -> str:
+        return f"chp{index}"
+
+    def add_chapter(self, index: int, path: str):
+        """Añade al final el audio del capítulo `index` (posición en `chapter_titles`)"""
+        with open(path, "rb") as src:
+            start, end, _ = _audio_region(src, os.path.getsize(path))
+
+            if not self.chapters:
+                header = parse_frame_header(_read_first_frame_header(src, start, end))
+                if header is not None and header.layer == 3:
+                    self._vbr_length = vbr_header_length(header)
+                    self._vbr_position = self._file.tell()
+                    self._file.write(bytes(self._vbr_length))
+
+            start_ms = round(self.counter.duration * 1000)
+            first_byte = self._file.tell()
+            skipped = _copy_frames(src, self._file, start, end, self.counter)
+            self.skipped += skipped
+
+        if not skipped:
+            # Solo falta la trama Info inicial: el capítulo termina con los mismos bytes
+            self.ranges[index] = (first_byte, self._file.tell(), self._file.tell() - end)
+        end_ms = round(self.counter.duration * 1000)
+        self.chapters.append((self._chapter_id(index), self.chapter_titles[index], start_ms, end_ms))
+        self.durations[index] = (end_ms - start_ms) / 1000
+
+    def close(self) -> Dict:
+        try:
+            if self.counter.frames == 0:
+                raise ValueError("No se añadió ningún capítulo con audio")
+
+            if self._vbr_position is not None and self._vbr_length:
+                total_bytes = self._vbr_length + self.counter.audio_bytes
+                constant = len(self.counter.bitrates) == 1
+                frame = build_vbr_header(self.counter.first_header, self.counter.frames, total_bytes,
+                                         self.counter.toc(self._vbr_length, total_bytes), constant)
+                if len(frame) != self._vbr_length:
+                    frame = build_vbr_header(self.counter.first_header, self.counter.frames, total_bytes,
+                                             None, constant).ljust(self._vbr_length, b"\x00")
+                self._file.seek(self._vbr_position)
+                self._file.write(frame)
+
+            self._file.seek(0)
+            self._file.write(build_chapter_tag(self.title, self.author, self.chapters, size=self.tag_size))
+            self._file.close()
+            os.replace(self.partial_path, self.output_path)
+
+        except Exception:
+            self.abort()
+            raise
+
+        return {
+            'chapters': len(self.chapters),
+            'frames': self.counter.frames,
+            'bytes': os.path.getsize(self.output_path),
+            'duration': self.counter.duration,
+            'chapter_durations': dict(self.durations),
+            'chapter_ranges': dict(self.ranges),
+        }
+
+    def abort(self):
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self.partial_path):
+            os.remove(self.partial_path)
+
+
+def _read_first_frame_header(src, start: int, end: int) -> bytes:
+    """Busca la primera cabecera de trama válida cerca del inicio de la zona de audio"""
+    src.seek(start)
+    data = src.read(min(BLOCK_SIZE, end - start))
+    for pos in range(max(0, len(data) - 3)):
+        if data[pos] == 0xFF and parse_frame_header(data, pos) is not None:
+            return data[pos:pos + 4]
+    return b""
+
+
+def silent_mp3(seconds: float, sample_rate: int = 24000, bitrate: int = 32, mono: bool = True) -> bytes:
+    """Genera tramas MPEG Layer III de silencio (información lateral a cero)"""
+    version = next(v for v, rates in _SAMPLE_RATES.items() if sample_rate in rates)
+    table_version = 1 if version == 1 else 2
+    bitrate_index = _BITRATES[(table_version, 3)].index(bitrate)
+    header = bytes([
+        0xFF,
+        0xE0 | (_VERSION_BITS[version] << 3) | (_LAYER_BITS[3] << 1) | 0x01,
+        (bitrate_index << 4) | (_SAMPLE_RATES[version].index(sample_rate) << 2),
+        0xC0 if mono else 0x00,
+    ])
+    frame_header = parse_frame_header(header)
+    frame = header + bytes(frame_header.frame_length - 4)
+    frames = max(1, round(seconds * sample_rate / frame_header.samples))
+    return frame * frames
@@ -1,55 +1,330 @@
-import PyPDF2
+import os
 import re
 import logging
-from typing import Dict, List, Tuple
+import tempfile
+import time
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain, repeat
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from config import Config
+from metrics import metrics
+from sentence_splitter import get_splitter
+from text_rules import MISSING_SPACE_AFTER_STOP, MULTIPLE_SPACES, SPACE_BEFORE_PUNCTUATION, page_engine
 
 logger = logging.getLogger(__name__)
 
+_DIGITS = re.compile(r'\d+')
+_CLOSING_PUNCTUATION = frozenset(',.!?;:')
+# Con menos páginas no hay estadística suficiente para distinguir una cabecera
+_MIN_BOILERPLATE_PAGES = 4
+
+
+def _iter_lines(text: str) -> Iterator[str]:
+    """Equivalente perezoso de text.split('\\n')"""
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+def _boilerplate_key(line: str) -> str:
+    """Forma normalizada de una línea: "Página 12" y "Página 13" cuentan como la misma"""
+    return _DIGITS.sub('#', ' '.join(line.split())).casefold()
+
+
+@lru_cache(maxsize=8)
+def _compile_chapter_patterns(patterns: Tuple[str, ...]) -> re.Pattern:
+    """Une todos los patrones de capítulo en una sola alternancia con grupos con nombre"""
+    return re.compile('|'.join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(patterns)), re.IGNORECASE)
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int, config: Config) -> Tuple[List[Optional[str]], float]:
+    """Extrae y limpia las páginas [start, end) en un proceso aparte.
+
+    Devuelve también el tiempo de limpieza, que el proceso principal suma a sus métricas.
+    """
+    import PyPDF2
+    processor = PDFProcessor(config)
+    pages = []
+    cleaning_before = metrics.stage_seconds('cleaning')
+
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for page_num in range(start, end):
+            page_text = pdf_reader.pages[page_num].extract_text()
+            pages.append(processor._clean_page_text(page_text) if page_text else None)
+
+    return pages, metrics.stage_seconds('cleaning') - cleaning_before
+
 
 class PDFProcessor:
     def __init__(self, config: Config = None):
         self.config = config or Config()
         self.logger = logger
 
+    @metrics.timed('extraction')
     def extract_text_with_metadata(self, pdf_path: str) -> Dict:
+        # PyPDF2 tarda en importarse: solo se carga al leer un PDF
+        import PyPDF2
         try:
             self.logger.info(f"Procesando PDF: {pdf_path}")
 
             with open(pdf_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
+                outline = self._read_outline(pdf_reader)
 
-                text = ""
-                total_pages = len(pdf_reader.pages)
-
-                for page_num in range(total_pages):
-                    page = pdf_reader.pages[page_num]
-                    page_text = page.extract_text()
+                page_anchors = {}
+                boilerplate = {'lines': [], 'characters_removed': 0}
+                pages = self._iter_numbered_pages(pdf_reader, pdf_path)
+                if self.config.processing.header_footer_fraction > 0:
+                    pages = self._strip_repeated_lines(pages, boilerplate)
+                if outline:
+                    pages = self._record_page_anchors(pages, page_anchors)
 
-                    if page_text:
-                        cleaned_text = self._clean_page_text(page_text)
-                        text += cleaned_text + "\n"
+                lines = []
+                words = 0
+                for line in self.iter_text_lines(page for _, page in pages):
+                    lines.append(line)
+                    words += len(line.split())
 
-                    if (page_num + 1) % 10 == 0 or (page_num + 1) == total_pages:
-                        self.logger.info(f"Página {page_num + 1}/{total_pages} procesada")
-
-                final_text = self._clean_complete_text(text)
+                final_text = '\n\n'.join(lines)
+                del lines
 
                 metadata = {
                     'title': self._get_metadata_value(pdf_reader.metadata, 'title', 'Sin título'),
                     'author': self._get_metadata_value(pdf_reader.metadata, 'author', 'Desconocido'),
-                    'pages': total_pages,
+                    'pages': len(pdf_reader.pages),
                     'text': final_text,
                     'characters': len(final_text),
-                    'words': len(final_text.split())
+                    'words': words,
+                    'outline': self._map_outline(outline, page_anchors, final_text) if outline else [],
+                    'boilerplate': boilerplate
                 }
 
+                metrics.increment('pages_extracted_total', metadata['pages'])
+                metrics.increment('characters_extracted_total', metadata['characters'])
+
                 return metadata
 
         except Exception as e:
             self.logger.error(f"Error procesando PDF {pdf_path}: {e}")
             raise
 
+    def iter_pages(self, pdf_reader, pdf_path: str = None) -> Iterator[str]:
+        """Genera el texto limpio de cada página con texto, en orden"""
+        for _, page_text in self._iter_numbered_pages(pdf_reader, pdf_path):
+            yield page_text
+
+    def _iter_numbered_pages(self, pdf_reader, pdf_path: str = None) -> Iterator[Tuple[int, str]]:
+        total_pages = len(pdf_reader.pages)
+        workers = self._extraction_workers(total_pages)
+
+        if pdf_path and workers > 1:
+            yield from self._iter_pages_parallel(pdf_path, total_pages, workers)
+            return
+
+        for page_num in range(total_pages):
+            page = pdf_reader.pages[page_num]
+            page_text = page.extract_text()
+
+            if page_text:
+                yield page_num, self._clean_page_text(page_text)
+
+            if (page_num + 1) % 10 == 0 or (page_num + 1) == total_pages:
+                self.logger.info(f"Página {page_num + 1}/{total_pages} procesada")
+
+    def _extraction_workers(self, total_pages: int) -> int:
+        """Número de procesos para extraer; 1 si el documento es demasiado pequeño"""
+        if total_pages < self.config.processing.parallel_min_pages:
+            return 1
+
+        workers = self.config.processing.extraction_workers or os.cpu_count() or 1
+        return max(1, min(workers, total_pages // 10))
+
+    def _iter_pages_parallel(self, pdf_path: str, total_pages: int, workers: int) -> Iterator[Tuple[int, str]]:
+        # Varios rangos por proceso para repartir mejor páginas de coste desigual
+        shard_size = max(10, -(-total_pages // (workers * 4)))
+        shards = [(start, min(start + shard_size, total_pages)) for start in range(0, total_pages, shard_size)]
+
+        self.logger.info(f"Extrayendo {total_pages} páginas con {workers} procesos")
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                _extract_page_range,
+                repeat(pdf_path),
+                [start for start, _ in shards],
+                [end for _, end in shards],
+                repeat(self.config),
+            )
+
+            for (start, end), (pages, cleaning_seconds) in zip(shards, results):
+                metrics.add_time('cleaning', cleaning_seconds)
+                for page_num, page in enumerate(pages, start):
+                    if page is not None:
+                        yield page_num, page
+                self.logger.info(f"Página {end}/{total_pages} procesada")
+
+    def iter_text_lines(self, pages: Iterable[str]) -> Iterator[str]:
+        """Genera los párrafos limpios del libro a partir de las páginas, sin unirlas en memoria"""
+        raw_lines = chain.from_iterable(page.split('\n') for page in pages)
+        # Cada página termina en salto de línea: la última línea real no es la final del texto
+        return self._iter_cleaned_lines(chain(raw_lines, ['']))
+
+    def _read_outline(self, pdf_reader) -> List[Tuple[str, int]]:
+        """Marcadores de primer nivel del PDF como (título, página), ordenados por página"""
+        try:
+            items = pdf_reader.outline
+        except Exception as e:
+            self.logger.warning(f"No se pudo leer el índice del PDF: {e}")
+            return []
+
+        # Libros con un único marcador raíz que contiene todos los capítulos
+        if len(items) == 2 and not isinstance(items[0], list) and isinstance(items[1], list):
+            items = items[1]
+
+        entries = []
+        for item in items:
+            if isinstance(item, list):
+                continue
+            try:
+                page_num = pdf_reader.get_destination_page_number(item)
+            except Exception:
+                continue
+            title = str(item.title or '').strip()
+            if title and page_num >= 0:
+                entries.append((title, page_num))
+
+        entries.sort(key=lambda entry: entry[1])
+        return entries
+
+    def _strip_repeated_lines(self, pages: Iterable[Tuple[int, str]], report: Dict) -> Iterator[Tuple[int, str]]:
+        """Quita las cabeceras y pies que se repiten en muchas páginas (título, autor...).
+
+        Un primer recorrido cuenta en cuántas páginas aparece cada una de las
+        primeras y últimas líneas mientras copia las páginas a un archivo
+        temporal; el segundo las relee de una en una y quita, desde el borde de
+        cada página hacia dentro, las que aparecen en al menos
+        `header_footer_fraction` de las páginas. Nunca hay más de una página en
+        memoria. Los números de página sueltos se saltan: ya los quita la
+        limpieza general.
+        """
+        window = self.config.processing.header_footer_lines
+        counts = Counter()
+        total_pages = 0
+        # Es un generador: a "cleaning" solo va su propio trabajo, no la extracción
+        # de las páginas que recibe ni lo que haga quien lo recorre
+        seconds = 0.0
+
+        try:
+            with tempfile.TemporaryFile('w+', encoding='utf-8', newline='') as spool:
+                for page_num, page_text in pages:
+                    start = time.perf_counter()
+                    lines = page_text.split('\n')
+                    content = [i for i, line in enumerate(lines) if line.strip()]
+                    counts.update({_boilerplate_key(lines[i]) for i in content[:window] + content[-window:]})
+                    spool.write(f"{page_num} {len(page_text)}\n")
+                    spool.write(page_text)
+                    total_pages += 1
+                    seconds += time.perf_counter() - start
+
+                start = time.perf_counter()
+                repeated = set()
+                if total_pages >= _MIN_BOILERPLATE_PAGES:
+                    threshold = max(2, self.config.processing.header_footer_fraction * total_pages)
+                    repeated = {key for key, count in counts.items() if count >= threshold and key != '#'}
+                del counts
+
+                removed_lines = {}
+                removed_characters = 0
+                spool.seek(0)
+                for _ in range(total_pages):
+                    page_num, length = map(int, spool.readline().split())
+                    page_text = spool.read(length)
+
+                    if repeated:
+                        lines = page_text.split('\n')
+                        content = [i for i, line in enumerate(lines) if line.strip()]
+                        removed = set()
+                        for edge in (content[:window], content[::-1][:window]):
+                            for i in edge:
+                                key = _boilerplate_key(lines[i])
+                                if key == '#':
+                                    continue
+                                if key not in repeated or i in removed:
+                                    break
+                                removed.add(i)
+                                removed_lines.setdefault(key, lines[i].strip())
+                                removed_characters += len(lines[i])
+
+                        if removed:
+                            page_text = '\n'.join(line for i, line in enumerate(lines) if i not in removed)
+
+                    seconds += time.perf_counter() - start
+                    yield page_num, page_text
+                    start = time.perf_counter()
+        finally:
+            metrics.add_time('cleaning', seconds)
+
+        if not repeated:
+            return
+
+        report['lines'] = list(removed_lines.values())
+        report['characters_removed'] = removed_characters
+        metrics.increment('boilerplate_characters_removed_total', removed_characters)
+        self.logger.info(
+            f"Cabeceras y pies repetidos eliminados: {len(removed_lines)} líneas distintas, "
+            f"{removed_characters:,} caracteres que no se sintetizarán"
+        )
+
+    def _record_page_anchors(self, pages: Iterable[Tuple[int, str]], anchors: Dict[int, str]) -> Iterator[Tuple[int, str]]:
+        """Guarda la primera línea de cada página tal como aparecerá en el texto final"""
+        for page_num, page_text in pages:
+            for raw_line in page_text.split('\n'):
+                line = MULTIPLE_SPACES.apply(raw_line).strip()
+                if line and not _DIGITS.fullmatch(line):
+                    anchors[page_num] = MISSING_SPACE_AFTER_STOP.apply(SPACE_BEFORE_PUNCTUATION.apply(line))
+                    break
+            yield page_num, page_text
+
+    def _map_outline(self, outline: List[Tuple[str, int]], anchors: Dict[int, str], text: str) -> List[Dict]:
+        """Convierte los marcadores en desplazamientos dentro del texto final"""
+        page_offsets = {}
+        position = 0
+        for page_num in sorted(anchors):
+            found = text.find(anchors[page_num], position)
+            if found != -1:
+                page_offsets[page_num] = found
+                position = found + len(anchors[page_num])
+
+        page_order = sorted(page_offsets)
+        entries = []
+        previous = -1
+
+        for title, page_num in outline:
+            start = page_offsets.get(page_num)
+            if start is None:
+                continue
+
+            # Dentro de la página, el encabezado del capítulo marca el inicio exacto
+            next_index = bisect_right(page_order, page_num)
+            end = page_offsets[page_order[next_index]] if next_index < len(page_order) else len(text)
+            heading = text.find(title, start, end)
+            offset = heading if heading != -1 else start
+
+            if offset > previous:
+                entries.append({'title': title, 'page': page_num + 1, 'offset': offset})
+                previous = offset
+
+        self.logger.info(f"Índice del PDF: {len(entries)} de {len(outline)} marcadores ubicados en el texto")
+        return entries
+
     def _get_metadata_value(self, metadata, key, default):
         """Obtiene valores de metadata de forma segura"""
         try:
@@ -57,75 +332,101 @@ class PDFProcessor:
         except:
             return default
 
+    @metrics.timed('cleaning')
     def _clean_page_text(self, text: str) -> str:
         """Limpia el texto de una página individual"""
         if not text:
             return ""
 
-        text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
-
-        text = re.sub(r'(\w+)-\n(\w+)', r'\1\2', text)
-
-        text = re.sub(r'\n+', '\n', text)
-
-        return text.strip()
+        return page_engine.apply(text)
 
     def _clean_complete_text(self, text: str) -> str:
         if not text:
             return ""
 
-        text = re.sub(r' +', ' ', text)
+        return '\n\n'.join(self._iter_cleaned_lines(_iter_lines(text)))
 
-        text = re.sub(r'\s+([,.!?;:])', r'\1', text)
-        text = re.sub(r'([.!?])([A-Z])', r'\1 \2', text)
+    def _iter_cleaned_lines(self, raw_lines: Iterable[str]) -> Iterator[str]:
+        """Limpieza del texto completo, línea a línea y en tiempo lineal"""
+        return self._join_paragraph_lines(self._drop_page_numbers(self._join_punctuation_lines(raw_lines)))
 
-        text = re.sub(r'\n\d+\n', '\n', text)
+    def _join_punctuation_lines(self, raw_lines: Iterable[str]) -> Iterator[str]:
+        """Une a la línea anterior las líneas que empiezan por signo de puntuación"""
+        pending = None
+        blanks = []
 
-        lines = text.split('\n')
-        cleaned_lines = []
+        for line in raw_lines:
+            line = MULTIPLE_SPACES.apply(line)
+            content = line.lstrip()
 
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if line:
+            if not content:
+                blanks.append(line)
+                continue
 
-                if (cleaned_lines and
-                        cleaned_lines[-1] and
-                        cleaned_lines[-1][-1].isalpha() and
-                        line and line[0].islower()):
-                    cleaned_lines[-1] += " " + line
-                else:
-                    cleaned_lines.append(line)
+            if content[0] in _CLOSING_PUNCTUATION:
+                pending = content if pending is None else pending.rstrip() + content
+                blanks = []
+                continue
 
-        return '\n\n'.join(cleaned_lines)
+            if pending is not None:
+                yield SPACE_BEFORE_PUNCTUATION.apply(pending)
+            yield from blanks
+            pending = line
+            blanks = []
 
-    def split_into_chapters(self, text: str) -> List[Dict]:
-        chapters = []
-        lines = text.split('\n')
+        if pending is not None:
+            yield SPACE_BEFORE_PUNCTUATION.apply(pending)
+        yield from blanks
 
-        current_chapter = {"title": "Introducción", "content": "", "words": 0}
+    def _drop_page_numbers(self, lines: Iterable[str]) -> Iterator[str]:
+        """Elimina las líneas que solo contienen un número de página"""
+        previous = None
+        previous_dropped = False
+        index = 0
+
+        for line in lines:
+            line = MISSING_SPACE_AFTER_STOP.apply(line)
+            if previous is not None:
+                if index > 1 and not previous_dropped and _DIGITS.fullmatch(previous):
+                    previous_dropped = True
+                else:
+                    previous_dropped = False
+                    yield previous
+            previous = line
+            index += 1
+
+        if previous is not None:
+            yield previous
+
+    def _join_paragraph_lines(self, lines: Iterable[str]) -> Iterator[str]:
+        """Une las líneas que continúan la frase anterior en minúscula"""
+        current = None
 
         for line in lines:
             line = line.strip()
             if not line:
                 continue
 
-            if self._is_chapter_start(line):
+            if current and current[-1].isalpha() and line[0].islower():
+                current += " " + line
+            else:
+                if current is not None:
+                    yield current
+                current = line
 
-                if current_chapter["content"].strip():
-                    current_chapter["words"] = len(current_chapter["content"].split())
-                    chapters.append(current_chapter)
+        if current is not None:
+            yield current
 
-                current_chapter = {
-                    "title": line,
-                    "content": "",
-                    "words": 0
-                }
-            else:
-                current_chapter["content"] += line + "\n"
+    @metrics.timed('chapter_split')
+    def split_into_chapters(self, text: str, outline: List[Dict] = None) -> List[Dict]:
+        if outline:
+            chapters = self._chapters_from_outline(text, outline)
+            if chapters:
+                self.logger.info(f"Capítulos tomados del índice del PDF: {len(chapters)}")
+                return chapters
 
-        if current_chapter["content"].strip():
-            current_chapter["words"] = len(current_chapter["content"].split())
-            chapters.append(current_chapter)
+        chapters = list(self.iter_chapters(_iter_lines(text)))
+        self._log_detected_patterns(chapters)
 
         if not chapters:
             chapters.append({
@@ -136,12 +437,90 @@ class PDFProcessor:
 
         return chapters
 
+    def iter_chapters(self, lines: Iterable[str]) -> Iterator[Dict]:
+        """Genera los capítulos a medida que se detectan sus encabezados"""
+        title = "Introducción"
+        detected_by = None
+        content = []
+        patterns = tuple(self.config.processing.chapter_patterns)
+        chapter_regex = _compile_chapter_patterns(patterns)
+
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+
+            match = chapter_regex.match(line)
+            if match is not None:
+                if content:
+                    yield self._build_chapter(title, content, detected_by)
+
+                title = line
+                detected_by = patterns[int(match.lastgroup[1:])]
+                content = []
+            else:
+                content.append(line)
+
+        if content:
+            yield self._build_chapter(title, content, detected_by)
+
+    def _chapters_from_outline(self, text: str, outline: List[Dict]) -> List[Dict]:
+        chapters = []
+        first = outline[0]['offset']
+
+        if text[:first].strip():
+            chapters.append(self._slice_chapter("Introducción", text[:first], None))
+
+        ends = [entry['offset'] for entry in outline[1:]] + [len(text)]
+        for entry, end in zip(outline, ends):
+            section = text[entry['offset']:end]
+            if section.strip():
+                chapters.append(self._slice_chapter(entry['title'], section, 'outline'))
+
+        return chapters
+
+    def _slice_chapter(self, title: str, section: str, detected_by: Optional[str]) -> Dict:
+        # El texto limpio ya tiene un párrafo por línea separados por una línea en blanco
+        return {
+            "title": title,
+            "content": section.strip().replace('\n\n', '\n') + '\n',
+            "words": len(section.split()),
+            "detected_by": detected_by
+        }
+
+    def _build_chapter(self, title: str, lines: List[str], detected_by: Optional[str] = None) -> Dict:
+        words = 0
+        for line in lines:
+            words += len(line.split())
+
+        return {
+            "title": title,
+            "content": '\n'.join(lines) + '\n',
+            "words": words,
+            "detected_by": detected_by
+        }
+
+    def _log_detected_patterns(self, chapters: List[Dict]):
+        counts = {}
+        for chapter in chapters:
+            if chapter.get("detected_by"):
+                counts[chapter["detected_by"]] = counts.get(chapter["detected_by"], 0) + 1
+
+        for pattern, count in counts.items():
+            self.logger.info(f"Patrón de capítulo {pattern!r}: {count} coincidencias")
+
+    def _match_chapter_pattern(self, line: str) -> Optional[str]:
+        """Devuelve el patrón de capítulo que coincide con la línea, o None"""
+        patterns = tuple(self.config.processing.chapter_patterns)
+        match = _compile_chapter_patterns(patterns).match(line)
+        if match is None:
+            return None
+        return patterns[int(match.lastgroup[1:])]
+
     def _is_chapter_start(self, line: str) -> bool:
-        for pattern in self.config.processing.chapter_patterns:
-            if re.match(pattern, line, re.IGNORECASE):
-                return True
-        return False
+        return self._match_chapter_pattern(line) is not None
 
+    @metrics.timed('chunking')
     def split_text_into_chunks(self, text: str, max_length: int = None) -> List[str]:
         if max_length is None:
             max_length = self.config.tts.max_chunk_length
@@ -150,7 +529,7 @@ class PDFProcessor:
             return [text]
 
         chunks = []
-        sentences = self._split_into_sentences(text)
+        sentences = get_splitter(self.config.tts.language).iter_sentences(text)
         current_chunk = ""
 
         for sentence in sentences:
@@ -167,22 +546,3 @@ class PDFProcessor:
             chunks.append(current_chunk.strip())
 
         return chunks
-
-    def _split_into_sentences(self, text: str) -> List[str]:
-        """Divide texto en oraciones de forma simple"""
-
-        sentences = re.split(r'([.!?]+\s+)', text)
-
-        result = []
-        i = 0
-        while i < len(sentences):
-            if i + 1 < len(sentences) and re.match(r'^[.!?]+\s+$', sentences[i + 1]):
-                result.append(sentences[i] + sentences[i + 1])
-                i += 2
-            else:
-                if sentences[i].strip():
-                    result.append(sentences[i])
-                i += 1
-
-
-        return [s.strip() for s in result if s.strip()]
@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from config import RetryConfig
+
+logger = logging.getLogger(__name__)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Segundos de espera de una cabecera Retry-After (segundos o fecha HTTP)"""
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryBudget:
+    """Número máximo de reintentos para todo un libro, compartido por todos los chunks"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def consume(self) -> bool:
+        with self._lock:
+            if self.used >= self.total:
+                return False
+            self.used += 1
+            return True
+
+    def extend(self, amount: int):
+        with self._lock:
+            self.total += amount
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.total - self.used)
+
+
+class RateController:
+    """Control AIMD del número de peticiones en vuelo y política de reintentos.
+
+    El límite crece en uno por cada ventana de respuestas correctas (suma) y se
+    reduce a la mitad ante un 429/5xx o un fallo de red (multiplicación). Si la
+    latencia media sube por encima de `latency_tolerance` veces la mejor
+    observada, el servicio se está saturando y el límite baja de forma suave.
+    Como mucho se aplica una reducción por cada latencia media, para que una
+    ráfaga de errores simultáneos no hunda el límite de golpe.
+    """
+
+    LATENCY_DECREASE = 0.9
+    EWMA_WEIGHT = 0.2
+
+    def __init__(self, config: RetryConfig, max_concurrency: int):
+        self.config = config
+        self.max_limit = max(1, max_concurrency)
+        self.min_limit = max(1, min(config.min_concurrency, self.max_limit))
+        self.limit = float(self.max_limit if not config.adaptive_concurrency
+                           else max(self.min_limit, self.max_limit // 2))
+        self.in_flight = 0
+        self.budget = RetryBudget(config.min_budget)
+        self.logger = logger
+
+        self._latency = None
+        self._best_latency = None
+        self._samples = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        self._async_condition = None
+        self._async_loop = None
+
+        self.stats = {'successes': 0, 'errors': 0, 'throttled': 0, 'retries': 0, 'decreases': 0}
+
+    def start_book(self, chunks: int):
+        """Reinicia el presupuesto de reintentos para un libro de `chunks` chunks"""
+        total = max(self.config.min_budget, int(chunks * self.config.budget_ratio))
+        self.budget = RetryBudget(total)
+
+    def add_book(self, chunks: int):
+        """Amplía el presupuesto con el de otro libro que comparte este control (modo lote)"""
+        self.budget.extend(max(self.config.min_budget, int(chunks * self.config.budget_ratio)))
+
+    # --- Límite de concurrencia ---
+
+    def _has_slot(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    @contextmanager
+    def slot(self):
+        with self._condition:
+            self._condition.wait_for(self._has_slot)
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    @asynccontextmanager
+    async def async_slot(self):
+        condition = self._get_async_condition()
+        async with condition:
+            await condition.wait_for(self._has_slot)
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with condition:
+                self.in_flight -= 1
+                condition.notify_all()
+
+    def _get_async_condition(self) -> asyncio.Condition:
+        # Cada asyncio.run crea un bucle nuevo; la condición debe pertenecer al actual
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_loop = loop
+            self._async_condition = asyncio.Condition()
+        return self._async_condition
+
+    # --- Señales de la respuesta ---
+
+    def on_success(self, latency: float):
+        with self._condition:
+            self.stats['successes'] += 1
+            self._samples += 1
+            if self._latency is None:
+                self._latency = latency
+            else:
+                self._latency += self.EWMA_WEIGHT * (latency - self._latency)
+            if self._samples >= 5 and (self._best_latency is None or self._latency < self._best_latency):
+                self._best_latency = self._latency
+
+            if not self.config.adaptive_concurrency:
+                return
+
+            if (self._best_latency is not None
+                    and self._latency > self._best_latency * self.config.latency_tolerance):
+                self._decrease(self.LATENCY_DECREASE)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._condition.notify_all()
+
+    def on_error(self, error: Exception):
+        with self._condition:
+            self.stats['errors'] += 1
+            if getattr(error, 'retryable', False):
+                self.stats['throttled'] += 1
+                if self.config.adaptive_concurrency:
+                    self._decrease(0.5)
+
+    def _decrease(self, factor: float):
+        now = time.monotonic()
+        if now - self._last_decrease < (self._latency or 0.0):
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_limit), self.limit * factor)
+        self.stats['decreases'] += 1
+
+    # --- Reintentos ---
+
+    def retry_delay(self, attempt: int, error: Exception) -> Optional[float]:
+        """Espera antes del reintento número `attempt + 1`, o None si no se debe reintentar"""
+        if not getattr(error, 'retryable', False):
+            return None
+        if attempt + 1 >= self.config.max_attempts:
+            return None
+        if not self.budget.consume():
+            self.logger.warning("Presupuesto de reintentos del libro agotado")
+            return None
+
+        with self._condition:
+            self.stats['retries'] += 1
+
+        retry_after = getattr(error, 'retry_after', None)
+        if retry_after is not None:
+            return min(retry_after, self.config.max_retry_after)
+
+        # Backoff exponencial con jitter completo
+        return random.uniform(0, min(self.config.max_delay, self.config.base_delay * 2 ** attempt))
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+class SynthesisCache:
+    """Caché en disco de audios sintetizados, direccionada por contenido y con expulsión LRU"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.logger = logger
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._size = sum(os.path.getsize(path) for path, _ in self._entries())
+
+    @staticmethod
+    def make_key(text: str, engine_type: str, params: Dict) -> str:
+        normalized = " ".join(text.split())
+        payload = json.dumps(
+            {'text': normalized, 'engine': engine_type, 'params': params},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def fetch(self, key: str, output_path: str) -> bool:
+        """Copia (o enlaza) el audio cacheado en `output_path` si existe"""
+        path = self._path(key)
+        try:
+            self._materialize(path, output_path)
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return False
+
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def store(self, key: str, source_path: str):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        existed = os.path.exists(path)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            try:
+                os.link(source_path, temp_path)
+            except OSError:
+                shutil.copyfile(source_path, temp_path)
+            os.replace(temp_path, path)
+        except OSError as e:
+            self.logger.warning(f"No se pudo guardar en caché {key[:12]}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+
+        with self._lock:
+            self.stores += 1
+            if not existed:
+                self._size += os.path.getsize(path)
+            over_limit = self._size > self.max_bytes
+
+        if over_limit:
+            self.evict()
+
+    def evict(self):
+        """Elimina las entradas usadas hace más tiempo hasta quedar por debajo del 90% del límite"""
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda entry: entry[1])
+            size = sum(os.path.getsize(path) for path, _ in entries)
+            target = self.max_bytes * 0.9
+
+            for path, _ in entries:
+                if size <= target:
+                    break
+                try:
+                    entry_size = os.path.getsize(path)
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                size -= entry_size
+                self.evictions += 1
+
+            self._size = size
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'stores': self.stores,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size_bytes': self._size,
+            }
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".mp3")
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".mp3"):
+                    path = os.path.join(root, name)
+                    try:
+                        yield path, os.path.getmtime(path)
+                    except FileNotFoundError:
+                        continue
+
+    @staticmethod
+    def _materialize(cache_path: str, output_path: str):
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        try:
+            os.link(cache_path, output_path)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            # Sistemas de archivos sin enlaces duros
+            shutil.copyfile(cache_path, output_path)
@@ -0,0 +1,285 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ChunkTask:
+    chapter_index: int
+    chunk_index: int
+    text: str
+    output_path: str
+
+
+@dataclass
+class ChapterPlan:
+    index: int
+    title: str
+    output_path: str
+    tasks: List[ChunkTask] = field(default_factory=list)
+    # Zona de bytes de cada chunk dentro del archivo del capítulo, una vez escrito
+    audio_ranges: Dict[int, Tuple[int, int]] = field(default_factory=dict)
+
+    @property
+    def characters(self) -> int:
+        return sum(len(task.text) for task in self.tasks)
+
+
+class FairTaskQueue:
+    """Cola de chunks de varios libros que se reparte por turnos entre ellos.
+
+    Cada `get` toma trabajo del siguiente libro con chunks pendientes, así que un
+    libro largo no retrasa a los que llegan después. Los productores añaden
+    libros con `put` mientras los workers consumen; `close` indica que no
+    llegarán más y `get` devuelve una lista vacía cuando todo se ha repartido.
+    """
+
+    def __init__(self):
+        self._queues = OrderedDict()
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def put(self, key: Hashable, tasks: List[ChunkTask]):
+        with self._condition:
+            self._queues.setdefault(key, deque()).extend(tasks)
+            self._condition.notify_all()
+
+    def close(self, discard: bool = False):
+        """Sin más libros; con `discard` se descartan también los chunks pendientes"""
+        with self._condition:
+            self._closed = True
+            if discard:
+                self._queues.clear()
+            self._condition.notify_all()
+
+    def get(self, max_items: int = 1, max_chars: int = 0) -> List[ChunkTask]:
+        """Siguiente lote de un mismo libro: hasta `max_items` chunks y `max_chars` caracteres"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._queues or self._closed)
+            if not self._queues:
+                return []
+
+            key, queue = next(iter(self._queues.items()))
+            batch = [queue.popleft()]
+            chars = len(batch[0].text)
+            while queue and len(batch) < max_items and chars + len(queue[0].text) <= max_chars:
+                chars += len(queue[0].text)
+                batch.append(queue.popleft())
+
+            # Turno rotatorio: el libro pasa al final de la cola
+            del self._queues[key]
+            if queue:
+                self._queues[key] = queue
+            return batch
+
+
+class SynthesisScheduler:
+    """Ejecuta los chunks de todos los capítulos en un pool de workers acotado.
+
+    Si `synthesize` es una corrutina, los chunks se ejecutan en un bucle asyncio
+    con como máximo `max_workers` peticiones en vuelo en lugar de en hilos.
+
+    Con `synthesize_batch`, los chunks cortos consecutivos se agrupan en lotes
+    de hasta `batch_size` chunks y `batch_chars` caracteres, para pagar una sola
+    vez el coste fijo de cada llamada al motor.
+    """
+
+    def __init__(self, synthesize: Union[Callable[[str, str], bool], Callable[[str, str], Awaitable[bool]]],
+                 max_workers: int = 4,
+                 synthesize_batch: Optional[Callable[[List[Tuple[str, str]]], List[bool]]] = None,
+                 batch_size: int = 1, batch_chars: int = 0):
+        self.synthesize = synthesize
+        self.max_workers = max(1, max_workers)
+        self.synthesize_batch = synthesize_batch
+        self.batch_size = max(1, batch_size)
+        self.batch_chars = batch_chars
+        self.logger = logger
+        self.stats = {}
+
+    def order_tasks(self, plans: List[ChapterPlan]) -> List[ChunkTask]:
+        """Aplana los capítulos en una cola global, los más largos primero"""
+        ordered = sorted(plans, key=lambda plan: plan.characters, reverse=True)
+        return [task for plan in ordered for task in plan.tasks]
+
+    def run(self, plans: List[ChapterPlan],
+            on_chapter_done: Optional[Callable[[ChapterPlan, List[bool]], None]] = None) -> Dict[int, List[bool]]:
+        queue = self.order_tasks(plans)
+        plans_by_index = {plan.index: plan for plan in plans}
+        outcomes = {plan.index: [False] * len(plan.tasks) for plan in plans}
+        pending = {plan.index: len(plan.tasks) for plan in plans}
+
+        for plan in plans:
+            if not plan.tasks and on_chapter_done:
+                on_chapter_done(plan, [])
+
+        start = time.perf_counter()
+        total_chars = sum(len(task.text) for task in queue)
+
+        def record(task: ChunkTask, success: bool):
+            outcomes[task.chapter_index][task.chunk_index] = success
+            pending[task.chapter_index] -= 1
+
+            if pending[task.chapter_index] == 0 and on_chapter_done:
+                on_chapter_done(plans_by_index[task.chapter_index], outcomes[task.chapter_index])
+
+        if asyncio.iscoroutinefunction(self.synthesize):
+            calls = len(queue)
+            asyncio.run(self._run_async(queue, record))
+        else:
+            batches = self.make_batches(queue)
+            calls = len(batches)
+            self._run_threads(batches, record)
+
+        elapsed = time.perf_counter() - start
+        self.stats = {
+            'chunks': len(queue),
+            'calls': calls,
+            'characters': total_chars,
+            'workers': self.max_workers,
+            'seconds': elapsed,
+            'chunks_per_second': len(queue) / elapsed if elapsed > 0 else 0.0,
+            'characters_per_second': total_chars / elapsed if elapsed > 0 else 0.0,
+        }
+        self.logger.info(
+            f"Síntesis completada: {len(queue)} chunks en {elapsed:.1f}s "
+            f"({self.stats['characters_per_second']:.0f} caracteres/s, {self.max_workers} workers)"
+        )
+
+        return outcomes
+
+    def run_queue(self, queue: FairTaskQueue, record: Callable[[ChunkTask, bool], None]):
+        """Consume `queue` hasta que se cierre y se vacíe.
+
+        A diferencia de `run`, el trabajo puede seguir llegando mientras se
+        sintetiza. `record` se llama desde los workers, así que debe ser seguro
+        entre hilos.
+        """
+        if asyncio.iscoroutinefunction(self.synthesize):
+            asyncio.run(self._run_queue_async(queue, record))
+            return
+
+        max_items = self.batch_size if self.synthesize_batch is not None else 1
+
+        def worker():
+            while True:
+                batch = queue.get(max_items, self.batch_chars)
+                if not batch:
+                    return
+                for task, success in zip(batch, self._run_batch(batch)):
+                    record(task, success)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for future in [executor.submit(worker) for _ in range(self.max_workers)]:
+                future.result()
+
+    async def _run_queue_async(self, queue: FairTaskQueue, record: Callable[[ChunkTask, bool], None]):
+        loop = asyncio.get_running_loop()
+        # Hilos propios, uno por worker, para las esperas bloqueantes de la cola y
+        # para `record`, que puede unir y escribir un capítulo entero: en el bucle
+        # detendría las peticiones en vuelo
+        with ThreadPoolExecutor(max_workers=self.max_workers) as waiters:
+            async def worker():
+                while True:
+                    batch = await loop.run_in_executor(waiters, queue.get)
+                    if not batch:
+                        return
+                    success = await self._run_task_async(batch[0])
+                    await loop.run_in_executor(waiters, record, batch[0], success)
+
+            await asyncio.gather(*(worker() for _ in range(self.max_workers)))
+
+    def make_batches(self, queue: List[ChunkTask]) -> List[List[ChunkTask]]:
+        """Agrupa chunks consecutivos de la cola en lotes que no superan `batch_chars`.
+
+        El tamaño de lote se reduce si hace falta para que siga habiendo al menos
+        un lote por worker: agrupar nunca debe dejar workers sin trabajo.
+        """
+        if self.synthesize_batch is None or self.batch_size == 1:
+            return [[task] for task in queue]
+
+        small = sum(1 for task in queue if len(task.text) < self.batch_chars)
+        batch_size = min(self.batch_size, max(1, math.ceil(small / self.max_workers)))
+
+        batches = []
+        current = []
+        current_chars = 0
+        for task in queue:
+            if current and (len(current) >= batch_size or current_chars + len(task.text) > self.batch_chars):
+                batches.append(current)
+                current = []
+                current_chars = 0
+            current.append(task)
+            current_chars += len(task.text)
+        if current:
+            batches.append(current)
+        return batches
+
+    def _run_threads(self, batches: List[List[ChunkTask]], record: Callable[[ChunkTask, bool], None]):
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._run_batch, batch): batch for batch in batches}
+
+            try:
+                for future in as_completed(futures):
+                    for task, success in zip(futures[future], future.result()):
+                        record(task, success)
+            except BaseException:
+                # Ctrl-C o error: no arrancar los chunks que siguen en cola
+                for future in futures:
+                    future.cancel()
+                raise
+
+    async def _run_async(self, queue: List[ChunkTask], record: Callable[[ChunkTask, bool], None]):
+        # El semáforo despierta a las tareas en orden de creación: se respeta el orden de la cola
+        in_flight = asyncio.Semaphore(self.max_workers)
+
+        async def run(task: ChunkTask):
+            async with in_flight:
+                return task, await self._run_task_async(task)
+
+        tasks = [asyncio.ensure_future(run(task)) for task in queue]
+        loop = asyncio.get_running_loop()
+        # `record` puede terminar un capítulo (unir, escribir, calcular hashes): va a
+        # un hilo aparte para no detener el bucle, y de uno en uno como en _run_threads
+        with ThreadPoolExecutor(max_workers=1) as finisher:
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    await loop.run_in_executor(finisher, record, *await next_done)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+
+    async def _run_task_async(self, task: ChunkTask) -> bool:
+        try:
+            return await self.synthesize(task.text, task.output_path)
+        except Exception as e:
+            self.logger.error(f"Error convirtiendo chunk {task.chunk_index + 1} "
+                              f"del capítulo {task.chapter_index + 1}: {e}")
+            return False
+
+    def _run_batch(self, batch: List[ChunkTask]) -> List[bool]:
+        if len(batch) == 1:
+            return [self._run_task(batch[0])]
+
+        try:
+            results = self.synthesize_batch([(task.text, task.output_path) for task in batch])
+        except Exception as e:
+            self.logger.error(f"Error convirtiendo un lote de {len(batch)} chunks: {e}")
+            return [False] * len(batch)
+        return [bool(success) for success in results]
+
+    def _run_task(self, task: ChunkTask) -> bool:
+        try:
+            return self.synthesize(task.text, task.output_path)
+        except Exception as e:
+            self.logger.error(f"Error convirtiendo chunk {task.chunk_index + 1} "
+                              f"del capítulo {task.chapter_index + 1}: {e}")
+            return False
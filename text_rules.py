@@ -0,0 +1,89 @@
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List
+
+
+@dataclass(frozen=True)
+class CleaningRule:
+    name: str
+    pattern: str
+    replacement: str = ''
+    flags: int = 0
+    compiled: re.Pattern = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'compiled', re.compile(self.pattern, self.flags))
+
+    def apply(self, text: str) -> str:
+        return self.compiled.sub(self.replacement, text)
+
+
+class CleaningEngine:
+    """Aplica en orden una lista declarada de reglas precompiladas.
+
+    Las reglas se compilan una sola vez al importar el módulo. No se funden en
+    una alternancia: con `re` cada coincidencia de una alternancia necesita una
+    llamada Python para elegir el reemplazo, y eso resulta más lento que varias
+    pasadas en C con patrones que empiezan por un literal.
+    """
+
+    def __init__(self, rules: Iterable[CleaningRule], strip: bool = False):
+        self.rules: List[CleaningRule] = list(rules)
+        self.strip = strip
+
+    def apply(self, text: str) -> str:
+        for rule in self.rules:
+            text = rule.compiled.sub(rule.replacement, text)
+        return text.strip() if self.strip else text
+
+    def stream(self, pieces: Iterable[str]) -> Iterator[str]:
+        """Limpia páginas o bloques de texto uno a uno"""
+        for piece in pieces:
+            yield self.apply(piece)
+
+
+CONTROL_CHARACTERS = CleaningRule('control_characters', r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]')
+# Equivale a r'(\w+)-\n(\w+)' -> r'\1\2' pero empieza por un literal, así que el
+# motor de regex salta directamente a cada "-\n". El grupo opcional final copia
+# sin cambios el siguiente eslabón de una cadena "a-\nb-\nc", igual que hacía
+# el patrón original al consumir la palabra de la derecha.
+HYPHENATED_LINE_BREAK = CleaningRule('hyphenated_line_break', r'-(?<=\w-)\n(\w+)(-\n\w+)?', r'\1\2')
+REPEATED_NEWLINES = CleaningRule('repeated_newlines', r'\n\n+', '\n')
+
+PAGE_NUMBER_LINE = CleaningRule('page_number_line', r'\n\d+\s*\n', '', re.IGNORECASE)
+PAGE_LABEL = CleaningRule('page_label', r'Página\s*\d+', '', re.IGNORECASE)
+COPYRIGHT_LINE = CleaningRule('copyright_line', r'©.*\n', '', re.IGNORECASE)
+WEB_ADDRESS = CleaningRule('web_address', r'www\..*\.com', '', re.IGNORECASE)
+
+MULTIPLE_SPACES = CleaningRule('multiple_spaces', r'  +', ' ')
+SPACE_BEFORE_PUNCTUATION = CleaningRule('space_before_punctuation', r'\s+([,.!?;:])', r'\1')
+MISSING_SPACE_AFTER_STOP = CleaningRule('missing_space_after_stop', r'([.!?])([A-Z])', r'\1 \2')
+# Equivale a r'(\w)\n(\w)' -> r'\1 \2', con el mismo tratamiento de cadenas.
+WRAPPED_LINE = CleaningRule('wrapped_line', r'\n(?<=\w\n)(\w)(\n\w)?', r' \1\2')
+SENTENCE_BREAK = CleaningRule('sentence_break', r'([.!?])\s*', '\\1\n\n')
+BLANK_LINES = CleaningRule('blank_lines', r'\n\s*\n', '\n\n')
+
+# Limpieza de cada página extraída del PDF
+PAGE_RULES = (
+    CONTROL_CHARACTERS,
+    HYPHENATED_LINE_BREAK,
+    REPEATED_NEWLINES,
+)
+
+# Cadena de TextCleaner.clean_text. MISSING_SPACE_AFTER_STOP no aparece:
+# SENTENCE_BREAK reemplaza después todo el espacio tras [.!?], así que su efecto
+# nunca llega a la salida.
+TEXT_RULES = (
+    PAGE_NUMBER_LINE,
+    PAGE_LABEL,
+    COPYRIGHT_LINE,
+    WEB_ADDRESS,
+    SPACE_BEFORE_PUNCTUATION,
+    WRAPPED_LINE,
+    SENTENCE_BREAK,
+    MULTIPLE_SPACES,
+    BLANK_LINES,
+)
+
+page_engine = CleaningEngine(PAGE_RULES, strip=True)
+text_engine = CleaningEngine(TEXT_RULES, strip=True)
@@ -1,20 +1,112 @@
 from abc import ABC, abstractmethod
-import pyttsx3
-from gtts import gTTS
+import asyncio
+import base64
+import multiprocessing
+import queue
+import re
+from concurrent.futures import ThreadPoolExecutor
 import os
-from typing import Optional
+import random
+import time
+from typing import Dict, List, Optional, Tuple, Union
 import logging
 import tempfile
+from metrics import metrics
+from mp3_utils import silent_mp3
+from rate_control import RateController, parse_retry_after
+from synthesis_cache import SynthesisCache
+
+# pyttsx3, gTTS y requests se importan al crear el motor que los usa: el
+# arranque no paga por backends que no se van a seleccionar.
+
+
+class TTSError(Exception):
+    """Fallo de síntesis con lo necesario para decidir si merece la pena reintentar"""
+
+    def __init__(self, message: str, status: Optional[int] = None,
+                 retry_after: Optional[float] = None, retryable: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.retryable = retryable
+
+
+def _http_error(response, message: str = None) -> TTSError:
+    status = response.status_code
+    return TTSError(
+        message or f"HTTP {status}",
+        status=status,
+        retry_after=parse_retry_after(response.headers.get('Retry-After')),
+        retryable=status == 429 or status >= 500,
+    )
 
 
 class TTSEngine(ABC):
+    thread_safe: bool = True
+    # Servicio remoto: se envuelve con control de concurrencia y reintentos
+    remote: bool = False
+
     @abstractmethod
     def synthesize(self, text: str, output_path: str) -> bool:
         pass
 
+    def synthesize_batch(self, items: List[Tuple[str, str]]) -> List[bool]:
+        """Sintetiza varios pares (texto, ruta) en una sola llamada.
+
+        Por defecto llama a synthesize para cada par; los motores que pueden
+        amortizar su coste fijo por llamada lo sobrescriben.
+        """
+        return [self.synthesize(text, output_path) for text, output_path in items]
+
+    def synthesize_or_raise(self, text: str, output_path: str):
+        """Como synthesize, pero lanza TTSError con el detalle del fallo"""
+        if not self.synthesize(text, output_path):
+            raise TTSError("El motor TTS no pudo sintetizar el texto")
+
+    def use_rate_controller(self, controller: RateController) -> bool:
+        """Devuelve True si el motor aplica el control de tasa a cada petición por su cuenta"""
+        return False
+
+    def cache_params(self) -> Dict:
+        """Parámetros que cambian el audio producido, usados en la clave de caché"""
+        return {}
+
+    def close(self):
+        """Libera sesiones, hilos o procesos del motor"""
+        pass
+
+
+class AsyncTTSEngine(ABC):
+    """Contraparte asíncrona de TTSEngine para motores de red"""
+
+    remote: bool = False
+
+    @abstractmethod
+    async def synthesize(self, text: str, output_path: str) -> bool:
+        pass
+
+    async def synthesize_or_raise(self, text: str, output_path: str):
+        if not await self.synthesize(text, output_path):
+            raise TTSError("El motor TTS no pudo sintetizar el texto")
+
+    def use_rate_controller(self, controller: RateController) -> bool:
+        return False
+
+    def cache_params(self) -> Dict:
+        return {}
+
+    async def close(self):
+        pass
+
 
 class PyTTSX3Engine(TTSEngine):
+    thread_safe = False
+
     def __init__(self, rate: int = 150, volume: float = 0.9, voice: str = None):
+        self.rate = rate
+        self.volume = volume
+        self.voice = voice
+        import pyttsx3
         self.engine = pyttsx3.init()
         self.engine.setProperty('rate', rate)
         self.engine.setProperty('volume', volume)
@@ -35,31 +127,773 @@ class PyTTSX3Engine(TTSEngine):
             logging.error(f"Error en síntesis de voz: {e}")
             return False
 
+    def synthesize_batch(self, items: List[Tuple[str, str]]) -> List[bool]:
+        # Se encolan todos los textos y se arranca el bucle de eventos una sola vez
+        try:
+            for text, output_path in items:
+                self.engine.save_to_file(text, output_path)
+            self.engine.runAndWait()
+        except Exception as e:
+            logging.error(f"Error en síntesis de voz por lotes: {e}")
+            return [False] * len(items)
+
+        return [os.path.exists(output_path) and os.path.getsize(output_path) > 0
+                for _, output_path in items]
+
+    def cache_params(self) -> Dict:
+        return {'rate': self.rate, 'volume': self.volume, 'voice': self.voice}
+
+
+_GOOGLE_AUDIO = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+
+
+class _UnsupportedGoogleProtocol(TTSError):
+    """gTTS o la respuesta de Google ya no tienen el formato interno del que depende _GoogleClient"""
+
+
+def _gtts_save(text: str, output_path: str, language: str, slow: bool):
+    """Síntesis con la API pública de gTTS, un fragmento detrás de otro"""
+    from gtts import gTTS, gTTSError
+    try:
+        tts = gTTS(text=text, lang=language, slow=slow)
+        tts.save(output_path)
+    except gTTSError as e:
+        if e.rsp is None:
+            # Sin respuesta: fallo de red o timeout
+            raise TTSError(str(e), retryable=True) from e
+        raise _http_error(e.rsp, str(e)) from e
+    except Exception as e:
+        raise TTSError(str(e)) from e
+
+
+class _GoogleClient:
+    """Peticiones a Google TTS sobre una sesión HTTP keep-alive.
+
+    Las peticiones se construyen con el tokenizador y el formato RPC del propio
+    gTTS, así que el texto se parte exactamente igual que en gTTS.save. Depende
+    de un método privado de gTTS y del formato de la respuesta: si cambian, se
+    lanza _UnsupportedGoogleProtocol para que el motor vuelva a la API pública.
+    """
+
+    def __init__(self, language: str, slow: bool, pool_size: int,
+                 endpoint: Optional[str] = None, timeout: float = 30.0):
+        self.language = language
+        self.slow = slow
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def prepare(self, text: str) -> list:
+        from gtts import gTTS
+        try:
+            prepared = gTTS(text=text, lang=self.language, slow=self.slow)._prepare_requests()
+        except AttributeError as e:
+            raise _UnsupportedGoogleProtocol(f"Esta versión de gTTS no expone _prepare_requests: {e}") from e
+        except Exception as e:
+            raise TTSError(str(e)) from e
+
+        if self.endpoint:
+            for request in prepared:
+                request.url = self.endpoint
+        return prepared
+
+    def fetch(self, request) -> bytes:
+        import requests
+        try:
+            response = self.session.send(request, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise TTSError(str(e), retryable=True) from e
+
+        if response.status_code >= 400:
+            raise _http_error(response)
+
+        match = _GOOGLE_AUDIO.search(response.text)
+        try:
+            return base64.b64decode(match.group(1), validate=True)
+        except (AttributeError, ValueError) as e:
+            raise _UnsupportedGoogleProtocol("Respuesta de Google TTS sin audio reconocible",
+                                             status=response.status_code) from e
+
+    def close(self):
+        self.session.close()
+
 
 class GoogleTTSEngine(TTSEngine):
-    def __init__(self, language: str = 'es', slow: bool = False):
+    """Google TTS a través de gTTS.
+
+    Con `parallel_parts` > 1, los fragmentos de ~100 caracteres en que gTTS
+    parte cada chunk se piden a la vez (como mucho `parallel_parts` peticiones
+    en vuelo entre todos los chunks) en lugar de uno detrás de otro, y el audio
+    se escribe en el orden original. Un chunk de 4000 caracteres tarda así
+    unas pocas idas y vueltas en lugar de cuarenta. Si la versión instalada de
+    gTTS o la respuesta de Google no son las esperadas, avisa una vez y sigue
+    con gTTS.save.
+    """
+
+    remote = True
+
+    def __init__(self, language: str = 'es', slow: bool = False, parallel_parts: int = 1,
+                 endpoint: Optional[str] = None, timeout: float = 30.0):
         self.language = language
         self.slow = slow
+        self.parallel_parts = max(1, parallel_parts)
+        self.client = None
+        self.rate_controller = None
+        self._executor = None
+        self._parallel = False
+
+        if self.parallel_parts > 1:
+            self.client = _GoogleClient(language, slow, self.parallel_parts, endpoint, timeout)
+            self._executor = ThreadPoolExecutor(max_workers=self.parallel_parts, thread_name_prefix="google-tts")
+            self._parallel = True
 
     def synthesize(self, text: str, output_path: str) -> bool:
         try:
-            tts = gTTS(text=text, lang=self.language, slow=self.slow)
-            tts.save(output_path)
+            self.synthesize_or_raise(text, output_path)
             return True
-        except Exception as e:
+        except TTSError as e:
+            logging.error(f"Error con Google TTS: {e}")
+            return False
+
+    def synthesize_or_raise(self, text: str, output_path: str):
+        if self._parallel:
+            try:
+                self._synthesize_parallel(text, output_path)
+                return
+            except _UnsupportedGoogleProtocol as e:
+                if self._parallel:
+                    self._parallel = False
+                    logging.warning(f"Google TTS en paralelo no disponible ({e}); se sigue con gTTS.save")
+
+        if self.rate_controller is None:
+            _gtts_save(text, output_path, self.language, self.slow)
+        else:
+            # El controlador ya no se aplica a cada fragmento sino al chunk entero
+            _call_with_retries(self.rate_controller, _gtts_save, text, output_path, self.language, self.slow)
+
+    def use_rate_controller(self, controller: RateController) -> bool:
+        # En modo paralelo se controla cada fragmento: un 429 solo repite ese fragmento
+        if self.client is None:
+            return False
+        self.rate_controller = controller
+        return True
+
+    def _fetch(self, request) -> bytes:
+        if self.rate_controller is None:
+            return self.client.fetch(request)
+        return _call_with_retries(self.rate_controller, self.client.fetch, request)
+
+    def _synthesize_parallel(self, text: str, output_path: str):
+        futures = [self._executor.submit(self._fetch, request) for request in self.client.prepare(text)]
+        try:
+            audio = [future.result() for future in futures]
+        except BaseException:
+            # Si un fragmento falla, los que aún no han salido no se envían
+            for future in futures:
+                future.cancel()
+            raise
+
+        with open(output_path, 'wb') as f:
+            for part in audio:
+                f.write(part)
+
+    def cache_params(self) -> Dict:
+        return {'language': self.language, 'slow': self.slow}
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+            self._executor.shutdown(wait=False)
+
+
+class AsyncGoogleTTSEngine(AsyncTTSEngine):
+    """Google TTS con una única sesión HTTP keep-alive compartida por todos los chunks.
+
+    Las peticiones se envían por un pool de conexiones persistente en lugar de
+    abrir una sesión (y un handshake TLS) por cada fragmento. Las llamadas
+    bloqueantes de `requests` se ejecutan en un executor acotado al tamaño del
+    pool, así que el bucle de eventos nunca se bloquea. Si la versión instalada
+    de gTTS o la respuesta de Google no son las esperadas, sigue con gTTS.save
+    en el mismo executor.
+    """
+
+    remote = True
+
+    def __init__(self, language: str = 'es', slow: bool = False, max_connections: int = 16,
+                 endpoint: Optional[str] = None, timeout: float = 30.0):
+        self.language = language
+        self.slow = slow
+        self.client = _GoogleClient(language, slow, max_connections, endpoint, timeout)
+        self._executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="google-tts")
+        self._use_client = True
+
+    async def synthesize(self, text: str, output_path: str) -> bool:
+        try:
+            await self.synthesize_or_raise(text, output_path)
+            return True
+        except TTSError as e:
             logging.error(f"Error con Google TTS: {e}")
             return False
 
+    async def synthesize_or_raise(self, text: str, output_path: str):
+        loop = asyncio.get_running_loop()
+        if self._use_client:
+            try:
+                audio = []
+                for request in self.client.prepare(text):
+                    audio.append(await loop.run_in_executor(self._executor, self.client.fetch, request))
+            except _UnsupportedGoogleProtocol as e:
+                if self._use_client:
+                    self._use_client = False
+                    logging.warning(f"Sesión propia de Google TTS no disponible ({e}); se sigue con gTTS.save")
+            else:
+                with open(output_path, 'wb') as f:
+                    for part in audio:
+                        f.write(part)
+                return
+
+        await loop.run_in_executor(self._executor, _gtts_save, text, output_path, self.language, self.slow)
+
+    def cache_params(self) -> Dict:
+        # Misma voz que GoogleTTSEngine: comparten entradas de caché
+        return {'language': self.language, 'slow': self.slow}
+
+    async def close(self):
+        self.client.close()
+        self._executor.shutdown(wait=False)
+
+
+class FakeTTSEngine(TTSEngine):
+    """Motor sin red para benchmarks: escribe tramas MP3 de silencio tras una latencia simulada.
+
+    La latencia de cada texto se deriva del propio texto y de la semilla, así
+    que dos ejecuciones con la misma entrada esperan exactamente lo mismo
+    aunque el orden de los hilos cambie. `call_overhead` es el coste fijo de
+    cada llamada (arranque del bucle de eventos, petición...), que
+    synthesize_batch paga una sola vez por lote.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, chars_per_second: float = 15.0, seed: int = 0,
+                 call_overhead: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.chars_per_second = chars_per_second
+        self.seed = seed
+        self.call_overhead = call_overhead
+
+    def synthesize(self, text: str, output_path: str) -> bool:
+        return self.synthesize_batch([(text, output_path)])[0]
+
+    def synthesize_batch(self, items: List[Tuple[str, str]]) -> List[bool]:
+        try:
+            delay = self.call_overhead + sum(self._delay(text) for text, _ in items)
+            if delay > 0:
+                time.sleep(delay)
+
+            for text, output_path in items:
+                with open(output_path, 'wb') as f:
+                    f.write(silent_mp3(len(text) / self.chars_per_second))
+            return [True] * len(items)
+        except Exception as e:
+            logging.error(f"Error en motor TTS simulado: {e}")
+            return [False] * len(items)
+
+    def _delay(self, text: str) -> float:
+        delay = self.latency
+        if self.jitter:
+            delay += random.Random(f"{self.seed}:{text}").uniform(-self.jitter, self.jitter)
+        return max(0.0, delay)
+
+    def cache_params(self) -> Dict:
+        return {'chars_per_second': self.chars_per_second}
+
+
+def _pool_worker_main(conn, engine_class, options: Dict):
+    """Bucle de un proceso del pool: inicializa el motor una vez y sintetiza lo que le llegue"""
+    try:
+        engine = engine_class(**options)
+    except Exception as e:
+        conn.send(('error', str(e)))
+        return
+    conn.send(('ready', None))
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+
+        try:
+            conn.send(('done', engine.synthesize_batch(task)))
+        except Exception as e:
+            conn.send(('error', str(e)))
+
+
+class _PoolWorker:
+    """Un proceso del pool con su propia tubería de tareas"""
+
+    def __init__(self, context, engine_class, options: Dict):
+        self.context = context
+        self.engine_class = engine_class
+        self.options = options
+        self.process = None
+        self.conn = None
+
+    def launch(self):
+        self.conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(
+            target=_pool_worker_main,
+            args=(child_conn, self.engine_class, self.options),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def wait_ready(self, timeout: float):
+        if not self.conn.poll(timeout):
+            self.kill()
+            raise RuntimeError("El proceso de síntesis no terminó de inicializarse a tiempo")
+        status, message = self.conn.recv()
+        if status != 'ready':
+            self.kill()
+            raise RuntimeError(f"No se pudo inicializar el motor en el proceso de síntesis: {message}")
+
+    def run(self, items: List[Tuple[str, str]], timeout: float) -> List[bool]:
+        self.conn.send(items)
+        if not self.conn.poll(timeout):
+            raise TimeoutError(f"sin respuesta en {timeout:.0f}s")
+        try:
+            status, value = self.conn.recv()
+        except EOFError:
+            raise EOFError("el proceso terminó de forma inesperada") from None
+        if status == 'error':
+            logging.error(f"Error en proceso de síntesis: {value}")
+            return [False] * len(items)
+        return value
+
+    def kill(self):
+        if self.process is not None and self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        if self.conn is not None:
+            self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+            self.process.join(timeout=5)
+        except (OSError, ValueError):
+            pass
+        self.kill()
+
+
+class TTSWorkerPool(TTSEngine):
+    """Pool de procesos con un motor TTS ya inicializado en cada uno.
+
+    Sirve para motores locales que no se pueden compartir entre hilos, como
+    pyttsx3: cada proceso crea su motor (voz, velocidad y volumen) una sola
+    vez y los chunks se reparten entre los procesos libres. Si un proceso se
+    cuelga más de `timeout` segundos o muere, se sustituye por uno nuevo y el
+    chunk se reintenta una vez.
+    """
+
+    thread_safe = True
+
+    def __init__(self, engine_class, options: Dict = None, workers: int = None,
+                 timeout: float = 120.0, start_timeout: float = 30.0):
+        self.engine_class = engine_class
+        self.options = options or {}
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.restarts = 0
+        self._idle = queue.Queue()
+        self._all = []
+
+        # spawn: los drivers nativos de pyttsx3 no sobreviven a un fork
+        context = multiprocessing.get_context('spawn')
+        for _ in range(self.workers):
+            worker = _PoolWorker(context, engine_class, self.options)
+            worker.launch()
+            self._all.append(worker)
+
+        try:
+            for worker in self._all:
+                worker.wait_ready(self.start_timeout)
+        except Exception:
+            self.close()
+            raise
+
+        for worker in self._all:
+            self._idle.put(worker)
+        logging.info(f"Pool de síntesis listo con {self.workers} procesos")
+
+    def synthesize(self, text: str, output_path: str) -> bool:
+        return self.synthesize_batch([(text, output_path)])[0]
+
+    def synthesize_batch(self, items: List[Tuple[str, str]]) -> List[bool]:
+        # Un lote va entero a un mismo proceso; el tiempo máximo crece con su tamaño
+        worker = self._idle.get()
+        try:
+            for attempt in range(2):
+                try:
+                    return worker.run(items, self.timeout * len(items))
+                except (TimeoutError, EOFError, OSError) as e:
+                    logging.warning(f"Proceso de síntesis {worker.process.pid} bloqueado o caído ({e}); reiniciando")
+                    if not self._restart(worker):
+                        break
+            return [False] * len(items)
+        finally:
+            self._idle.put(worker)
+
+    def _restart(self, worker: _PoolWorker) -> bool:
+        worker.kill()
+        self.restarts += 1
+        metrics.increment('tts_worker_restarts_total')
+        try:
+            worker.launch()
+            worker.wait_ready(self.start_timeout)
+            return True
+        except Exception as e:
+            logging.error(f"No se pudo reiniciar el proceso de síntesis: {e}")
+            return False
+
+    def cache_params(self) -> Dict:
+        return dict(self.options)
+
+    def close(self):
+        for worker in self._all:
+            worker.stop()
+
+
+class PyTTSX3PoolEngine(TTSWorkerPool):
+    """pyttsx3 repartido en varios procesos precalentados"""
+
+    def __init__(self, rate: int = 150, volume: float = 0.9, voice: str = None,
+                 workers: int = None, timeout: float = 120.0):
+        super().__init__(
+            PyTTSX3Engine,
+            {'rate': rate, 'volume': volume, 'voice': voice},
+            workers=workers,
+            timeout=timeout,
+        )
+
+
+class MeteredTTSEngine(TTSEngine):
+    """Registra la latencia, los caracteres y el resultado de cada llamada al motor envuelto"""
+
+    def __init__(self, engine: TTSEngine, engine_type: str):
+        self.engine = engine
+        self.engine_type = engine_type
+        self.thread_safe = engine.thread_safe
+        self.remote = engine.remote
+
+    def synthesize(self, text: str, output_path: str) -> bool:
+        labels = {'engine': self.engine_type}
+        start = time.perf_counter()
+        success = self.engine.synthesize(text, output_path)
+        metrics.observe('tts_latency_seconds', time.perf_counter() - start, labels)
+        metrics.increment('tts_characters_total', len(text), labels)
+        metrics.increment('tts_chunks_total', 1, {**labels, 'result': 'ok' if success else 'error'})
+        return success
+
+    def synthesize_batch(self, items: List[Tuple[str, str]]) -> List[bool]:
+        labels = {'engine': self.engine_type}
+        start = time.perf_counter()
+        results = self.engine.synthesize_batch(items)
+        # Cada chunk del lote se cuenta con su parte proporcional del tiempo
+        latency = (time.perf_counter() - start) / max(1, len(items))
+        for (text, _), success in zip(items, results):
+            metrics.observe('tts_latency_seconds', latency, labels)
+            metrics.increment('tts_characters_total', len(text), labels)
+            metrics.increment('tts_chunks_total', 1, {**labels, 'result': 'ok' if success else 'error'})
+        metrics.increment('tts_batches_total', 1, labels)
+        return results
+
+    def synthesize_or_raise(self, text: str, output_path: str):
+        labels = {'engine': self.engine_type}
+        start = time.perf_counter()
+        result = 'error'
+        try:
+            self.engine.synthesize_or_raise(text, output_path)
+            result = 'ok'
+        finally:
+            metrics.observe('tts_latency_seconds', time.perf_counter() - start, labels)
+            metrics.increment('tts_characters_total', len(text), labels)
+            metrics.increment('tts_chunks_total', 1, {**labels, 'result': result})
+
+    def cache_params(self) -> Dict:
+        return self.engine.cache_params()
+
+    def close(self):
+        self.engine.close()
+
+
+class AsyncMeteredTTSEngine(AsyncTTSEngine):
+    """Versión asíncrona de MeteredTTSEngine"""
+
+    def __init__(self, engine: AsyncTTSEngine, engine_type: str):
+        self.engine = engine
+        self.engine_type = engine_type
+        self.remote = engine.remote
+
+    async def synthesize(self, text: str, output_path: str) -> bool:
+        labels = {'engine': self.engine_type}
+        start = time.perf_counter()
+        success = await self.engine.synthesize(text, output_path)
+        metrics.observe('tts_latency_seconds', time.perf_counter() - start, labels)
+        metrics.increment('tts_characters_total', len(text), labels)
+        metrics.increment('tts_chunks_total', 1, {**labels, 'result': 'ok' if success else 'error'})
+        return success
+
+    async def synthesize_or_raise(self, text: str, output_path: str):
+        labels = {'engine': self.engine_type}
+        start = time.perf_counter()
+        result = 'error'
+        try:
+            await self.engine.synthesize_or_raise(text, output_path)
+            result = 'ok'
+        finally:
+            metrics.observe('tts_latency_seconds', time.perf_counter() - start, labels)
+            metrics.increment('tts_characters_total', len(text), labels)
+            metrics.increment('tts_chunks_total', 1, {**labels, 'result': result})
+
+    def cache_params(self) -> Dict:
+        return self.engine.cache_params()
+
+    async def close(self):
+        await self.engine.close()
+
+
+def _call_with_retries(controller: RateController, function, *args):
+    """Llama a `function` dentro de un hueco del controlador, reintentando los TTSError transitorios"""
+    attempt = 0
+    while True:
+        with controller.slot():
+            start = time.perf_counter()
+            try:
+                result = function(*args)
+                controller.on_success(time.perf_counter() - start)
+                return result
+            except TTSError as e:
+                controller.on_error(e)
+                error = e
+
+        delay = controller.retry_delay(attempt, error)
+        if delay is None:
+            raise error
+
+        metrics.increment('tts_retries_total')
+        logging.warning(f"Reintento {attempt + 1} en {delay:.1f}s tras error: {error}")
+        time.sleep(delay)
+        attempt += 1
+
+
+async def _call_with_retries_async(controller: RateController, function, *args):
+    attempt = 0
+    while True:
+        async with controller.async_slot():
+            start = time.perf_counter()
+            try:
+                result = await function(*args)
+                controller.on_success(time.perf_counter() - start)
+                return result
+            except TTSError as e:
+                controller.on_error(e)
+                error = e
+
+        delay = controller.retry_delay(attempt, error)
+        if delay is None:
+            raise error
+
+        metrics.increment('tts_retries_total')
+        logging.warning(f"Reintento {attempt + 1} en {delay:.1f}s tras error: {error}")
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+class RateLimitedTTSEngine(TTSEngine):
+    """Limita las peticiones en vuelo a un servicio remoto y reintenta los fallos transitorios"""
+
+    def __init__(self, engine: TTSEngine, controller: RateController):
+        self.engine = engine
+        self.controller = controller
+        self.thread_safe = engine.thread_safe
+        self.remote = engine.remote
+
+    def synthesize(self, text: str, output_path: str) -> bool:
+        try:
+            _call_with_retries(self.controller, self.engine.synthesize_or_raise, text, output_path)
+            return True
+        except TTSError as e:
+            logging.error(f"Error de síntesis sin más reintentos: {e}")
+            return False
+
+    def cache_params(self) -> Dict:
+        return self.engine.cache_params()
+
+    def close(self):
+        self.engine.close()
+
+
+class AsyncRateLimitedTTSEngine(AsyncTTSEngine):
+    """Versión asíncrona de RateLimitedTTSEngine"""
+
+    def __init__(self, engine: AsyncTTSEngine, controller: RateController):
+        self.engine = engine
+        self.controller = controller
+        self.remote = engine.remote
+
+    async def synthesize(self, text: str, output_path: str) -> bool:
+        try:
+            await _call_with_retries_async(self.controller, self.engine.synthesize_or_raise, text, output_path)
+            return True
+        except TTSError as e:
+            logging.error(f"Error de síntesis sin más reintentos: {e}")
+            return False
+
+    def cache_params(self) -> Dict:
+        return self.engine.cache_params()
+
+    async def close(self):
+        await self.engine.close()
+
+
+class CachedTTSEngine(TTSEngine):
+    """Sirve desde la caché de síntesis los textos ya convertidos por el motor envuelto"""
+
+    def __init__(self, engine: TTSEngine, cache: SynthesisCache, engine_type: str):
+        self.engine = engine
+        self.cache = cache
+        self.engine_type = engine_type
+        self.thread_safe = engine.thread_safe
+        self.remote = engine.remote
+
+    def synthesize(self, text: str, output_path: str) -> bool:
+        key = self.cache.make_key(text, self.engine_type, self.engine.cache_params())
+        if self.cache.fetch(key, output_path):
+            metrics.increment('cache_hits_total')
+            return True
+        metrics.increment('cache_misses_total')
+
+        # El archivo previo puede ser un enlace duro a una entrada de la caché
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+        if not self.engine.synthesize(text, output_path):
+            return False
+
+        self.cache.store(key, output_path)
+        return True
+
+    def synthesize_batch(self, items: List[Tuple[str, str]]) -> List[bool]:
+        params = self.engine.cache_params()
+        results = [False] * len(items)
+        keys = {}
+        misses = []
+
+        for i, (text, output_path) in enumerate(items):
+            key = self.cache.make_key(text, self.engine_type, params)
+            if self.cache.fetch(key, output_path):
+                metrics.increment('cache_hits_total')
+                results[i] = True
+                continue
+            metrics.increment('cache_misses_total')
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            keys[i] = key
+            misses.append(i)
+
+        if misses:
+            synthesized = self.engine.synthesize_batch([items[i] for i in misses])
+            for i, success in zip(misses, synthesized):
+                if success:
+                    self.cache.store(keys[i], items[i][1])
+                results[i] = success
+
+        return results
+
+    def cache_params(self) -> Dict:
+        return self.engine.cache_params()
+
+    def close(self):
+        self.engine.close()
+
+
+class AsyncCachedTTSEngine(AsyncTTSEngine):
+    """Versión asíncrona de CachedTTSEngine"""
+
+    def __init__(self, engine: AsyncTTSEngine, cache: SynthesisCache, engine_type: str):
+        self.engine = engine
+        self.cache = cache
+        self.engine_type = engine_type
+        self.remote = engine.remote
+
+    async def synthesize(self, text: str, output_path: str) -> bool:
+        key = self.cache.make_key(text, self.engine_type, self.engine.cache_params())
+        if self.cache.fetch(key, output_path):
+            metrics.increment('cache_hits_total')
+            return True
+        metrics.increment('cache_misses_total')
+
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+        if not await self.engine.synthesize(text, output_path):
+            return False
+
+        self.cache.store(key, output_path)
+        return True
+
+    def cache_params(self) -> Dict:
+        return self.engine.cache_params()
+
+    async def close(self):
+        await self.engine.close()
+
 
 class TTSFactory:
     @staticmethod
-    def create_engine(engine_type: str, **kwargs) -> TTSEngine:
+    def create_engine(engine_type: str, cache: Optional[SynthesisCache] = None,
+                      rate_controller: Optional[RateController] = None,
+                      **kwargs) -> Union[TTSEngine, AsyncTTSEngine]:
         engines = {
             'pyttsx3': PyTTSX3Engine,
+            'pyttsx3_pool': PyTTSX3PoolEngine,
             'google': GoogleTTSEngine,
+            'google_async': AsyncGoogleTTSEngine,
+            'fake': FakeTTSEngine,
         }
 
         if engine_type not in engines:
             raise ValueError(f"Motor TTS no soportado: {engine_type}")
 
-        return engines[engine_type](**kwargs)
\ No newline at end of file
+        backend = engines[engine_type](**kwargs)
+        engine = TTSFactory.meter(backend, engine_type)
+
+        if rate_controller is not None and engine.remote and not backend.use_rate_controller(rate_controller):
+            if isinstance(engine, AsyncTTSEngine):
+                engine = AsyncRateLimitedTTSEngine(engine, rate_controller)
+            else:
+                engine = RateLimitedTTSEngine(engine, rate_controller)
+
+        if cache is not None:
+            if isinstance(engine, AsyncTTSEngine):
+                return AsyncCachedTTSEngine(engine, cache, engine_type)
+            return CachedTTSEngine(engine, cache, engine_type)
+
+        return engine
+
+    @staticmethod
+    def meter(engine: Union[TTSEngine, AsyncTTSEngine], engine_type: str) -> Union[TTSEngine, AsyncTTSEngine]:
+        if isinstance(engine, AsyncTTSEngine):
+            return AsyncMeteredTTSEngine(engine, engine_type)
+        return MeteredTTSEngine(engine, engine_type)
\ No newline at end of file